@@ -0,0 +1,92 @@
+"""
+Benchmark: per-pincode sums and frequencies over the three datasets, with
+the pandas groupby + merge path the pincode processors used before and
+with sum_by_pincode (np.bincount).
+Rows are synthetic (split evenly between the datasets, about 19,000
+distinct pincodes, counts narrowed as at load time).
+Usage:
+    python -m benchmarks.pincode_aggregation [--rows 1000000 10000000 100000000]
+"""
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.ingest import count_columns, sum_by_pincode
+
+PREFIXES = {"demographic": "demo", "biometric": "bio", "enrollment": "enroll"}
+PINCODES = 19_000
+
+
+def make_data(rows: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    pincodes = np.sort(rng.choice(np.arange(110001, 855118), size=PINCODES, replace=False)).astype(np.int32)
+    data = {}
+    for dataset in PREFIXES:
+        size = rows // len(PREFIXES)
+        frame = {"pincode": pincodes[rng.integers(0, PINCODES, size)]}
+        for column in count_columns(config.DATASET_SCHEMAS[dataset]):
+            frame[column] = rng.integers(0, 200, size, dtype=np.uint16)
+        data[dataset] = pd.DataFrame(frame)
+    return data
+
+
+def pandas_path(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    result = None
+    for dataset, prefix in PREFIXES.items():
+        df = data[dataset]
+        totals = (
+            df.assign(total=df[count_columns(config.DATASET_SCHEMAS[dataset])].sum(axis=1))
+            .groupby("pincode")["total"]
+            .sum()
+            .reset_index(name=f"{prefix}_total")
+        )
+        freq = df.groupby("pincode").size().reset_index(name=f"{prefix}_freq")
+        for part in (totals, freq):
+            result = part if result is None else result.merge(part, on="pincode", how="outer")
+    return result.fillna(0).set_index("pincode")
+
+
+def bincount_path(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    parts = []
+    for dataset, prefix in PREFIXES.items():
+        df = data[dataset]
+        total = sum(df[column].to_numpy(dtype=np.float64) for column in count_columns(config.DATASET_SCHEMAS[dataset]))
+        parts.append((df["pincode"].to_numpy(), {f"{prefix}_total": total, f"{prefix}_freq": None}))
+    return sum_by_pincode(parts)
+
+
+def timed(func, data, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'pandas s':>10} {'bincount s':>11} {'speedup':>8}")
+    for rows in args.rows:
+        data = make_data(rows)
+        expected = pandas_path(data).sort_index()
+        actual = bincount_path(data).sort_index()
+        pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False)
+
+        repeat = args.repeat if rows <= 10_000_000 else 1
+        before = timed(pandas_path, data, repeat)
+        after = timed(bincount_path, data, repeat)
+        print(f"{rows:>12,} {before:>10.3f} {after:>11.3f} {before / after:>7.1f}x")
+        del data, expected, actual
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,125 @@ PROJECT_ROOT = Path(__file__).parent
 DATASETS_DIR = PROJECT_ROOT / "Datasets"
 CHARTS_OUTPUT_DIR = PROJECT_ROOT / "charts"
 CHARTS_SVG_OUTPUT_DIR = PROJECT_ROOT / "charts-svg"
+CACHE_DIR = PROJECT_ROOT / ".cache"
 
 # Dataset directories
 DEMOGRAPHIC_DIR = DATASETS_DIR / "demographic"
 BIOMETRIC_DIR = DATASETS_DIR / "biometric"
 ENROLLMENT_DIR = DATASETS_DIR / "enrollment"
 
+# Column types per dataset, applied at load time (see src/ingest/schema.py):
+#   date     -> datetime64 parsed with DATE_FORMAT, plus derived
+#               weekday, month and day_index columns
+#   category -> pandas categorical
+#   int32    -> signed 32-bit integer
+#   count    -> smallest unsigned integer that holds every row total
+DATASET_SCHEMAS = {
+    "demographic": {
+        "date": "date",
+        "state": "category",
+        "district": "category",
+        "pincode": "int32",
+        "demo_age_5_17": "count",
+        "demo_age_17_": "count",
+    },
+    "biometric": {
+        "date": "date",
+        "state": "category",
+        "district": "category",
+        "pincode": "int32",
+        "bio_age_5_17": "count",
+        "bio_age_17_": "count",
+    },
+    "enrollment": {
+        "date": "date",
+        "state": "category",
+        "district": "category",
+        "pincode": "int32",
+        "age_0_5": "count",
+        "age_5_17": "count",
+        "age_18_greater": "count",
+    },
+}
+
+# Parsed CSV shards are cached as NumPy columns under CACHE_DIR and
+# re-parsed only when the source file changes
+USE_DISK_CACHE = True
+
+# Number of CSV shards parsed concurrently per dataset (main.py --jobs)
+LOAD_JOBS = 1
+
+# Streaming mode (main.py --stream): aggregate the CSV shards chunk by chunk
+# instead of loading whole datasets, keeping peak memory bounded
+STREAMING = False
+STREAM_CHUNK_ROWS = 1_000_000
+
+# Row filters (main.py --from/--to/--state); None keeps every row. Dates are
+# inclusive; states match case-insensitively. Filtered runs read from a
+# month x state partitioned copy of the shards in CACHE_DIR.
+DATE_FROM = None
+DATE_TO = None
+STATES = None
+
+# Answer rollups, filtered or not, from a per-dataset cube of sums by date
+# and location with prefix sums over the dates (main.py --cube), kept in
+# CACHE_DIR and extended as shards with new dates arrive
+CUBE_QUERIES = False
+
+# Merge loaded rows repeating a (date, state, district, pincode) key into one
+# row with summed counts and a row multiplicity (main.py --consolidate)
+CONSOLIDATE_ROWS = False
+
+# Keep frames returned by DataLoader.load as memory-mapped NumPy columns
+# under CACHE_DIR, so processes loading the same dataset share its pages
+# instead of each holding a copy (needs USE_DISK_CACHE; unfiltered loads
+# only). A library option: the charts read stored rollups rather than
+# whole frames, so main.py has no flag for it
+MMAP_FRAMES = False
+
+# Check parsed rows (counts, dates, pincodes, state names, pincode/state
+# agreement) and move failing ones to QUARANTINE_DIR/<shard>.csv with
+# reason codes instead of loading them (main.py --validate)
+VALIDATE_ROWS = False
+QUARANTINE_DIR = PROJECT_ROOT / "quarantine"
+
+# Prepare the datasets in background threads and start each chart as soon
+# as the datasets it reads are ready (main.py --prefetch)
+PREFETCH = False
+
+# Elbow search (chart 17): k values are fitted in parallel by ELBOW_JOBS
+# threads (None: one per core). ELBOW_WARM_START seeds each k from the
+# previous k's centroids plus a k-means++ pick instead (main.py
+# --elbow-warm-start). ELBOW_SAMPLE_ROWS fits on a sample of that many
+# pincodes, stratified by postal zone, scores the centroids on every pincode
+# and bounds the full fit's inertia from below (main.py --elbow-sample)
+ELBOW_JOBS = None
+ELBOW_WARM_START = False
+ELBOW_SAMPLE_ROWS = None
+
+# Cluster charts (18-25) from a model saved in CLUSTER_MODEL_DIR (loaders
+# with their own Datasets directory in a sub-directory), fitted on
+# first use and afterwards only applied (main.py --cluster-model). It is
+# refitted when asked (main.py --refit-clusters) or when the new data fits
+# its centroids worse than the fitted data by more than
+# CLUSTER_DRIFT_THRESHOLD (0.25: mean squared distance 25% higher)
+CLUSTER_MODEL = False
+CLUSTER_REFIT = False
+CLUSTER_DRIFT_THRESHOLD = 0.25
+CLUSTER_MODEL_DIR = PROJECT_ROOT / "models"
+
+# Threads evaluating the processor graph's nodes (main.py --processor-jobs;
+# None: one per core). Nodes the selected charts read are computed up front,
+# those not depending on each other concurrently
+PROCESSOR_JOBS = None
+
+# Processor results are kept in CACHE_DIR/results, keyed by a fingerprint of
+# their input data, the processor (name and version) and the arguments, so a
+# rerun over unchanged data (e.g. after restyling charts) skips computing
+# them. The least recently used are dropped past RESULT_CACHE_BYTES
+# (main.py --result-cache-mb; 0 turns the cache off). Needs USE_DISK_CACHE
+RESULT_CACHE_BYTES = 256 * 2**20
+
 # Chart styling
 COLORS = {
     "demographic": "#1f77b4",  # Blue
@@ -5,13 +5,16 @@ By Rajneesh (github.com/BMOit / rajneesh.blog)
 """
 import argparse
 import sys
+from datetime import date
 from pathlib import Path
+from typing import List, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
-from src.charts import discover_charts, generate_all_charts, get_all_chart_classes
-from src.data_loader import DataLoader
+from src.charts import discover_charts, generate_all_charts, get_all_chart_classes, select_charts
+from src.charts.base import BaseChart
+from src.data_loader import DATASETS, DataLoader
 
 
 def list_charts() -> None:
@@ -29,6 +32,40 @@ def list_charts() -> None:
     print(f"Total: {len(charts)} charts\n")
 
 
+def plan_datasets(charts: List[BaseChart], loader: DataLoader) -> Tuple[List[str], List[BaseChart]]:
+    """
+    Work out which datasets the selected charts need.
+
+    Reports the datasets no selected chart needs, and those with no CSV
+    files on disk (or, in filtered runs, no matching rows) along with the
+    charts dropped because of them.
+
+    Returns:
+        (datasets to load, charts that can be generated)
+    """
+    needs = {chart.chart_id: set(chart.datasets) for chart in charts}
+    needed = set().union(*needs.values())
+    reasons = {name: "no CSV files found" for name in needed if not loader.available(name)}
+    if loader.row_filter().active:
+        for name in needed - set(reasons):
+            if not loader.rollup(name)["rows"].sum():
+                reasons[name] = "no rows match the filters"
+    missing = set(reasons)
+
+    skipped = [name for name in DATASETS if name not in needed]
+    if skipped:
+        print(f"  -> Skipped (not needed): {', '.join(skipped)}")
+    for name in DATASETS:
+        if name in missing:
+            dropped = [chart_id for chart_id, names in needs.items() if name in names]
+            print(f"  -> Skipped ({reasons[name]}): {name}, dropping chart(s) {', '.join(dropped)}")
+
+    runnable = [chart for chart in charts if not needs[chart.chart_id] & missing]
+    used = set().union(*(needs[chart.chart_id] for chart in runnable))
+    to_load = [name for name in DATASETS if name in used]
+    return to_load, runnable
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate UIDAI Hackathon charts")
     parser.add_argument("--chart", "-c", type=str, nargs="+", help="Chart ID(s) to generate")
@@ -47,6 +84,94 @@ def main():
         default=None,
         help="Output directory for SVG files (default: charts-svg/)"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=config.LOAD_JOBS,
+        help=f"Number of CSV shards to parse in parallel (default: {config.LOAD_JOBS})"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Aggregate CSV shards chunk by chunk instead of loading them whole"
+    )
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="Merge rows repeating a date/state/district/pincode key at load time"
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Drop malformed rows at load time, writing them to the quarantine directory"
+    )
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Load datasets in the background and start charts as their data is ready"
+    )
+    parser.add_argument(
+        "--elbow-warm-start",
+        action="store_true",
+        help="Seed each k of the elbow search from the previous k's centroids"
+    )
+    parser.add_argument(
+        "--elbow-sample",
+        type=int,
+        default=None,
+        metavar="ROWS",
+        help="Estimate elbow inertias on a stratified sample of this many pincodes"
+    )
+    parser.add_argument(
+        "--cluster-model",
+        action="store_true",
+        help="Assign clusters with the saved model, fitting it only if missing or drifted"
+    )
+    parser.add_argument(
+        "--refit-clusters",
+        action="store_true",
+        help="Refit and save the cluster model (implies --cluster-model)"
+    )
+    parser.add_argument(
+        "--processor-jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Threads computing shared processor results (default: one per core)"
+    )
+    parser.add_argument(
+        "--result-cache-mb",
+        type=int,
+        default=None,
+        metavar="MB",
+        help=f"Disk space for cached processor results, 0 to disable (default: {config.RESULT_CACHE_BYTES // 2**20})"
+    )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=date.fromisoformat,
+        default=None,
+        help="Only use rows on or after this date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=date.fromisoformat,
+        default=None,
+        help="Only use rows on or before this date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--state",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Only use rows from these state(s)"
+    )
+    parser.add_argument(
+        "--cube",
+        action="store_true",
+        help="Answer rollups from a date x location cube of sums instead of the rows"
+    )
 
     args = parser.parse_args()
 
@@ -60,6 +185,53 @@ def main():
     if args.svg_output:
         config.CHARTS_SVG_OUTPUT_DIR = args.svg_output
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    config.LOAD_JOBS = args.jobs
+
+    if args.stream:
+        config.STREAMING = True
+
+    if args.consolidate:
+        config.CONSOLIDATE_ROWS = True
+
+    if args.validate:
+        config.VALIDATE_ROWS = True
+
+    if args.prefetch:
+        config.PREFETCH = True
+
+    if args.elbow_warm_start:
+        config.ELBOW_WARM_START = True
+
+    if args.elbow_sample is not None:
+        if args.elbow_sample < 2:
+            parser.error("--elbow-sample must be at least 2")
+        config.ELBOW_SAMPLE_ROWS = args.elbow_sample
+
+    if args.cluster_model or args.refit_clusters:
+        config.CLUSTER_MODEL = True
+    if args.refit_clusters:
+        config.CLUSTER_REFIT = True
+
+    if args.processor_jobs is not None:
+        if args.processor_jobs < 1:
+            parser.error("--processor-jobs must be at least 1")
+        config.PROCESSOR_JOBS = args.processor_jobs
+
+    if args.result_cache_mb is not None:
+        if args.result_cache_mb < 0:
+            parser.error("--result-cache-mb must not be negative")
+        config.RESULT_CACHE_BYTES = args.result_cache_mb * 2**20
+
+    if args.date_from and args.date_to and args.date_from > args.date_to:
+        parser.error("--from must not be after --to")
+    config.DATE_FROM = args.date_from
+    config.DATE_TO = args.date_to
+    config.STATES = args.state
+    if args.cube:
+        config.CUBE_QUERIES = True
+
     config.CHARTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     if args.format in ("svg", "both"):
         config.CHARTS_SVG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -69,17 +241,31 @@ def main():
     print(f"PNG output directory: {config.CHARTS_OUTPUT_DIR}")
     if args.format in ("svg", "both"):
         print(f"SVG output directory: {config.CHARTS_SVG_OUTPUT_DIR}")
+    if args.date_from or args.date_to:
+        print(f"Dates: {args.date_from or 'start'} to {args.date_to or 'end'}")
+    if args.state:
+        print(f"States: {', '.join(args.state)}")
     print("-" * 50)
 
-    print("\nLoading datasets...")
-    loader = DataLoader()
-    _ = loader.demographic
-    _ = loader.biometric
-    _ = loader.enrollment
-    print("  -> Datasets loaded and cached")
+    print("\nPlanning datasets...")
+    loader = DataLoader.named()
+    charts = select_charts(args.chart)
+    to_load, runnable = plan_datasets(charts, loader)
+
+    # Charts read rollups, which are loaded on first use (from the stored
+    # rollups when the disk cache is on, parsing only shards added since)
+    if config.PREFETCH:
+        print(f"  -> Prefetching {', '.join(to_load) or 'nothing'} in the background")
+    elif config.STREAMING:
+        print(f"  -> Streaming {', '.join(to_load) or 'nothing'} in chunks of {config.STREAM_CHUNK_ROWS:,} rows")
+    else:
+        print(f"  -> Loading {', '.join(to_load) or 'nothing'}")
 
     print("\nGenerating charts...")
-    output_paths = generate_all_charts(args.chart, formats=args.format)
+    if runnable:
+        output_paths = generate_all_charts([chart.chart_id for chart in runnable], formats=args.format)
+    else:
+        output_paths = []
 
     print("-" * 50)
     print(f"\nGenerated {len(output_paths)} file(s)")
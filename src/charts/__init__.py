@@ -1,9 +1,13 @@
 """Chart registry and auto-discovery."""
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Type, Union
+from typing import Dict, Iterator, List, Optional, Type, Union
 import importlib
 import pkgutil
 
+import config
+from src.data_loader import DataLoader
+from src.processors import ProcessorGraph
 from .base import BaseChart
 
 _CHART_REGISTRY: Dict[str, Type[BaseChart]] = {}
@@ -39,27 +43,86 @@ def discover_charts() -> None:
                     )
 
 
+def select_charts(
+    chart_ids: Optional[List[str]] = None,
+    data_loader: Optional[DataLoader] = None
+) -> List[BaseChart]:
+    """
+    Instances of the registered charts, optionally only those in ``chart_ids``,
+    reading from ``data_loader`` (default: the default named loader).
+    """
+    discover_charts()
+    charts = [cls(data_loader) for _, cls in sorted(_CHART_REGISTRY.items())]
+    if chart_ids:
+        charts = [chart for chart in charts if chart.chart_id in chart_ids]
+    return charts
+
+
+def schedule_charts(charts: List[BaseChart]) -> Iterator[BaseChart]:
+    """
+    Prefetch every dataset the charts read and yield each chart once its
+    datasets are ready, in the given order among the charts ready together.
+
+    Charts are still rendered one at a time by the caller; only dataset
+    loading runs in the background, overlapping with rendering.
+    """
+    futures = {}
+    for chart in charts:
+        futures.update(chart.data_loader.prefetch(chart.datasets))
+
+    pending = list(charts)
+    while pending:
+        ready = [chart for chart in pending if all(futures[name].done() for name in chart.datasets)]
+        if not ready:
+            waiting = {futures[name] for chart in pending for name in chart.datasets}
+            wait([future for future in waiting if not future.done()], return_when=FIRST_COMPLETED)
+            continue
+        for chart in ready:
+            pending.remove(chart)
+            yield chart
+
+
+def compute_nodes(charts: List[BaseChart]) -> None:
+    """
+    Compute the processor graph nodes the charts read, each once, running
+    independent ones concurrently (see ProcessorGraph.compute).
+    """
+    requests: Dict[ProcessorGraph, List] = {}
+    for chart in charts:
+        requests.setdefault(chart.graph, []).extend((node, chart.requires) for node in chart.nodes)
+    for graph, nodes in requests.items():
+        graph.compute(nodes)
+
+
 def generate_all_charts(
     chart_ids: Optional[List[str]] = None,
-    formats: Union[str, List[str]] = "png"
+    formats: Union[str, List[str]] = "png",
+    data_loader: Optional[DataLoader] = None
 ) -> List[Path]:
     """Generate charts in specified format(s).
 
     Args:
         chart_ids: Optional list of chart IDs to generate
         formats: 'png', 'svg', 'both', or list like ['png', 'svg']
+        data_loader: Loader the charts read from (default: the default named loader)
 
     Returns:
         List of paths to generated files
     """
-    discover_charts()
+    charts = select_charts(chart_ids, data_loader)
     output_paths = []
 
-    for name, cls in sorted(_CHART_REGISTRY.items()):
-        chart = cls()
-        if chart_ids and chart.chart_id not in chart_ids:
-            continue
+    # Declare every selected chart's columns before the first one loads
+    # anything, so each dataset is parsed once, for the union of them
+    for chart in charts:
+        chart.data_loader.project(chart.requires)
+
+    if config.PREFETCH:
+        charts = schedule_charts(charts)
+    else:
+        compute_nodes(charts)
 
+    for chart in charts:
         print(f"Generating {chart.chart_id}: {chart.title}...")
         paths = chart.save(formats=formats)
 
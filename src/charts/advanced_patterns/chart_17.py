@@ -16,6 +16,8 @@ from src.processors import ClusteringProcessor
 @register_chart
 class Chart17ElbowMethod(BaseChart):
 
+    requires = ClusteringProcessor.requires
+
     @property
     def chart_id(self) -> str:
         return "17"
@@ -25,7 +27,7 @@ class Chart17ElbowMethod(BaseChart):
         return "Elbow Method for Optimal Clusters"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.data_loader.get_rollup_data("pincode", self.requires)
         processor = ClusteringProcessor()
         elbow_data = processor.process_elbow(data)
 
@@ -41,6 +43,18 @@ class Chart17ElbowMethod(BaseChart):
             markersize=8
         )
 
+        # Sampled elbow searches come with the range a full fit's inertia lies in
+        if "inertia_low" in elbow_data.columns:
+            ax.fill_between(
+                elbow_data["k"],
+                elbow_data["inertia_low"],
+                elbow_data["inertia_high"],
+                color="gray",
+                alpha=0.25,
+                label="Full-fit range (95%)"
+            )
+            ax.legend(loc="upper right")
+
         # Highlight k=5
         k_opt = 5
         inertia_opt = elbow_data.loc[elbow_data["k"] == k_opt, "inertia"].values[0]
@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart18EngagementPersonas(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "18"
@@ -27,9 +30,7 @@ class Chart18EngagementPersonas(BaseChart):
         return "Engagement Personas (PCA)"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        _, pca_data = processor.process_clusters(data, k=5)
+        _, pca_data = self.graph.get("clusters", self.requires)
 
         fig, ax = plt.subplots(figsize=(12, 10))
 
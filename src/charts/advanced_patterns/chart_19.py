@@ -17,6 +17,9 @@ from src.processors import ClusteringProcessor
 @register_chart
 class Chart19ClusterSize(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "19"
@@ -26,9 +29,7 @@ class Chart19ClusterSize(BaseChart):
         return "Cluster Size Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         cluster_counts = features_df["cluster"].value_counts().sort_index()
 
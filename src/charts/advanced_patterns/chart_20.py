@@ -16,6 +16,9 @@ import config
 @register_chart
 class Chart20ClusterComposition(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "20"
@@ -25,9 +28,7 @@ class Chart20ClusterComposition(BaseChart):
         return "Engagement Type by Cluster"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         # Calculate average ratios per cluster
         means = features_df.groupby("cluster")[["demo_ratio", "bio_ratio", "enroll_ratio"]].mean()
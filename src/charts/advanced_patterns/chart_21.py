@@ -19,6 +19,9 @@ from src.processors import ClusteringProcessor
 @register_chart
 class Chart21EngagementScore(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "21"
@@ -28,10 +31,8 @@ class Chart21EngagementScore(BaseChart):
         return "Engagement Score by Cluster"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
         # k=5 matches Chart 19/20
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         # Filter to 95th percentile to remove outliers
         p95 = features_df["engagement_score"].quantile(0.95)
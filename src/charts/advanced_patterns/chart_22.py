@@ -20,6 +20,9 @@ import config
 @register_chart
 class Chart22ActivityIntensity(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "22"
@@ -29,9 +32,7 @@ class Chart22ActivityIntensity(BaseChart):
         return "Activity Intensity by Cluster"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         # Cap at 95th percentile to avoid skewing averages with extreme outliers
         for col in ["demo_intensity", "bio_intensity", "enroll_intensity"]:
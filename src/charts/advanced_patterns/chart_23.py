@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart23BalanceDistribution(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "23"
@@ -27,10 +30,8 @@ class Chart23BalanceDistribution(BaseChart):
         return "Engagement Balance Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
         # We don't strictly need clusters but the processor provides the comprehensive dataframe
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         fig, ax = plt.subplots(figsize=(10, 8))
 
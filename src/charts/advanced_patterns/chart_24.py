@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart24Specialists(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "24"
@@ -27,9 +30,7 @@ class Chart24Specialists(BaseChart):
         return "Engagement Specialists"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         # Count specialists
         demo_specs = (features_df["demo_ratio"] > 0.7).sum()
@@ -20,6 +20,9 @@ from src.processors import ClusteringProcessor
 @register_chart
 class Chart25HighValueUsers(BaseChart):
 
+    requires = ClusteringProcessor.requires
+    nodes = ("clusters",)
+
     @property
     def chart_id(self) -> str:
         return "25"
@@ -29,9 +32,7 @@ class Chart25HighValueUsers(BaseChart):
         return "High-Value User Analysis"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = ClusteringProcessor()
-        features_df, _ = processor.process_clusters(data, k=5)
+        features_df, _ = self.graph.get("clusters", self.requires)
 
         # Define segments
         freq_p95 = features_df["total_freq"].quantile(0.95)
@@ -12,12 +12,15 @@ import numpy as np
 from src.charts import register_chart
 from src.charts.base import BaseChart
 from src.processors import AgeGroupAggregator
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart07AgeGroupInteractions(BaseChart):
 
+    requires = dataset_columns(datasets=("demographic", "biometric"))
+
     @property
     def chart_id(self) -> str:
         return "07"
@@ -27,7 +30,7 @@ class Chart07AgeGroupInteractions(BaseChart):
         return "Age Group Distribution - Interactions"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.data_loader.get_rollup_data("total", self.requires)
         processor = AgeGroupAggregator()
         age_data = processor.process_interactions(data)
 
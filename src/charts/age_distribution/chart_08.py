@@ -11,12 +11,15 @@ import numpy as np
 from src.charts import register_chart
 from src.charts.base import BaseChart
 from src.processors import AgeGroupAggregator
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart08AgeGroupEnrollments(BaseChart):
 
+    requires = dataset_columns(datasets=("enrollment",))
+
     @property
     def chart_id(self) -> str:
         return "08"
@@ -26,7 +29,7 @@ class Chart08AgeGroupEnrollments(BaseChart):
         return "Age Group Distribution - Enrollments"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.data_loader.get_rollup_data("total", self.requires)
         processor = AgeGroupAggregator()
         age_data = processor.process_enrollments(data)
 
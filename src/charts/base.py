@@ -1,7 +1,8 @@
 """Base class for all chart implementations."""
 from abc import ABC, abstractmethod
+import functools
 from pathlib import Path
-from typing import Optional, List, Union
+from typing import Any, Callable, Dict, Optional, List, Tuple, Union
 import xml.etree.ElementTree as ET
 
 import matplotlib.pyplot as plt
@@ -9,19 +10,46 @@ from PIL import Image
 from PIL.PngImagePlugin import PngInfo
 from scour import scour
 
-from src.data_loader import DataLoader
+from src.data_loader import DATASETS, DataLoader
+from src.processors import ProcessorGraph
+from src.processors.context import working_for
 import config
 
 
 class BaseChart(ABC):
 
+    # Columns the chart reads, keyed by dataset name (None: everything).
+    # Only the union over the charts being generated is parsed.
+    requires: Optional[Dict[str, Tuple[str, ...]]] = None
+
+    # Processor graph nodes the chart reads (over its ``requires``); those
+    # of the charts being generated are computed up front (unless
+    # prefetching; each is then computed when first read)
+    nodes: Tuple[str, ...] = ()
+
     def __init__(self, data_loader: Optional[DataLoader] = None):
-        self._data_loader = data_loader or DataLoader()
+        self._data_loader = data_loader or DataLoader.named()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        # Processors a chart calls store their results under its loader's cache
+        if "generate" in cls.__dict__:
+            cls.generate = _working_for_loader(cls.__dict__["generate"])
 
     @property
     def data_loader(self) -> DataLoader:
         return self._data_loader
 
+    @property
+    def graph(self) -> ProcessorGraph:
+        """Shared processor results over the chart's loader."""
+        return ProcessorGraph.of(self.data_loader)
+
+    @property
+    def datasets(self) -> Tuple[str, ...]:
+        """Datasets the chart reads."""
+        return DATASETS if self.requires is None else tuple(self.requires)
+
     @property
     @abstractmethod
     def chart_id(self) -> str:
@@ -225,3 +253,12 @@ class BaseChart(ABC):
         ax.spines["top"].set_visible(False)
         ax.spines["right"].set_visible(False)
         ax.tick_params(labelsize=10)
+
+
+def _working_for_loader(generate: Callable[[BaseChart], plt.Figure]) -> Callable[[BaseChart], plt.Figure]:
+    @functools.wraps(generate)
+    def wrapper(self: BaseChart) -> plt.Figure:
+        with working_for(self.data_loader):
+            return generate(self)
+
+    return wrapper
@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart01DailyTrends(BaseChart):
 
+    requires = DailyAggregator.requires
+    nodes = ("daily",)
+
     @property
     def chart_id(self) -> str:
         return "01"
@@ -27,9 +30,7 @@ class Chart01DailyTrends(BaseChart):
         return "Daily Aadhaar Engagement Trends"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = DailyAggregator()
-        daily_data = processor.process(data)
+        daily_data = self.graph.get("daily", self.requires)
 
         fig, ax = plt.subplots(figsize=(14, 7))
 
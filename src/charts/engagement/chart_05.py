@@ -19,6 +19,9 @@ import config
 @register_chart
 class Chart05EngagementFrequency(BaseChart):
 
+    requires = EngagementFrequencyProcessor.requires
+    nodes = ("engagement_frequency",)
+
     @property
     def chart_id(self) -> str:
         return "05"
@@ -28,9 +31,7 @@ class Chart05EngagementFrequency(BaseChart):
         return "Engagement Frequency Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = EngagementFrequencyProcessor()
-        freq_data = processor.process(data)
+        freq_data = self.graph.get("engagement_frequency", self.requires)
 
         fig, ax = plt.subplots(figsize=(12, 8))
 
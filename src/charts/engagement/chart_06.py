@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart06EngagementDiversity(BaseChart):
 
+    requires = EngagementDiversityProcessor.requires
+    nodes = ("engagement_diversity",)
+
     @property
     def chart_id(self) -> str:
         return "06"
@@ -27,9 +30,7 @@ class Chart06EngagementDiversity(BaseChart):
         return "Pincodes by Engagement Diversity"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = EngagementDiversityProcessor()
-        diversity_data = processor.process(data)
+        diversity_data = self.graph.get("engagement_diversity", self.requires)
 
         fig, ax = plt.subplots(figsize=(10, 8))
 
@@ -20,6 +20,9 @@ import config
 @register_chart
 class Chart11MonthlyComparison(BaseChart):
 
+    requires = MonthlyAggregator.requires
+    nodes = ("monthly",)
+
     @property
     def chart_id(self) -> str:
         return "11"
@@ -29,9 +32,7 @@ class Chart11MonthlyComparison(BaseChart):
         return "Monthly Engagement Comparison"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = MonthlyAggregator()
-        monthly_data = processor.process(data)
+        monthly_data = self.graph.get("monthly", self.requires)
 
         fig, ax = plt.subplots(figsize=(14, 8))
 
@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart12EngagementLevel(BaseChart):
 
+    requires = EngagementLevelProcessor.requires
+    nodes = ("engagement_level",)
+
     @property
     def chart_id(self) -> str:
         return "12"
@@ -27,9 +30,7 @@ class Chart12EngagementLevel(BaseChart):
         return "Engagement Level Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = EngagementLevelProcessor()
-        level_data = processor.process(data)
+        level_data = self.graph.get("engagement_level", self.requires)
 
         fig, ax = plt.subplots(figsize=(10, 8))
 
@@ -11,12 +11,15 @@ import matplotlib.pyplot as plt
 
 from src.charts import register_chart
 from src.charts.base import BaseChart
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart13OverallDistribution(BaseChart):
 
+    requires = dataset_columns()
+
     @property
     def chart_id(self) -> str:
         return "13"
@@ -26,7 +29,7 @@ class Chart13OverallDistribution(BaseChart):
         return "Overall Engagement Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.data_loader.get_rollup_data("total", self.requires)
         
         # Calculate totals
         demo_total = (
@@ -11,12 +11,16 @@ import matplotlib.pyplot as plt
 from src.charts import register_chart
 from src.charts.base import BaseChart
 from src.processors import DistrictAggregator
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart14TopDistricts(BaseChart):
 
+    requires = dataset_columns("state", "district", datasets=("demographic",))
+    nodes = ("totals:district",)
+
     @property
     def chart_id(self) -> str:
         return "14"
@@ -26,9 +30,9 @@ class Chart14TopDistricts(BaseChart):
         return "Top 20 Districts - Demographic Interactions"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.graph.get("totals:district", self.requires)
         processor = DistrictAggregator()
-        district_data = processor.process(data, dataset="demographic", top_n=20)
+        district_data = processor.process(data, dataset="demographic", top_n=20, dimensions=self.data_loader.dimensions)
 
         fig, ax = plt.subplots(figsize=(12, 10))
 
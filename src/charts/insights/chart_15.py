@@ -8,7 +8,6 @@ Data Points:
   - Area 3: enroll_daily total over time
 """
 import matplotlib.pyplot as plt
-import pandas as pd
 
 from src.charts import register_chart
 from src.charts.base import BaseChart
@@ -19,6 +18,9 @@ import config
 @register_chart
 class Chart15EngagementTrendsArea(BaseChart):
 
+    requires = DailyAggregator.requires
+    nodes = ("daily",)
+
     @property
     def chart_id(self) -> str:
         return "15"
@@ -28,15 +30,8 @@ class Chart15EngagementTrendsArea(BaseChart):
         return "Engagement Trends Over Time"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = DailyAggregator()
-        
-        # DailyAggregator returns a single dataframe with all metrics
-        daily_data = processor.process(data)
-        
-        # Ensure date is datetime for plotting
-        daily_data["date"] = pd.to_datetime(daily_data["date"], format="%d-%m-%Y")
-        daily_data = daily_data.sort_values("date")
+        # DailyAggregator returns a single dataframe with all metrics, sorted by date
+        daily_data = self.graph.get("daily", self.requires)
 
         fig, ax = plt.subplots(figsize=(14, 8))
 
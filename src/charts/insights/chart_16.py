@@ -19,6 +19,9 @@ import config
 @register_chart
 class Chart16EngagementIntensity(BaseChart):
 
+    requires = IntensityProcessor.requires
+    nodes = ("intensity",)
+
     @property
     def chart_id(self) -> str:
         return "16"
@@ -28,9 +31,7 @@ class Chart16EngagementIntensity(BaseChart):
         return "Engagement Intensity Distribution"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = IntensityProcessor()
-        intensity_data = processor.process(data)
+        intensity_data = self.graph.get("intensity", self.requires)
 
         fig, ax = plt.subplots(figsize=(12, 8))
 
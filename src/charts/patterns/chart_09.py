@@ -18,6 +18,9 @@ import config
 @register_chart
 class Chart09WeeklyPattern(BaseChart):
 
+    requires = WeeklyPatternProcessor.requires
+    nodes = ("weekly",)
+
     @property
     def chart_id(self) -> str:
         return "09"
@@ -27,9 +30,7 @@ class Chart09WeeklyPattern(BaseChart):
         return "Weekly Pattern - Demographic Interactions"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = WeeklyPatternProcessor()
-        weekly_data = processor.process(data)
+        weekly_data = self.graph.get("weekly", self.requires)
 
         fig, ax = plt.subplots(figsize=(12, 8))
 
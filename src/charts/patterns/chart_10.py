@@ -25,6 +25,9 @@ import config
 @register_chart
 class Chart10CorrelationMatrix(BaseChart):
 
+    requires = CorrelationMatrixProcessor.requires
+    nodes = ("correlation_matrix",)
+
     @property
     def chart_id(self) -> str:
         return "10"
@@ -34,9 +37,7 @@ class Chart10CorrelationMatrix(BaseChart):
         return "Engagement Metrics Correlation"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
-        processor = CorrelationMatrixProcessor()
-        corr_matrix = processor.process(data)
+        corr_matrix = self.graph.get("correlation_matrix", self.requires)
 
         fig, ax = plt.subplots(figsize=(12, 10))
 
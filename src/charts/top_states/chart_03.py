@@ -10,12 +10,16 @@ import matplotlib.pyplot as plt
 from src.charts import register_chart
 from src.charts.base import BaseChart
 from src.processors import StateAggregator
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart03TopStatesBiometric(BaseChart):
 
+    requires = dataset_columns("state", datasets=("biometric",))
+    nodes = ("totals:state",)
+
     @property
     def chart_id(self) -> str:
         return "03"
@@ -25,9 +29,9 @@ class Chart03TopStatesBiometric(BaseChart):
         return "Top 15 States - Biometric Interactions"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.graph.get("totals:state", self.requires)
         processor = StateAggregator()
-        state_data = processor.process(data, dataset="biometric", top_n=15)
+        state_data = processor.process(data, dataset="biometric", top_n=15, dimensions=self.data_loader.dimensions)
 
         fig, ax = plt.subplots(figsize=(12, 8))
 
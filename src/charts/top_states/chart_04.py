@@ -10,12 +10,16 @@ import matplotlib.pyplot as plt
 from src.charts import register_chart
 from src.charts.base import BaseChart
 from src.processors import StateAggregator
+from src.processors.base import dataset_columns
 import config
 
 
 @register_chart
 class Chart04TopStatesEnrollment(BaseChart):
 
+    requires = dataset_columns("state", datasets=("enrollment",))
+    nodes = ("totals:state",)
+
     @property
     def chart_id(self) -> str:
         return "04"
@@ -25,9 +29,9 @@ class Chart04TopStatesEnrollment(BaseChart):
         return "Top 15 States - New Enrollments"
 
     def generate(self) -> plt.Figure:
-        data = self.data_loader.get_all_data()
+        data = self.graph.get("totals:state", self.requires)
         processor = StateAggregator()
-        state_data = processor.process(data, dataset="enrollment", top_n=15)
+        state_data = processor.process(data, dataset="enrollment", top_n=15, dimensions=self.data_loader.dimensions)
 
         fig, ax = plt.subplots(figsize=(12, 8))
 
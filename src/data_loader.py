@@ -1,62 +1,369 @@
-"""Singleton data loader with caching for CSV datasets."""
+"""Data loaders with caching for CSV datasets, one per named Datasets directory."""
 from __future__ import annotations
 
+import hashlib
+import threading
 import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 import config
+from src.ingest import (
+    CUBE_LEVEL,
+    ROLLUP_LEVELS,
+    ROW_KEY,
+    ColumnStore,
+    Cube,
+    CubeStore,
+    Dimensions,
+    MultiRollup,
+    PartialAggregate,
+    PartitionStore,
+    Quarantine,
+    RollupStore,
+    RowFilter,
+    combine_frames,
+    consolidate_rows,
+    count_columns,
+    find_shards,
+    parsed_columns,
+    project_schema,
+    read_shard,
+    stream_rollups,
+    unify_categories,
+)
+
+DATASETS = ("demographic", "biometric", "enrollment")
+
+# Columns read per dataset, keyed by dataset name (see BaseChart.requires)
+Requirements = Mapping[str, Sequence[str]]
 
 
 class DataLoader:
+    """
+    Loads and caches the datasets under one Datasets directory.
+
+    A loader is safe to share between threads: each dataset is loaded (and
+    each rollup built) once, by whichever thread asks first, while the
+    others wait for it. Loaders are normally obtained by name through
+    ``DataLoader.named``, so the charts of a run share one; several named
+    loaders, each rooted at its own directory, can be used side by side.
+    """
+
+    _named: Dict[str, DataLoader] = {}
+    _named_lock = threading.Lock()
 
-    _instance: Optional[DataLoader] = None
+    def __init__(self, datasets_dir: Optional[Path] = None):
+        """
+        Args:
+            datasets_dir: Directory holding one sub-directory per dataset
+                (default: config.DEMOGRAPHIC_DIR etc.)
+        """
+        self.datasets_dir = Path(datasets_dir) if datasets_dir is not None else None
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._projection: Dict[str, List[str]] = {}
+        self._rollups: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._cubes: Dict[str, Cube] = {}
+        self._dimensions = Dimensions()
+        self._prefetches: Dict[str, Future] = {}
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Reentrant, as a rollup may load the dataset it aggregates
+        self._dataset_locks = {name: threading.RLock() for name in DATASETS}
+        # Bumped by clear_cache, so values derived from the data (see
+        # ProcessorGraph) are recomputed
+        self.generation = 0
 
-    def __new__(cls) -> DataLoader:
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    @classmethod
+    def named(cls, name: str = "default", datasets_dir: Optional[Path] = None) -> DataLoader:
+        """
+        The loader registered as ``name``, created rooted at ``datasets_dir``
+        on first use.
 
-    def __init__(self):
-        if self._initialized:
-            return
-        self._demographic: Optional[pd.DataFrame] = None
-        self._biometric: Optional[pd.DataFrame] = None
-        self._enrollment: Optional[pd.DataFrame] = None
-        self._initialized = True
+        Raises:
+            ValueError: If ``name`` is already rooted at another directory
+        """
+        with cls._named_lock:
+            loader = cls._named.get(name)
+            if loader is None:
+                loader = cls._named[name] = cls(datasets_dir)
+            elif datasets_dir is not None and loader.datasets_dir != Path(datasets_dir):
+                raise ValueError(f"Data loader '{name}' is rooted at {loader.datasets_dir}, not {datasets_dir}")
+            return loader
+
+    @property
+    def cache_dir(self) -> Path:
+        """
+        config.CACHE_DIR, or for a loader with its own Datasets directory a
+        sub-directory of it, so stores keyed by dataset name (rollups) do
+        not mix data from different directories.
+        """
+        if self.datasets_dir is None:
+            return config.CACHE_DIR
+        return config.CACHE_DIR / "roots" / self._root_key()
+
+    @property
+    def quarantine_dir(self) -> Path:
+        """Where rows rejected by validation go: config.QUARANTINE_DIR, keyed like ``cache_dir``."""
+        if self.datasets_dir is None:
+            return config.QUARANTINE_DIR
+        return config.QUARANTINE_DIR / self._root_key()
+
+    @property
+    def model_dir(self) -> Path:
+        """Where models fitted on the data are saved: config.CLUSTER_MODEL_DIR, keyed like ``cache_dir``."""
+        if self.datasets_dir is None:
+            return config.CLUSTER_MODEL_DIR
+        return config.CLUSTER_MODEL_DIR / self._root_key()
+
+    def _root_key(self) -> str:
+        key = hashlib.sha1(str(self.datasets_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+        return f"{self.datasets_dir.name}-{key}"
 
     @property
     def demographic(self) -> pd.DataFrame:
-        if self._demographic is None:
-            files = sorted(config.DEMOGRAPHIC_DIR.glob("demographic-*.csv"))
-            self._demographic = self._load_dataset(files)
-        return self._demographic
+        return self.load("demographic")
 
     @property
     def biometric(self) -> pd.DataFrame:
-        if self._biometric is None:
-            files = sorted(config.BIOMETRIC_DIR.glob("biometric-*.csv"))
-            self._biometric = self._load_dataset(files)
-        return self._biometric
+        return self.load("biometric")
 
     @property
     def enrollment(self) -> pd.DataFrame:
-        if self._enrollment is None:
-            files = sorted(config.ENROLLMENT_DIR.glob("enrollment-*.csv"))
-            self._enrollment = self._load_dataset(files)
-        return self._enrollment
-
-    def _load_dataset(self, file_paths: List[Path]) -> pd.DataFrame:
-        dfs = []
-        for path in file_paths:
-            df = pd.read_csv(path, parse_dates=["date"], dayfirst=True)
-            dfs.append(df)
-
-        if not dfs:
+        return self.load("enrollment")
+
+    @property
+    def dimensions(self) -> Dimensions:
+        """Dimension tables behind the state_id/district_id keys of ``get_rollup_data``."""
+        return self._dimensions
+
+    def project(self, requires: Optional[Requirements] = None) -> None:
+        """
+        Declare the columns that will be read, per dataset.
+
+        Projections accumulate: each call widens the set of columns parsed
+        for a dataset to the union of everything declared so far. ``None``
+        asks for every column of every dataset. Datasets never projected
+        load in full.
+        """
+        if requires is None:
+            requires = {name: list(config.DATASET_SCHEMAS[name]) for name in DATASETS}
+        with self._lock:
+            for name, columns in requires.items():
+                declared = self._projection.setdefault(name, [])
+                declared.extend(column for column in columns if column not in declared)
+
+    def columns(self, name: str) -> List[str]:
+        """CSV columns loaded for ``name``, in schema order."""
+        schema = config.DATASET_SCHEMAS[name]
+        with self._lock:
+            if name not in self._projection:
+                return list(schema)
+            return list(project_schema(schema, self._projection[name]))
+
+    def load(self, name: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        The dataset with at least ``columns`` (default: its projection).
+
+        Columns missing from the frame already in memory are parsed on
+        their own and attached to it, so widening a projection never
+        re-reads the columns that are loaded.
+
+        With config.CONSOLIDATE_ROWS, rows repeating a (date, state,
+        district, pincode) key are merged into one carrying a ``rows``
+        multiplicity (see ``consolidate_rows``). The frame then always
+        holds the whole key, so columns attached later consolidate into
+        the same rows.
+
+        With config.MMAP_FRAMES, the frame is kept on disk (under the disk
+        cache) and memory-mapped, so processes loading the same dataset
+        share it through the page cache.
+        """
+        with self._dataset_locks[name]:
+            wanted = self.columns(name) if columns is None else list(columns)
+            schema = config.DATASET_SCHEMAS[name]
+            if config.CONSOLIDATE_ROWS:
+                wanted = [column for column in schema if column in ROW_KEY or column in wanted]
+            frame = self._frames.get(name)
+            if frame is None and self._maps_frames():
+                frame = self._read_stored_frame(name)
+            missing = [column for column in wanted if frame is None or column not in frame.columns]
+            if missing:
+                if config.CONSOLIDATE_ROWS:
+                    part = project_schema(schema, set(missing) | set(ROW_KEY))
+                    loaded = self._load_dataset(name, self._dataset_files(name), part)
+                    loaded = consolidate_rows(loaded, count_columns(part))
+                else:
+                    loaded = self._load_dataset(name, self._dataset_files(name), project_schema(schema, missing))
+                if frame is None:
+                    frame = loaded
+                else:
+                    frame = frame.assign(**{column: loaded[column] for column in loaded.columns})
+                if self._maps_frames():
+                    frame = self._store_frame(name, frame)
+                self._frames[name] = frame
+            return frame
+
+    def _maps_frames(self) -> bool:
+        # Filtered frames hold only some rows, so they are not stored
+        return config.MMAP_FRAMES and config.USE_DISK_CACHE and not self.row_filter().active
+
+    def _frame_options(self, name: str) -> Dict[str, object]:
+        return {**self._parse_options(name), "consolidate": config.CONSOLIDATE_ROWS}
+
+    def _parse_options(self, name: str) -> Dict[str, object]:
+        """What parsed data depends on, recorded with everything cached from it."""
+        options = {"schema": config.DATASET_SCHEMAS[name], "date_format": config.DATE_FORMAT}
+        if config.VALIDATE_ROWS:
+            options["validate"] = True
+        return options
+
+    def _quarantine(self) -> Optional[Quarantine]:
+        """Where rejected rows go when validating (config.VALIDATE_ROWS), else None."""
+        return Quarantine(self.quarantine_dir) if config.VALIDATE_ROWS else None
+
+    def _read_stored_frame(self, name: str) -> Optional[pd.DataFrame]:
+        """The stored frame of ``name``, memory-mapped, if it covers exactly the current shards."""
+        store = RollupStore(self.cache_dir / "frames")
+        frame, new_paths = store.read(name, "frame", self._dataset_files(name), self._frame_options(name), mmap=True)
+        return frame if frame is not None and not new_paths else None
+
+    def _store_frame(self, name: str, frame: pd.DataFrame) -> pd.DataFrame:
+        """Store ``frame`` as the frame of ``name`` and return it memory-mapped."""
+        store = RollupStore(self.cache_dir / "frames")
+        store.write(name, "frame", frame, self._dataset_files(name), self._frame_options(name))
+        return self._read_stored_frame(name)
+
+    def prefetch(self, names: Iterable[str]) -> Dict[str, Future]:
+        """
+        Start preparing datasets in background threads, one per dataset.
+
+        Each future resolves to the dataset name once every rollup level
+        its projection covers is built (so the projection should be
+        declared first). Loads or rollups of a dataset requested while it
+        is being prefetched wait for the prefetch instead of repeating it.
+        """
+        names = list(names)
+        with self._lock:
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(max_workers=len(DATASETS), thread_name_prefix="prefetch")
+            for name in names:
+                if name not in self._prefetches:
+                    self._prefetches[name] = self._prefetch_pool.submit(self._prepare, name)
+            return {name: self._prefetches[name] for name in names}
+
+    def _prepare(self, name: str) -> str:
+        # Held throughout, so other threads wait for the whole preparation
+        with self._dataset_locks[name]:
+            if not config.CUBE_QUERIES and (
+                self.row_filter().active or not (config.USE_DISK_CACHE or config.STREAMING)
+            ):
+                # Rollups come from the frame: parse the whole projection at once
+                self.load(name)
+            for level in self._covered_levels(name):
+                self.rollup(name, level)
+        return name
+
+    def available(self, name: str) -> bool:
+        """Whether ``name`` has any CSV files on disk."""
+        return bool(self._dataset_files(name))
+
+    def _dataset_files(self, name: str) -> List[Path]:
+        if self.datasets_dir is None:
+            return find_shards(getattr(config, f"{name.upper()}_DIR"), name)
+        return find_shards(self.datasets_dir / name, name)
+
+    def _load_dataset(self, name: str, file_paths: List[Path], schema: Dict[str, str]) -> pd.DataFrame:
+        if not file_paths:
             raise FileNotFoundError(f"No CSV files found: {file_paths}")
 
-        return pd.concat(dfs, ignore_index=True)
+        # Shards are independent, so they can be parsed concurrently; the
+        # C parser releases the GIL, which makes threads enough here and
+        # avoids pickling every parsed frame back from a worker process.
+        jobs = min(config.LOAD_JOBS, len(file_paths))
+        if jobs > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                dfs = list(pool.map(lambda path: self._load_file(name, path, schema), file_paths))
+        else:
+            dfs = [self._load_file(name, path, schema) for path in file_paths]
+
+        unify_categories(dfs)
+        return combine_frames(dfs)
+
+    def _load_file(self, name: str, path: Path, schema: Dict[str, str]) -> pd.DataFrame:
+        """
+        Read the ``schema`` columns of one CSV shard, going through the
+        on-disk column store when enabled; only columns it does not hold
+        yet are parsed.
+        """
+        row_filter = self.row_filter()
+        if row_filter.active:
+            return self._load_filtered_file(name, path, schema, row_filter)
+
+        store = ColumnStore(self.cache_dir) if config.USE_DISK_CACHE else None
+        options = self._parse_options(name)
+        columns = parsed_columns(schema)
+        cached = None
+        missing = schema
+        if store is not None:
+            stored = set(store.cached_columns(path, options))
+            missing = {
+                column: kind for column, kind in schema.items()
+                if not set(parsed_columns({column: kind})) <= stored
+            }
+            if len(missing) < len(schema):
+                cached = store.read(path, options, [c for c in columns if c not in parsed_columns(missing)])
+            if not missing:
+                return cached
+
+        quarantine = self._quarantine()
+        if quarantine is not None:
+            # Which rows are rejected must not depend on the columns parsed,
+            # so validation always parses (and caches) whole rows
+            df = next(read_shard(path, config.DATASET_SCHEMAS[name], quarantine=quarantine))
+            if store is not None:
+                store.write(path, df, options)
+            return df[columns]
+
+        df = next(read_shard(path, missing))
+        if store is not None:
+            store.write(path, df, options)
+        if cached is not None:
+            df = pd.concat([cached, df], axis=1)
+        # Parsed and stored shards order their columns alike, so they combine
+        return df[columns]
+
+    def _load_filtered_file(
+        self, name: str, path: Path, schema: Dict[str, str], row_filter: RowFilter
+    ) -> pd.DataFrame:
+        """
+        The rows of one shard passing ``row_filter``, read from the partition
+        store (partitions that cannot match are skipped) when the disk cache
+        is on. The first filtered run parses the whole shard to build it.
+        """
+        full_schema = config.DATASET_SCHEMAS[name]
+        columns = parsed_columns(schema)
+        if config.USE_DISK_CACHE:
+            store = PartitionStore(self.cache_dir / "partitions")
+            options = self._parse_options(name)
+            df = store.read(path, row_filter, options, columns)
+            if df is None:
+                parsed = next(read_shard(path, full_schema, quarantine=self._quarantine()))
+                store.write(path, parsed, options)
+                df = store.read(path, row_filter, options, columns)
+            return df
+
+        needed = project_schema(full_schema, set(schema) | set(row_filter.columns))
+        quarantine = self._quarantine()
+        if quarantine is not None:
+            needed = full_schema
+        df = next(read_shard(path, needed, quarantine=quarantine))
+        return df.loc[row_filter.mask(df), columns].reset_index(drop=True)
+
+    def row_filter(self) -> RowFilter:
+        """Rows to load, from config.DATE_FROM / DATE_TO / STATES."""
+        return RowFilter(config.DATE_FROM, config.DATE_TO, config.STATES)
 
     def get_all_data(self) -> Dict[str, pd.DataFrame]:
         return {
@@ -65,7 +372,226 @@ class DataLoader:
             "enrollment": self.enrollment,
         }
 
-    def clear_cache(self):
-        self._demographic = None
-        self._biometric = None
-        self._enrollment = None
+    def rollup(self, dataset: str, level: str = "total") -> pd.DataFrame:
+        """
+        Sums of the dataset's projected count columns, plus ``rows``, per
+        ``level`` key.
+
+        Every level the projection allows is built along with ``level``,
+        in one pass over the rows (see MultiRollup): from the loaded frame,
+        or in streaming mode (config.STREAMING) straight from the CSV shards
+        chunk by chunk, without ever materialising the full frame. With the
+        disk cache on, rollups are persisted and only shards added since the
+        last run are aggregated. With config.CUBE_QUERIES, rollups (filtered
+        or not) are answered from the dataset's cube instead (see ``cube``).
+        """
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"Unknown rollup level: {level}")
+
+        with self._dataset_locks[dataset]:
+            schema = config.DATASET_SCHEMAS[dataset]
+            values = [column for column in count_columns(schema) if column in self.columns(dataset)]
+
+            key = (dataset, level)
+            if self._has_rollup(dataset, level, values):
+                return self._rollups[key]
+
+            levels = self._pending_levels(dataset, level, values)
+            if config.CUBE_QUERIES and level != CUBE_LEVEL:
+                cube = self.cube(dataset)
+                rollups = {name: cube.rollup(name, self.row_filter(), values) for name in levels}
+            elif self.row_filter().active or not (config.USE_DISK_CACHE or config.STREAMING):
+                # Stored rollups cover every row, so filtered runs aggregate
+                # the (pruned) filtered frame instead
+                columns = set(values).union(*(ROLLUP_LEVELS[name] for name in levels))
+                frame = self.load(dataset, [column for column in schema if column in columns])
+                rollups = MultiRollup(levels, values).update(frame).results()
+            elif config.USE_DISK_CACHE:
+                rollups = self._update_stored_rollups(dataset, levels)
+            else:
+                rollups = self._aggregate_files(dataset, self._dataset_files(dataset), levels)
+            for name, frame in rollups.items():
+                self._rollups[(dataset, name)] = frame
+            return self._rollups[key]
+
+    def _has_rollup(self, dataset: str, level: str, values: List[str]) -> bool:
+        cached = self._rollups.get((dataset, level))
+        return cached is not None and all(column in cached.columns for column in values)
+
+    def _pending_levels(self, dataset: str, level: str, values: List[str]) -> List[str]:
+        """
+        Levels to build together with ``level``: every level whose keys the
+        projection already parses and that is not built yet, as one pass
+        over the rows covers them all.
+        """
+        return [
+            name for name in self._covered_levels(dataset, ROLLUP_LEVELS[level])
+            if name == level or not self._has_rollup(dataset, name, values)
+        ]
+
+    def _covered_levels(self, dataset: str, extra: Iterable[str] = ()) -> List[str]:
+        """Levels whose keys are among the projected columns (plus ``extra``)."""
+        columns = set(self.columns(dataset)) | set(extra)
+        return [
+            name for name, keys in ROLLUP_LEVELS.items()
+            # The cube level is only built for the cube itself
+            if name != CUBE_LEVEL and set(keys) <= columns
+        ]
+
+    def cube(self, dataset: str) -> Cube:
+        """
+        The dataset's cube: sums of every count column per date and
+        location, over every row (whatever the row filter or projection).
+
+        With the disk cache on, the cube is stored and later runs only
+        aggregate the shards added since; otherwise it is built once per
+        loader. Shards are read chunk by chunk, as in streaming mode.
+        """
+        with self._dataset_locks[dataset]:
+            cube = self._cubes.get(dataset)
+            if cube is not None:
+                return cube
+
+            file_paths = self._dataset_files(dataset)
+            values = count_columns(config.DATASET_SCHEMAS[dataset])
+            if not config.USE_DISK_CACHE:
+                cube = Cube.build(self._cube_facts(dataset, file_paths), values)
+            else:
+                options = self._parse_options(dataset)
+                store = CubeStore(self.cache_dir / "cubes")
+                cube, new_paths = store.read_cube(dataset, file_paths, options)
+                if cube is None:
+                    cube = Cube.build(self._cube_facts(dataset, file_paths), values)
+                    store.write_cube(dataset, cube, file_paths, options)
+                elif new_paths:
+                    cube = cube.extend(self._cube_facts(dataset, new_paths))
+                    store.write_cube(dataset, cube, file_paths, options)
+            self._cubes[dataset] = cube
+            return cube
+
+    def _cube_facts(self, dataset: str, file_paths: List[Path]) -> pd.DataFrame:
+        """The rollup of ``file_paths`` at the full row key, from which cubes are built."""
+        return stream_rollups(
+            file_paths,
+            config.DATASET_SCHEMAS[dataset],
+            levels=[CUBE_LEVEL],
+            chunk_rows=config.STREAM_CHUNK_ROWS,
+            jobs=config.LOAD_JOBS,
+            quarantine=self._quarantine(),
+        )[CUBE_LEVEL]
+
+    def _update_stored_rollups(self, dataset: str, levels: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Bring the persisted ``levels`` rollups up to date with the dataset's
+        shards, aggregating only the shards missing from their manifests,
+        and return them by level.
+
+        Persisted rollups sum every count column, whatever the projection,
+        so later runs with other charts can reuse them.
+        """
+        schema = config.DATASET_SCHEMAS[dataset]
+        options = self._parse_options(dataset)
+        store = RollupStore(self.cache_dir / "rollups")
+        file_paths = self._dataset_files(dataset)
+
+        rollups = {}
+        # Levels grouped by the shards they still need
+        pending: Dict[Tuple[Path, ...], Dict[str, Optional[pd.DataFrame]]] = {}
+        for level in levels:
+            stored, new_paths = store.read(dataset, level, file_paths, options)
+            if stored is not None and not new_paths:
+                rollups[level] = stored
+            else:
+                pending.setdefault(tuple(new_paths), {})[level] = stored
+
+        for new_paths, stored_levels in pending.items():
+            parts = self._aggregate_files(dataset, list(new_paths), list(stored_levels), count_columns(schema))
+            for level, stored in stored_levels.items():
+                aggregate = PartialAggregate(ROLLUP_LEVELS[level], count_columns(schema))
+                if stored is not None:
+                    aggregate.update(stored)
+                frame = aggregate.update(parts[level]).result()
+                store.write(dataset, level, frame, file_paths, options)
+                rollups[level] = frame
+        return rollups
+
+    def _aggregate_files(
+        self,
+        dataset: str,
+        file_paths: List[Path],
+        levels: List[str],
+        values: Optional[List[str]] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Rollups of just ``file_paths`` at each of ``levels``, summing
+        ``values`` (default: the projected count columns).
+        """
+        schema = config.DATASET_SCHEMAS[dataset]
+        if values is None:
+            values = [column for column in count_columns(schema) if column in self.columns(dataset)]
+        columns = set(values).union(*(ROLLUP_LEVELS[level] for level in levels))
+        schema = project_schema(schema, columns)
+
+        if config.STREAMING:
+            quarantine = self._quarantine()
+            return stream_rollups(
+                file_paths,
+                # Validation judges whole rows (see _load_file)
+                config.DATASET_SCHEMAS[dataset] if quarantine is not None else schema,
+                levels=levels,
+                chunk_rows=config.STREAM_CHUNK_ROWS,
+                jobs=config.LOAD_JOBS,
+                quarantine=quarantine,
+                values=values,
+            )
+        frame = self._load_dataset(dataset, file_paths, schema)
+        if config.CONSOLIDATE_ROWS:
+            frame = consolidate_rows(frame, values)
+        return MultiRollup(levels, values).update(frame).results()
+
+    def get_rollup_data(
+        self, level: str = "total", requires: Optional[Requirements] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Rollups at ``level`` for every dataset, or, given ``requires``, only
+        for the datasets it names, after adding its columns to the projection.
+
+        State and district labels are replaced by the integer keys of
+        ``dimensions`` (state_id, district_id).
+        """
+        if requires is None:
+            names = DATASETS
+        else:
+            self.project(requires)
+            names = list(requires)
+        return {name: self._dimensions.encode(self.rollup(name, level)) for name in names}
+
+    def clear_cache(self, disk: bool = False):
+        """
+        Drop the in-memory datasets, and if ``disk`` everything cached on
+        disk from the data: the column, rollup, frame, partition and cube
+        stores, processor results and memoised cluster fits.
+        """
+        with self._lock:
+            prefetches, self._prefetches = self._prefetches, {}
+        wait(list(prefetches.values()))
+        for lock in self._dataset_locks.values():
+            lock.acquire()
+        try:
+            self._frames = {}
+            self._rollups = {}
+            self._cubes = {}
+            self.generation += 1
+            if disk:
+                ColumnStore(self.cache_dir).clear()
+                RollupStore(self.cache_dir / "rollups").clear()
+                RollupStore(self.cache_dir / "frames").clear()
+                PartitionStore(self.cache_dir / "partitions").clear()
+                CubeStore(self.cache_dir / "cubes").clear()
+                # Imported here: processors import this module
+                from src.processors import ClusteringProcessor, ResultCache
+                ResultCache.purge(self.cache_dir)
+                ClusteringProcessor.clear_fits(self.cache_dir)
+        finally:
+            for lock in self._dataset_locks.values():
+                lock.release()
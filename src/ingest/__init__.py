@@ -0,0 +1,68 @@
+"""Ingestion helpers used by the data loader."""
+from .column_store import ColumnStore, file_fingerprint
+from .combine import combine_frames
+from .cube import Cube, CubeStore
+from .dates import DATE_PART_COLUMNS, add_date_parts, decode_dates
+from .dimensions import Dimensions
+from .partitions import PartitionStore, RowFilter
+from .rollup_store import RollupStore
+from .rollups import (
+    CUBE_LEVEL,
+    ROLLUP_LEVELS,
+    ROW_KEY,
+    ROWS_COLUMN,
+    MultiRollup,
+    PartialAggregate,
+    consolidate_rows,
+    sum_by_pincode,
+)
+from .schema import (
+    apply_schema,
+    count_columns,
+    count_dtype,
+    parsed_columns,
+    project_schema,
+    read_dtypes,
+    unify_categories,
+)
+from .sources import find_shards, open_shard, shard_key
+from .streaming import stream_rollups
+from .validation import REASONS, Quarantine, read_shard, validate_rows
+
+__all__ = [
+    "ColumnStore",
+    "file_fingerprint",
+    "combine_frames",
+    "Cube",
+    "CubeStore",
+    "DATE_PART_COLUMNS",
+    "add_date_parts",
+    "decode_dates",
+    "Dimensions",
+    "PartitionStore",
+    "RowFilter",
+    "RollupStore",
+    "CUBE_LEVEL",
+    "ROLLUP_LEVELS",
+    "ROW_KEY",
+    "ROWS_COLUMN",
+    "MultiRollup",
+    "PartialAggregate",
+    "consolidate_rows",
+    "sum_by_pincode",
+    "apply_schema",
+    "count_columns",
+    "count_dtype",
+    "parsed_columns",
+    "project_schema",
+    "read_dtypes",
+    "unify_categories",
+    "find_shards",
+    "open_shard",
+    "shard_key",
+    "stream_rollups",
+    "REASONS",
+    "Quarantine",
+    "read_shard",
+    "validate_rows",
+]
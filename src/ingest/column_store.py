@@ -0,0 +1,255 @@
+"""
+Column Store
+On-disk columnar cache of parsed CSV shards.
+Layout (one directory per source file):
+  - meta.json: source fingerprint (path, size, mtime, sha256) and column dtypes
+  - <column>.npy: numeric and datetime columns, and period columns as their
+    int64 ordinals
+  - <column>.codes.npy / <column>.values.npy: string and categorical columns,
+    dictionary encoded (categorical codes keep pandas' own code width, so
+    they can be memory-mapped and used as they are)
+An entry may hold only some of a file's columns; writing more columns for
+an unchanged source adds them to the entry, and reads can ask for a subset.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .sources import open_shard, shard_key
+
+FORMAT_VERSION = 2
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_fingerprint(path: Path, with_hash: bool = True) -> Dict[str, Any]:
+    """
+    Identify a source file by path, size, mtime and (optionally) content hash.
+
+    Path and hash are those of the shard (see ``shard_key``), so a plain and
+    a compressed copy of the same CSV have the same identity.
+    """
+    stat = path.stat()
+    fingerprint = {
+        "path": str(shard_key(path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    if with_hash:
+        fingerprint["sha256"] = _content_hash(path)
+    return fingerprint
+
+
+def source_unchanged(path: Path, cached: Dict[str, Any]) -> bool:
+    """
+    Whether ``path`` still matches the fingerprint ``cached``.
+
+    Size and mtime are compared first; the content hash is only computed
+    when they disagree, so a touched-but-unchanged file, or a shard swapped
+    for a compressed copy of itself, still matches (and ``cached`` is
+    updated to the new size and mtime).
+    """
+    if not path.exists():
+        return False
+    current = file_fingerprint(path, with_hash=False)
+    if current["path"] != cached["path"]:
+        return False
+    if current["size"] != cached["size"] or current["mtime_ns"] != cached["mtime_ns"]:
+        if _content_hash(path) != cached["sha256"]:
+            return False
+        cached["size"] = current["size"]
+        cached["mtime_ns"] = current["mtime_ns"]
+    return True
+
+
+def write_column(directory: Path, name: str, series: pd.Series) -> None:
+    """Save one column as ``<name>.npy``, or dictionary encoded for non-numeric dtypes."""
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_dtype(series):
+        np.save(directory / f"{name}.npy", series.to_numpy())
+        return
+    if isinstance(series.dtype, pd.PeriodDtype):
+        np.save(directory / f"{name}.npy", series.array.asi8)
+        return
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+        codes = codes.astype(np.int32)
+    np.save(directory / f"{name}.codes.npy", codes)
+    np.save(directory / f"{name}.values.npy", np.asarray(uniques, dtype=str))
+
+
+def read_column(directory: Path, name: str, dtype: str, mmap: bool = False) -> pd.Series:
+    """
+    Load a column saved by ``write_column``; ``dtype`` is the original dtype's name.
+
+    With ``mmap``, numeric, datetime, period and categorical columns are
+    read-only views of the memory-mapped files rather than copies (other
+    dictionary encoded columns are still decoded into memory).
+    """
+    plain = directory / f"{name}.npy"
+    if plain.exists():
+        values = _load_array(plain, mmap)
+        if dtype.startswith("period"):
+            values = pd.arrays.PeriodArray(values, dtype=dtype)
+        return pd.Series(values, name=name, copy=False)
+
+    codes = _load_array(directory / f"{name}.codes.npy", mmap)
+    values = np.load(directory / f"{name}.values.npy")
+    if dtype == "category":
+        return pd.Series(pd.Categorical.from_codes(codes, categories=values), name=name, copy=False)
+
+    # Convert the dictionary, not the rows (e.g. "2025-12" -> Period)
+    uniques = pd.Index(values).astype(dtype).array
+    return pd.Series(pd.api.extensions.take(uniques, codes, allow_fill=True), name=name)
+
+
+def _load_array(path: Path, mmap: bool) -> np.ndarray:
+    if not mmap:
+        return np.load(path)
+    # A plain ndarray view keeps the mapping alive without np.memmap's
+    # subclass semantics leaking into pandas results
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+def _content_hash(path: Path) -> str:
+    """sha256 of the (decompressed) CSV bytes."""
+    digest = hashlib.sha256()
+    with open_shard(path) as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ColumnStore:
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def entry_dir(self, path: Path) -> Path:
+        shard = shard_key(path)
+        key = hashlib.sha1(str(shard.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.root / f"{shard.stem}-{key}"
+
+    def read(
+        self,
+        path: Path,
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Return the cached frame for ``path`` (only ``columns`` if given), or
+        None if missing, stale, or lacking any of the requested columns.
+
+        Size and mtime are compared first; the content hash is only computed
+        when they disagree, so a touched-but-unchanged file is still a hit.
+        """
+        entry = self.entry_dir(path)
+        meta = self._valid_meta(path, entry, options)
+        if meta is None:
+            return None
+
+        stored = meta["columns"]
+        names = list(stored) if columns is None else list(columns)
+        if any(name not in stored for name in names):
+            return None
+        return pd.DataFrame(
+            {name: read_column(entry, name, stored[name]) for name in names}
+        )
+
+    def cached_columns(self, path: Path, options: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Columns held for ``path``; empty if nothing valid is cached."""
+        meta = self._valid_meta(path, self.entry_dir(path), options)
+        return list(meta["columns"]) if meta is not None else []
+
+    def write(self, path: Path, df: pd.DataFrame, options: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Cache ``df`` as the parsed contents of ``path``.
+
+        Columns already cached for the same (unchanged) source and options
+        are kept, so projected loads fill an entry in column by column.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = self.entry_dir(path)
+        previous = self._valid_meta(path, entry, options)
+        kept = {}
+        if previous is not None:
+            kept = {name: dtype for name, dtype in previous["columns"].items() if name not in df.columns}
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "source": previous["source"] if previous is not None else file_fingerprint(path),
+            "options": options or {},
+            "columns": {**kept, **{name: str(df[name].dtype) for name in df.columns}},
+        }
+
+        # Build the entry next to its final location and swap it in, so a
+        # crashed or concurrent run never sees a half-written entry.
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+        try:
+            for name in kept:
+                self._copy_column(entry, staging, name)
+            for name in df.columns:
+                write_column(staging, name, df[name])
+            self._write_meta(staging, meta)
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+    def invalidate(self, path: Path) -> None:
+        shutil.rmtree(self.entry_dir(path), ignore_errors=True)
+
+    def clear(self) -> None:
+        # Only the entries: the root is also the loader's cache directory,
+        # holding its other stores and those of loaders with their own root
+        if not self.root.is_dir():
+            return
+        for entry in self.root.iterdir():
+            if (entry / "meta.json").is_file():
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _valid_meta(
+        self, path: Path, entry: Path, options: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """The entry's metadata if it was written for the current ``path`` with ``options``."""
+        meta = self._read_meta(entry)
+        if meta is None or meta["options"] != (options or {}):
+            return None
+
+        mtime_ns = meta["source"]["mtime_ns"]
+        if not source_unchanged(path, meta["source"]):
+            return None
+        if meta["source"]["mtime_ns"] != mtime_ns:
+            self._write_meta(entry, meta)
+        return meta
+
+    def _read_meta(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry / "meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("format") != FORMAT_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, entry: Path, meta: Dict[str, Any]) -> None:
+        with open(entry / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def _copy_column(self, source: Path, target: Path, name: str) -> None:
+        for filename in (f"{name}.npy", f"{name}.codes.npy", f"{name}.values.npy"):
+            if (source / filename).exists():
+                shutil.copy2(source / filename, target / filename)
@@ -0,0 +1,57 @@
+"""
+Frame Assembly
+Concatenates parsed shards into preallocated column arrays instead of
+going through ``pd.concat``. Each shard column is dropped as soon as it has
+been copied, so peak memory stays close to one copy of the combined frame.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+def combine_frames(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Row-wise concatenation of ``dfs`` (same result as ``pd.concat(..., ignore_index=True)``).
+
+    Categorical columns must already share categories (see ``unify_categories``).
+    The input frames are emptied in the process.
+    """
+    columns = list(dfs[0].columns)
+    for df in dfs[1:]:
+        if list(df.columns) != columns:
+            raise ValueError(f"Shard columns differ: {list(df.columns)} != {columns}")
+
+    offsets = np.cumsum([0] + [len(df) for df in dfs])
+    total = int(offsets[-1])
+
+    combined = {}
+    for column in columns:
+        parts = [df[column] for df in dfs]
+        combined[column] = _combine_column(parts, offsets, total)
+        for df in dfs:
+            del df[column]
+        del parts
+
+    return pd.DataFrame(combined, columns=columns)
+
+
+def _combine_column(parts: List[pd.Series], offsets: np.ndarray, total: int) -> pd.Series:
+    dtype = parts[0].dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        if any(part.dtype != dtype for part in parts):
+            raise ValueError(f"Column '{parts[0].name}' has mismatched categories")
+        codes = np.empty(total, dtype=parts[0].cat.codes.dtype)
+        for part, start, stop in zip(parts, offsets[:-1], offsets[1:]):
+            codes[start:stop] = part.cat.codes.to_numpy()
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), name=parts[0].name)
+
+    if all(isinstance(part.dtype, np.dtype) for part in parts):
+        values = np.empty(total, dtype=np.result_type(*[part.dtype for part in parts]))
+        for part, start, stop in zip(parts, offsets[:-1], offsets[1:]):
+            values[start:stop] = part.to_numpy()
+        return pd.Series(values, name=parts[0].name)
+
+    # Extension dtypes outside the schema (e.g. pandas strings)
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,318 @@
+"""
+Cube
+Materialised sums of a dataset's count columns (plus ``rows``) per date and
+location (state, district, pincode), from which the rollup of any date
+range and set of states is answered without touching the rows.
+Arrays:
+  - state and district prefix sums over the days: [day, state or district,
+    value], with a leading zero day, so a date range costs one subtraction
+    (date, state, district and total rollups)
+  - facts: the (location, date) sums sorted by location then date, with
+    their running totals, so a date range costs two binary searches per
+    location (location and pincode rollups)
+Cubes are built from a dataset's "cube" rollup (keyed by the full row key)
+and stored under CACHE_DIR/cubes with a manifest of the shards folded in,
+as rollups are. New shards are aggregated on their own and merged in; when
+they only add later days for known states and districts, the stored prefix
+sums are extended by the new days instead of being recomputed.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dates import add_date_parts
+from .partitions import RowFilter
+from .rollup_store import FORMAT_VERSION, RollupStore
+from .rollups import CUBE_LEVEL, ROLLUP_LEVELS, ROWS_COLUMN, PartialAggregate
+
+_ARRAYS = (
+    "days",
+    "district_states",
+    "location_districts",
+    "location_pincodes",
+    "fact_keys",
+    "fact_totals",
+    "state_prefix",
+    "district_prefix",
+)
+
+# Fact keys are location * _DAY_SPAN + day (days since 1970-01-01)
+_DAY_SPAN = 1 << 20
+
+_NS_PER_DAY = 24 * 3600 * 10 ** 9
+
+
+class Cube:
+
+    def __init__(
+        self,
+        value_columns: Sequence[str],
+        date_dtype: str,
+        states: List[str],
+        districts: List[str],
+        arrays: Dict[str, Optional[np.ndarray]],
+    ):
+        self.value_columns = list(value_columns)
+        self.date_dtype = date_dtype
+        # Sorted state labels; district i is districts[i] of states[district_states[i]]
+        self.states = states
+        self.districts = districts
+        # Days with any rows, sorted
+        self.days: np.ndarray = arrays["days"]
+        self.district_states: np.ndarray = arrays["district_states"]
+        self.location_districts: np.ndarray = arrays["location_districts"]
+        self.location_pincodes: np.ndarray = arrays["location_pincodes"]
+        self.fact_keys: np.ndarray = arrays["fact_keys"]
+        # Running totals of the facts' values, with a leading zero row
+        self.fact_totals: np.ndarray = arrays["fact_totals"]
+        self.state_prefix: np.ndarray = arrays["state_prefix"]
+        self.district_prefix: np.ndarray = arrays["district_prefix"]
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in _ARRAYS}
+
+    @property
+    def columns(self) -> List[str]:
+        return self.value_columns + [ROWS_COLUMN]
+
+    @classmethod
+    def build(cls, facts: pd.DataFrame, value_columns: Sequence[str]) -> Cube:
+        """The cube of a "cube" rollup (keys, ``value_columns``, rows, date parts)."""
+        cube = cls._from_facts(facts, value_columns)
+        cube.state_prefix, cube.district_prefix = cube._prefix_sums(cube._facts(), cube.days)
+        return cube
+
+    @classmethod
+    def _from_facts(cls, facts: pd.DataFrame, value_columns: Sequence[str]) -> Cube:
+        # Everything but the prefix sums
+        columns = list(value_columns) + [ROWS_COLUMN]
+        state_codes, states = pd.factorize(facts["state"].astype(str), sort=True)
+        districts = pd.MultiIndex.from_arrays([state_codes, facts["district"].astype(str)])
+        district_codes, district_index = pd.factorize(districts, sort=True)
+        locations = pd.MultiIndex.from_arrays([district_codes, facts["pincode"].to_numpy()])
+        location_codes, location_index = pd.factorize(locations, sort=True)
+
+        keys = location_codes.astype(np.int64) * _DAY_SPAN + facts["day_index"].to_numpy(dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        return cls(
+            columns[:-1],
+            str(facts["date"].dtype),
+            [str(state) for state in states],
+            [str(district) for district in district_index.get_level_values(1)],
+            {
+                "days": np.unique(keys % _DAY_SPAN),
+                "district_states": district_index.get_level_values(0).to_numpy(dtype=np.int32),
+                "location_districts": location_index.get_level_values(0).to_numpy(dtype=np.int32),
+                "location_pincodes": location_index.get_level_values(1).to_numpy(),
+                "fact_keys": keys[order],
+                "fact_totals": _running_totals(facts[columns].to_numpy(dtype=np.int64)[order]),
+                "state_prefix": None,
+                "district_prefix": None,
+            },
+        )
+
+    def extend(self, facts: pd.DataFrame) -> Cube:
+        """
+        This cube with the "cube" rollup of further shards folded in.
+
+        When the new facts all fall after the last day held and bring no new
+        state or district, only they are summed into the prefix sums, which
+        grow by the new days; otherwise the prefix sums are recomputed from
+        the merged facts. Either way no rows are read.
+        """
+        if facts.empty:
+            return self
+        new_days = facts["day_index"].to_numpy(dtype=np.int64)
+        known = set(zip((self.states[code] for code in self.district_states), self.districts))
+        appended = (
+            len(self.days) > 0
+            and new_days.min() > self.days[-1]
+            and set(zip(facts["state"].astype(str), facts["district"].astype(str))) <= known
+        )
+        merged = PartialAggregate(ROLLUP_LEVELS[CUBE_LEVEL], self.value_columns).update(self.facts()).update(facts)
+        if not appended:
+            return Cube.build(merged.result(), self.value_columns)
+
+        # Same states and districts, so the stored prefix sums still line up
+        cube = Cube._from_facts(merged.result(), self.value_columns)
+        locations, days, values = cube._facts()
+        new = days > self.days[-1]
+        state_tail, district_tail = cube._prefix_sums((locations[new], days[new], values[new]), np.unique(new_days))
+        cube.state_prefix = np.concatenate([self.state_prefix, self.state_prefix[-1] + state_tail[1:]])
+        cube.district_prefix = np.concatenate([self.district_prefix, self.district_prefix[-1] + district_tail[1:]])
+        return cube
+
+    def facts(self) -> pd.DataFrame:
+        """The cube's facts, as the "cube" rollup it was built from."""
+        locations, days, values = self._facts()
+        districts = self.location_districts[locations]
+        frame = pd.DataFrame({
+            "date": self._dates(days),
+            "state": self._labels(self.states, self.district_states[districts]),
+            "district": self._labels(self.districts, districts),
+            "pincode": self.location_pincodes[locations],
+        })
+        for position, column in enumerate(self.columns):
+            frame[column] = values[:, position]
+        return add_date_parts(frame)
+
+    def rollup(self, level: str, row_filter: RowFilter, values: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        The ``level`` rollup of the rows passing ``row_filter``, summing
+        ``values`` (default: every value column), as PartialAggregate would
+        build it from those rows.
+        """
+        values = self.value_columns if values is None else list(values)
+        positions = [self.columns.index(column) for column in values + [ROWS_COLUMN]]
+        start, stop = self._day_range(row_filter)
+        allowed = row_filter.allows_states(self.states)
+
+        if level in ("location", "pincode"):
+            frame = self._location_rollup(start, stop, allowed, positions, values)
+            if level == "pincode":
+                frame = PartialAggregate(ROLLUP_LEVELS[level], values).update(frame).result()
+            return frame
+
+        if level == "district":
+            sums = (self.district_prefix[stop] - self.district_prefix[start])[:, positions]
+            codes = np.flatnonzero(allowed[self.district_states] & (sums[:, -1] > 0))
+            keys = {
+                "state": self._labels(self.states, self.district_states[codes]),
+                "district": self._labels(self.districts, codes),
+            }
+            return self._frame(keys, sums[codes], values)
+
+        # Per day and state
+        sums = np.diff(self.state_prefix[start:stop + 1], axis=0)[:, :, positions]
+        if level == "date":
+            daily = sums[:, allowed].sum(axis=1)
+            kept = np.flatnonzero(daily[:, -1] > 0)
+            return add_date_parts(self._frame({"date": self._dates(self.days[start + kept])}, daily[kept], values))
+        if level == "state":
+            totals = sums.sum(axis=0)
+            codes = np.flatnonzero(allowed & (totals[:, -1] > 0))
+            return self._frame({"state": self._labels(self.states, codes)}, totals[codes], values)
+        if level == "total":
+            return self._frame({}, sums[:, allowed].sum(axis=(0, 1))[None, :], values)
+        raise ValueError(f"The cube has no rollup level {level}")
+
+    def _location_rollup(
+        self, start: int, stop: int, allowed: np.ndarray, positions: List[int], values: List[str]
+    ) -> pd.DataFrame:
+        locations = np.flatnonzero(allowed[self.district_states[self.location_districts]])
+        if start < stop:
+            bases = locations.astype(np.int64) * _DAY_SPAN
+            low = np.searchsorted(self.fact_keys, bases + self.days[start])
+            high = np.searchsorted(self.fact_keys, bases + self.days[stop - 1], side="right")
+        else:
+            low = high = np.zeros(len(locations), dtype=np.intp)
+        sums = (self.fact_totals[high] - self.fact_totals[low])[:, positions]
+        kept = sums[:, -1] > 0
+        locations, sums = locations[kept], sums[kept]
+        districts = self.location_districts[locations]
+        keys = {
+            "state": self._labels(self.states, self.district_states[districts]),
+            "district": self._labels(self.districts, districts),
+            "pincode": self.location_pincodes[locations],
+        }
+        return self._frame(keys, sums, values)
+
+    def _frame(self, keys: Dict[str, Any], sums: np.ndarray, values: List[str]) -> pd.DataFrame:
+        frame = pd.DataFrame(keys, index=pd.RangeIndex(len(sums)))
+        for position, column in enumerate(values + [ROWS_COLUMN]):
+            frame[column] = sums[:, position].astype(np.int64)
+        return frame
+
+    @staticmethod
+    def _labels(labels: List[str], codes: np.ndarray) -> pd.Categorical:
+        return pd.Categorical(np.asarray(labels, dtype=object)[codes])
+
+    def _dates(self, days: np.ndarray) -> np.ndarray:
+        return days.astype("datetime64[D]").astype(self.date_dtype)
+
+    def _day_range(self, row_filter: RowFilter) -> Tuple[int, int]:
+        """[start, stop) positions in ``days`` of the filter's date range."""
+        start, stop = 0, len(self.days)
+        if row_filter.date_from is not None:
+            day = -(-row_filter.date_from.value // _NS_PER_DAY)
+            start = int(np.searchsorted(self.days, day))
+        if row_filter.date_to is not None:
+            day = row_filter.date_to.value // _NS_PER_DAY
+            stop = int(np.searchsorted(self.days, day, side="right"))
+        return start, max(start, stop)
+
+    def _facts(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(locations, days, values) of the facts."""
+        return self.fact_keys // _DAY_SPAN, self.fact_keys % _DAY_SPAN, np.diff(self.fact_totals, axis=0)
+
+    def _prefix_sums(
+        self, facts: Tuple[np.ndarray, np.ndarray, np.ndarray], days: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """State and district prefix sums over ``days`` (sorted) of (locations, days, values) facts."""
+        locations, fact_days, values = facts
+        day_positions = np.searchsorted(days, fact_days).astype(np.int64)
+        districts = self.location_districts[locations]
+        prefixes = []
+        for codes, width in ((self.district_states[districts], len(self.states)), (districts, len(self.districts))):
+            cells = day_positions * width + codes
+            prefix = np.zeros((len(days) + 1, width, values.shape[1]), dtype=np.int64)
+            for position in range(values.shape[1]):
+                sums = np.bincount(cells, weights=values[:, position], minlength=len(days) * width)
+                prefix[1:, :, position] = sums.astype(np.int64).reshape(len(days), width)
+            prefixes.append(np.cumsum(prefix, axis=0, out=prefix))
+        return prefixes[0], prefixes[1]
+
+
+class CubeStore(RollupStore):
+    """Stored cubes, one entry per dataset, with a manifest of the shards folded in (as rollups)."""
+
+    def read_cube(
+        self, dataset: str, file_paths: List[Path], options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[Cube], List[Path]]:
+        """
+        Return (stored cube, shards not yet folded into it); the cube is
+        None, and every shard returned, when it must be built from scratch.
+        """
+        entry = self.entry_dir(dataset, CUBE_LEVEL)
+        manifest = self._read_manifest(entry)
+        new_paths = self._new_shards(entry, manifest, file_paths, options)
+        if new_paths is None:
+            return None, list(file_paths)
+        try:
+            arrays = {name: np.load(entry / f"{name}.npy") for name in _ARRAYS}
+        except (OSError, ValueError):
+            return None, list(file_paths)
+        cube = Cube(manifest["values"], manifest["date_dtype"], manifest["states"], manifest["districts"], arrays)
+        return cube, new_paths
+
+    def write_cube(
+        self, dataset: str, cube: Cube, file_paths: List[Path], options: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Store ``cube`` as the cube of exactly ``file_paths``."""
+        entry = self.entry_dir(dataset, CUBE_LEVEL)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "options": options or {},
+            "shards": self._fingerprints(entry, file_paths),
+            "values": cube.value_columns,
+            "date_dtype": cube.date_dtype,
+            "states": cube.states,
+            "districts": cube.districts,
+        }
+
+        def write_arrays(staging: Path) -> None:
+            for name, array in cube.arrays.items():
+                np.save(staging / f"{name}.npy", array)
+
+        self._replace_entry(entry, manifest, write_arrays)
+
+
+def _running_totals(values: np.ndarray) -> np.ndarray:
+    totals = np.zeros((len(values) + 1, values.shape[1]), dtype=np.int64)
+    np.cumsum(values, axis=0, out=totals[1:])
+    return totals
@@ -0,0 +1,58 @@
+"""
+Date Decoding
+The date column holds a few hundred distinct DD-MM-YYYY strings across
+millions of rows, so each distinct string is parsed once and the result is
+mapped back to the rows by dictionary code.
+Derived columns (added once at load so processors don't re-derive them):
+  - weekday: 0=Monday ... 6=Sunday (uint8)
+  - month: calendar month (period[M])
+  - day_index: days since 1970-01-01 (int32), stable across shards
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+
+DATE_PART_COLUMNS = ("weekday", "month", "day_index")
+
+
+def decode_dates(df: pd.DataFrame, column: str = "date", fmt: Optional[str] = None) -> pd.DataFrame:
+    """Parse ``df[column]`` in place and add the derived date-part columns."""
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    if (codes < 0).any():
+        raise ValueError(f"Column '{column}' has missing dates")
+
+    fmt = fmt or config.DATE_FORMAT
+    parsed = pd.DatetimeIndex(pd.to_datetime(uniques, format=fmt, errors="coerce"))
+    # Categories no row uses (e.g. left behind by validation) may not parse
+    if parsed.hasnans:
+        if parsed.isna()[codes].any():
+            raise ValueError(f"Column '{column}' has dates not in the format {fmt}")
+        # No row takes them, but NaT has no weekday or day index to cast
+        parsed = parsed.fillna(pd.Timestamp(0))
+    unit = np.datetime_data(parsed.dtype)[0]
+    ticks_per_day = np.timedelta64(1, "D") // np.timedelta64(1, unit)
+
+    df[column] = parsed.array.take(codes)
+    df["weekday"] = parsed.dayofweek.to_numpy().astype(np.uint8)[codes]
+    df["month"] = parsed.to_period("M").array.take(codes)
+    df["day_index"] = (parsed.asi8 // ticks_per_day).astype(np.int32)[codes]
+    return df
+
+
+def add_date_parts(df: pd.DataFrame, column: str = "date") -> pd.DataFrame:
+    """Derive the date-part columns from an already parsed date column (small frames)."""
+    dates = pd.DatetimeIndex(df[column])
+    unit = np.datetime_data(dates.dtype)[0]
+    ticks_per_day = np.timedelta64(1, "D") // np.timedelta64(1, unit)
+
+    df["weekday"] = dates.dayofweek.to_numpy().astype(np.uint8)
+    df["month"] = dates.to_period("M").array
+    df["day_index"] = (dates.asi8 // ticks_per_day).astype(np.int32)
+    return df
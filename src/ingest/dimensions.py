@@ -0,0 +1,115 @@
+"""
+Dimension Tables
+Integer ids for the location labels, so fact tables (rollups) can carry
+small integer keys and labels are joined back only for the rows shown.
+Tables:
+  - states: state_id, state
+  - districts: district_id, state_id, district (a district is a
+    (state, district) pair, as names repeat across states)
+Pincodes are already integers and stay as they are.
+Ids are assigned on first sight and never change, so frames encoded at
+different times (e.g. different datasets) share them. Encoding is safe
+from several threads at once.
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Dimensions:
+
+    def __init__(self):
+        self._states: List[str] = []
+        self._state_index: Dict[str, int] = {}
+        self._districts: List[Tuple[int, str]] = []
+        self._district_index: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def states(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "state_id": np.arange(len(self._states), dtype=np.int32),
+            "state": self._states,
+        })
+
+    @property
+    def districts(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "district_id": np.arange(len(self._districts), dtype=np.int32),
+            "state_id": np.array([state_id for state_id, _ in self._districts], dtype=np.int32),
+            "district": [district for _, district in self._districts],
+        })
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replace ``state``/``district`` label columns with ``state_id``/``district_id``.
+
+        Labels are looked up once per distinct value (or per distinct
+        state/district pair), never per row.
+        """
+        if "state" not in df.columns:
+            return df
+
+        state_codes, state_labels = _codes(df["state"])
+        encoded = {}
+        if "district" in df.columns:
+            district_codes, district_labels = _codes(df["district"])
+            width = max(len(district_labels), 1)
+            pairs = state_codes.astype(np.int64) * width + district_codes
+            unique_pairs, pair_codes = np.unique(pairs, return_inverse=True)
+
+        with self._lock:
+            # Only labels that occur get an id (categoricals may carry unused ones)
+            state_ids = np.full(len(state_labels), -1, dtype=np.int32)
+            for code in np.unique(state_codes):
+                state_ids[code] = self._state_id(state_labels[code])
+            encoded["state_id"] = state_ids[state_codes]
+
+            if "district" in df.columns:
+                district_ids = np.array([
+                    self._district_id(int(state_ids[pair // width]), district_labels[pair % width])
+                    for pair in unique_pairs
+                ], dtype=np.int32)
+                encoded["district_id"] = district_ids[pair_codes]
+
+        rest = df.drop(columns=[column for column in ("state", "district") if column in df.columns])
+        return pd.concat([pd.DataFrame(encoded, index=df.index), rest], axis=1)
+
+    def state_names(self, state_ids: Iterable[int]) -> np.ndarray:
+        return np.asarray(self._states, dtype=object)[np.asarray(state_ids, dtype=np.intp)]
+
+    def district_names(self, district_ids: Iterable[int]) -> np.ndarray:
+        names = np.asarray([district for _, district in self._districts], dtype=object)
+        return names[np.asarray(district_ids, dtype=np.intp)]
+
+    def district_states(self, district_ids: Iterable[int]) -> np.ndarray:
+        """state_id of each district."""
+        states = np.asarray([state_id for state_id, _ in self._districts], dtype=np.int32)
+        return states[np.asarray(district_ids, dtype=np.intp)]
+
+    def _state_id(self, label: str) -> int:
+        if label not in self._state_index:
+            self._state_index[label] = len(self._states)
+            self._states.append(label)
+        return self._state_index[label]
+
+    def _district_id(self, state_id: int, label: str) -> int:
+        key = (state_id, label)
+        if key not in self._district_index:
+            self._district_index[key] = len(self._districts)
+            self._districts.append(key)
+        return self._district_index[key]
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes and the distinct labels they index, without a per-row pass in Python."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if (series.cat.codes < 0).any():
+            raise ValueError(f"Column '{series.name}' has missing values")
+        return series.cat.codes.to_numpy(), [str(label) for label in series.cat.categories]
+    codes, uniques = pd.factorize(series, sort=True)
+    if (codes < 0).any():
+        raise ValueError(f"Column '{series.name}' has missing values")
+    return codes, [str(label) for label in uniques]
@@ -0,0 +1,214 @@
+"""
+Partition Store
+On-disk copy of parsed CSV shards split by month and state, so runs over a
+date range or a few states read only the partitions that can match.
+Layout (one directory per source file):
+  - index.json: source fingerprint, column dtypes, and per partition its
+    month, state, row count and min/max date
+  - <partition>/<column>.npy ...: the partition's rows, stored as in the
+    column store
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .column_store import file_fingerprint, read_column, source_unchanged, write_column
+from .combine import combine_frames
+from .schema import unify_categories
+from .sources import shard_key
+
+FORMAT_VERSION = 1
+
+
+def _state_key(name: str) -> str:
+    return " ".join(str(name).split()).casefold()
+
+
+class RowFilter:
+    """Rows to keep: an inclusive date range and a set of states (None: no bound)."""
+
+    def __init__(
+        self,
+        date_from: Optional[pd.Timestamp] = None,
+        date_to: Optional[pd.Timestamp] = None,
+        states: Optional[Iterable[str]] = None,
+    ):
+        self.date_from = pd.Timestamp(date_from) if date_from is not None else None
+        self.date_to = pd.Timestamp(date_to) if date_to is not None else None
+        self.states = None if states is None else {_state_key(state) for state in states}
+
+    @property
+    def active(self) -> bool:
+        return self.date_from is not None or self.date_to is not None or self.states is not None
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns the filter needs to look at."""
+        columns = []
+        if self.date_from is not None or self.date_to is not None:
+            columns.append("date")
+        if self.states is not None:
+            columns.append("state")
+        return columns
+
+    def can_match(self, partition: Dict[str, Any]) -> bool:
+        """Whether any row of a partition (by its index entry) may pass."""
+        if self.states is not None and _state_key(partition["state"]) not in self.states:
+            return False
+        if self.date_from is not None and pd.Timestamp(partition["date_max"]) < self.date_from:
+            return False
+        if self.date_to is not None and pd.Timestamp(partition["date_min"]) > self.date_to:
+            return False
+        return True
+
+    def covers(self, partition: Dict[str, Any]) -> bool:
+        """Whether every row of a matching partition passes the date bounds."""
+        if self.date_from is not None and pd.Timestamp(partition["date_min"]) < self.date_from:
+            return False
+        if self.date_to is not None and pd.Timestamp(partition["date_max"]) > self.date_to:
+            return False
+        return True
+
+    def allows_states(self, labels: Iterable[str]) -> np.ndarray:
+        """Boolean mask of the state ``labels`` passing the filter."""
+        return np.array([self.states is None or _state_key(label) in self.states for label in labels], dtype=bool)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        keep = np.ones(len(df), dtype=bool)
+        if self.date_from is not None:
+            keep &= (df["date"] >= self.date_from).to_numpy()
+        if self.date_to is not None:
+            keep &= (df["date"] <= self.date_to).to_numpy()
+        if self.states is not None:
+            states = df["state"].astype("category")
+            codes = states.cat.codes.to_numpy()
+            keep &= np.append(self.allows_states(states.cat.categories), False)[codes]
+        return keep
+
+
+class PartitionStore:
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def entry_dir(self, path: Path) -> Path:
+        shard = shard_key(path)
+        key = hashlib.sha1(str(shard.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.root / f"{shard.stem}-{key}"
+
+    def read(
+        self,
+        path: Path,
+        row_filter: RowFilter,
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Rows of ``path`` passing ``row_filter`` (only ``columns`` if given),
+        or None if nothing valid is stored.
+
+        Partitions whose state or min/max date rule them out are not read;
+        the date mask is only evaluated on partitions straddling a bound.
+        """
+        entry = self.entry_dir(path)
+        index = self._read_index(entry)
+        if index is None or index["options"] != (options or {}):
+            return None
+        mtime_ns = index["source"]["mtime_ns"]
+        if not source_unchanged(path, index["source"]):
+            return None
+        if index["source"]["mtime_ns"] != mtime_ns:
+            self._write_index(entry, index)
+
+        stored = index["columns"]
+        names = list(stored) if columns is None else list(columns)
+        extra = [column for column in row_filter.columns if column not in names]
+
+        parts = []
+        for partition in index["partitions"]:
+            if not row_filter.can_match(partition):
+                continue
+            directory = entry / partition["name"]
+            if row_filter.covers(partition):
+                parts.append(pd.DataFrame({name: read_column(directory, name, stored[name]) for name in names}))
+                continue
+            df = pd.DataFrame({name: read_column(directory, name, stored[name]) for name in names + extra})
+            parts.append(df.loc[row_filter.mask(df), names].reset_index(drop=True))
+
+        if not parts:
+            return pd.DataFrame({name: pd.Series(dtype=stored[name]) for name in names})
+        unify_categories(parts)
+        return combine_frames(parts)
+
+    def write(self, path: Path, df: pd.DataFrame, options: Optional[Dict[str, Any]] = None) -> None:
+        """Store every column of ``df`` (the parsed ``path``), split by month and state."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        states = df["state"].astype("category")
+        months = df["date"].dt.to_period("M")
+        keys = pd.DataFrame({"month": months.astype(str), "state": states.cat.codes})
+
+        partitions = []
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+        try:
+            groups = keys.groupby(["month", "state"]).indices
+            for (month, code), rows in sorted(groups.items()):
+                # Code -1 holds rows with no state; they match no state filter
+                name = f"{month}.{code + 1:04d}"
+                part = df.iloc[rows]
+                (staging / name).mkdir()
+                for column in df.columns:
+                    series = part[column].reset_index(drop=True)
+                    if isinstance(series.dtype, pd.CategoricalDtype):
+                        series = series.cat.remove_unused_categories()
+                    write_column(staging / name, column, series)
+                partitions.append({
+                    "name": name,
+                    "month": month,
+                    "state": str(states.cat.categories[code]) if code >= 0 else "",
+                    "rows": len(rows),
+                    "date_min": str(part["date"].min()),
+                    "date_max": str(part["date"].max()),
+                })
+
+            index = {
+                "format": FORMAT_VERSION,
+                "source": file_fingerprint(path),
+                "options": options or {},
+                "columns": {name: str(df[name].dtype) for name in df.columns},
+                "partitions": partitions,
+            }
+            self._write_index(staging, index)
+            entry = self.entry_dir(path)
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _read_index(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry / "index.json", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("format") != FORMAT_VERSION:
+            return None
+        return index
+
+    def _write_index(self, entry: Path, index: Dict[str, Any]) -> None:
+        with open(entry / "index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
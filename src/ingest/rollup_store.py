@@ -0,0 +1,159 @@
+"""
+Rollup Store
+Persisted rollups, each with a manifest of the CSV shards folded into it.
+(Whole dataset frames are stored the same way, under the level "frame",
+and read back memory-mapped; see DataLoader.load.)
+Layout (one directory per dataset and rollup level):
+  - manifest.json: fingerprint of every ingested shard, the options the
+    rollup was built with, and the column dtypes
+  - <column>.npy / .codes.npy / .values.npy: the rollup's columns, stored as
+    in the column store
+When new shards appear, only they need to be aggregated and merged into
+the stored rollup; if an ingested shard changed or disappeared, the rollup
+must be rebuilt from scratch.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .column_store import file_fingerprint, read_column, source_unchanged, write_column
+from .sources import shard_key
+
+FORMAT_VERSION = 1
+
+
+class RollupStore:
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def entry_dir(self, dataset: str, level: str) -> Path:
+        return self.root / f"{dataset}-{level}"
+
+    def read(
+        self,
+        dataset: str,
+        level: str,
+        file_paths: List[Path],
+        options: Optional[Dict[str, Any]] = None,
+        mmap: bool = False,
+    ) -> Tuple[Optional[pd.DataFrame], List[Path]]:
+        """
+        Return (stored rollup, shards not yet folded into it).
+
+        The stored rollup is None, and every shard is returned, when nothing
+        is stored, the options differ, or an ingested shard changed or is
+        gone, since sums cannot be taken back out of a rollup. With
+        ``mmap``, columns are memory-mapped (see ``read_column``).
+        """
+        entry = self.entry_dir(dataset, level)
+        manifest = self._read_manifest(entry)
+        new_paths = self._new_shards(entry, manifest, file_paths, options)
+        if new_paths is None:
+            return None, list(file_paths)
+
+        frame = pd.DataFrame(
+            {name: read_column(entry, name, dtype, mmap) for name, dtype in manifest["columns"].items()},
+            copy=False,
+        )
+        return frame, new_paths
+
+    def write(
+        self,
+        dataset: str,
+        level: str,
+        df: pd.DataFrame,
+        file_paths: List[Path],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store ``df`` as the rollup of exactly ``file_paths``."""
+        entry = self.entry_dir(dataset, level)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "options": options or {},
+            "shards": self._fingerprints(entry, file_paths),
+            "columns": {name: str(df[name].dtype) for name in df.columns},
+        }
+
+        def write_columns(staging: Path) -> None:
+            for name in df.columns:
+                write_column(staging, name, df[name])
+
+        self._replace_entry(entry, manifest, write_columns)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _new_shards(
+        self,
+        entry: Path,
+        manifest: Optional[Dict[str, Any]],
+        file_paths: List[Path],
+        options: Optional[Dict[str, Any]],
+    ) -> Optional[List[Path]]:
+        """
+        The shards of ``file_paths`` missing from ``manifest``, or None if
+        the entry is unusable: nothing stored, other options, or an
+        ingested shard changed or gone.
+        """
+        if manifest is None or manifest["options"] != (options or {}):
+            return None
+
+        shards = manifest["shards"]
+        current = {str(shard_key(path).resolve()): path for path in file_paths}
+        touched = False
+        for key, shard in shards.items():
+            mtime_ns = shard["mtime_ns"]
+            if key not in current or not source_unchanged(current[key], shard):
+                return None
+            touched |= shard["mtime_ns"] != mtime_ns
+        if touched:
+            self._write_manifest(entry, manifest)
+        return [path for key, path in current.items() if key not in shards]
+
+    def _fingerprints(self, entry: Path, file_paths: List[Path]) -> Dict[str, Any]:
+        known = (self._read_manifest(entry) or {}).get("shards", {})
+        shards = {}
+        for path in file_paths:
+            key = str(shard_key(path).resolve())
+            # Reuse fingerprints of unchanged shards rather than rehashing them
+            if key in known and source_unchanged(path, known[key]):
+                shards[key] = known[key]
+            else:
+                shards[key] = file_fingerprint(path)
+        return shards
+
+    def _replace_entry(self, entry: Path, manifest: Dict[str, Any], write_files: Callable[[Path], None]) -> None:
+        """Write a new entry (files, then manifest) to a staging directory and swap it in."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+        try:
+            write_files(staging)
+            self._write_manifest(staging, manifest)
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+    def _read_manifest(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry / "manifest.json", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != FORMAT_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self, entry: Path, manifest: Dict[str, Any]) -> None:
+        with open(entry / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
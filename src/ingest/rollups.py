@@ -0,0 +1,232 @@
+"""
+Rollups
+Mergeable partial aggregates of a dataset's count columns.
+Each rollup holds, per key, the sum of every count column plus ``rows``,
+the number of source rows behind it. Partials built from separate chunks
+or shards merge by adding sums and row counts, so a dataset can be
+aggregated without ever being held in memory as a whole.
+Levels:
+  - total: no key (one row)
+  - date: date (plus the derived weekday/month/day_index columns)
+  - state: state
+  - district: state, district
+  - pincode: pincode
+  - location: state, district, pincode
+  - cube: date, state, district, pincode (feeds the cube, see cube.py; only
+    built on its own)
+Loaded frames can be consolidated the same way at the full row key
+(date, state, district, pincode): rows repeating a key become one row with
+their summed counts and ``rows``, and every rollup of the consolidated
+frame equals the rollup of the raw rows.
+MultiRollup builds several levels from one pass over the rows: the rows
+are grouped once per base level (date, location) and the coarser levels
+are derived from those rollups.
+Per-pincode sums over several frames at once (sum_by_pincode) skip hashing
+altogether: pincodes are six-digit integers, so np.bincount can sum
+straight into arrays indexed by the pincode itself.
+"""
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dates import add_date_parts
+from .schema import count_dtype, unify_categories
+
+ROWS_COLUMN = "rows"
+
+ROW_KEY: Tuple[str, ...] = ("date", "state", "district", "pincode")
+
+# Rollup level keyed by the full row key, from which the cube is built
+CUBE_LEVEL = "cube"
+
+# Pincodes below this are summed directly at their own index
+PINCODE_SLOTS = 1_000_000
+
+ROLLUP_LEVELS: Dict[str, Tuple[str, ...]] = {
+    "total": (),
+    "date": ("date",),
+    "state": ("state",),
+    "district": ("state", "district"),
+    "pincode": ("pincode",),
+    "location": ("state", "district", "pincode"),
+    CUBE_LEVEL: ROW_KEY,
+}
+
+
+class PartialAggregate:
+
+    def __init__(self, keys: Sequence[str], value_columns: Sequence[str]):
+        self.keys = list(keys)
+        self.value_columns = list(value_columns)
+        self._frame: Optional[pd.DataFrame] = None
+
+    def update(self, df: pd.DataFrame) -> "PartialAggregate":
+        """Fold a chunk of rows (or of an existing rollup) into the aggregate."""
+        self._add(self._aggregate(df))
+        return self
+
+    def merge(self, other: "PartialAggregate") -> "PartialAggregate":
+        if other.keys != self.keys or other.value_columns != self.value_columns:
+            raise ValueError("Cannot merge aggregates with different keys or columns")
+        if other._frame is not None:
+            self._add(other._frame)
+        return self
+
+    def result(self) -> pd.DataFrame:
+        """Keys as columns (sorted), then the summed count columns, then ``rows``."""
+        if self._frame is None:
+            frame = pd.DataFrame(columns=self.keys + self.value_columns + [ROWS_COLUMN])
+        elif self.keys:
+            frame = self._frame.sort_values(self.keys, ignore_index=True)
+        else:
+            frame = self._frame.reset_index(drop=True)
+
+        if "date" in self.keys:
+            add_date_parts(frame)
+        return frame
+
+    def _aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Rollups fed back in already carry a row count; raw rows count once each
+        if ROWS_COLUMN in df.columns:
+            return self._sum(df, self.value_columns + [ROWS_COLUMN])
+
+        if not self.keys:
+            frame = self._sum(df, self.value_columns)
+            frame[ROWS_COLUMN] = len(df)
+            return frame
+
+        grouped = df.groupby(self.keys, observed=True, sort=False)
+        frame = grouped[self.value_columns].sum().astype(np.int64)
+        frame[ROWS_COLUMN] = grouped.size()
+        return frame.reset_index()
+
+    def _add(self, part: pd.DataFrame) -> None:
+        if self._frame is None:
+            self._frame = part
+            return
+        parts = [self._frame, part]
+        unify_categories(parts)
+        self._frame = self._sum(pd.concat(parts, ignore_index=True), self.value_columns + [ROWS_COLUMN])
+
+    def _sum(self, df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        # pandas narrows group sums back to the input dtype when they fit
+        # (e.g. uint8), which would overflow once processors add the count
+        # columns together, so sums are always held as int64
+        if not self.keys:
+            return pd.DataFrame({column: [df[column].sum()] for column in columns}, dtype=np.int64)
+        frame = df.groupby(self.keys, observed=True, sort=False)[list(columns)].sum()
+        return frame.astype(np.int64).reset_index()
+
+
+class MultiRollup:
+    """
+    Several rollup levels of the same rows, built in one pass.
+
+    Rows are aggregated only at the base levels: those of ``levels`` whose
+    keys no other requested level's keys contain (normally date and
+    location). Every other level is derived from the (much smaller)
+    rollup of a base level whose keys include its own, so state, district,
+    pincode and total never rescan the rows. Like PartialAggregate, it
+    takes chunks of rows or rollups and merges with other instances.
+    """
+
+    def __init__(self, levels: Sequence[str], value_columns: Sequence[str]):
+        self.levels = list(levels)
+        self.value_columns = list(value_columns)
+        self.bases = {level: _base_level(level, self.levels) for level in self.levels}
+        self._partials = {
+            base: PartialAggregate(ROLLUP_LEVELS[base], self.value_columns)
+            for base in dict.fromkeys(self.bases.values())
+        }
+
+    def update(self, df: pd.DataFrame) -> "MultiRollup":
+        for partial in self._partials.values():
+            partial.update(df)
+        return self
+
+    def merge(self, other: "MultiRollup") -> "MultiRollup":
+        if other.levels != self.levels:
+            raise ValueError("Cannot merge rollups of different levels")
+        for base, partial in self._partials.items():
+            partial.merge(other._partials[base])
+        return self
+
+    def results(self) -> Dict[str, pd.DataFrame]:
+        """Level name -> rollup, as ``PartialAggregate.result`` gives it."""
+        bases = {base: partial.result() for base, partial in self._partials.items()}
+        return {
+            level: bases[base] if base == level
+            else PartialAggregate(ROLLUP_LEVELS[level], self.value_columns).update(bases[base]).result()
+            for level, base in self.bases.items()
+        }
+
+
+def _base_level(level: str, levels: Sequence[str]) -> str:
+    """The level of ``levels`` with the most keys that include all of ``level``'s."""
+    keys = set(ROLLUP_LEVELS[level])
+    covering = [other for other in levels if keys <= set(ROLLUP_LEVELS[other])]
+    return max(covering, key=lambda other: len(ROLLUP_LEVELS[other]))
+
+
+def consolidate_rows(df: pd.DataFrame, value_columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Merge the rows of ``df`` sharing a row key (the ``ROW_KEY`` columns it
+    has) into one, with summed ``value_columns`` and a ``rows`` multiplicity.
+
+    Counts are narrowed back to the smallest dtype holding every row
+    total, as at load time, so the consolidated frame is no wider per row.
+    """
+    keys = [column for column in ROW_KEY if column in df.columns]
+    frame = PartialAggregate(keys, value_columns).update(df).result()
+
+    if len(frame):
+        dtype = count_dtype(sum(int(frame[column].max()) for column in value_columns))
+        for column in value_columns:
+            frame[column] = frame[column].astype(dtype)
+        frame[ROWS_COLUMN] = frame[ROWS_COLUMN].astype(count_dtype(int(frame[ROWS_COLUMN].max())))
+    return frame
+
+
+def sum_by_pincode(parts: Sequence[Tuple[np.ndarray, Mapping[str, np.ndarray]]]) -> pd.DataFrame:
+    """
+    Per-pincode sums of several frames, with ``np.bincount``.
+
+    Args:
+        parts: (pincode per row, {output column: value per row}) for each
+            frame; output columns must differ between frames
+
+    Returns:
+        DataFrame indexed by pincode with one int64 column per output
+        (0 where a frame lacks the pincode). Pincodes come in the order a
+        groupby-and-concat of the parts gives: those of the first part,
+        sorted, then those first seen in each later part, sorted.
+    """
+    pincodes = [np.asarray(part[0]) for part in parts]
+    if all(len(values) == 0 or (values.min() >= 0 and values.max() < PINCODE_SLOTS) for values in pincodes):
+        slots, index = PINCODE_SLOTS, pincodes
+        labels = None
+    else:
+        # Out-of-range pincodes: sum at a compact remap of the distinct ones
+        labels, inverse = np.unique(np.concatenate(pincodes), return_inverse=True)
+        slots = len(labels)
+        index = np.split(inverse, np.cumsum([len(values) for values in pincodes])[:-1])
+
+    seen = np.zeros(slots, dtype=bool)
+    order = []
+    sums = {}
+    for rows, (_, outputs) in zip(index, parts):
+        present = np.zeros(slots, dtype=bool)
+        present[rows] = True
+        order.append(np.flatnonzero(present & ~seen))
+        seen |= present
+        for column, values in outputs.items():
+            # Float sums are exact for totals below 2**53
+            sums[column] = np.bincount(rows, weights=values, minlength=slots)
+
+    order = np.concatenate(order) if order else np.zeros(0, dtype=np.intp)
+    keys = order if labels is None else labels[order]
+    return pd.DataFrame(
+        {column: total[order].astype(np.int64) for column, total in sums.items()},
+        index=pd.Index(keys.astype(np.result_type(*pincodes) if pincodes else np.int64), name="pincode"),
+    )
@@ -0,0 +1,122 @@
+"""
+Dataset Schema
+Applies the per-dataset column types declared in config.DATASET_SCHEMAS.
+Column kinds:
+  - date: parsed with config.DATE_FORMAT, plus weekday/month/day_index columns
+  - category: pandas categorical (strings stored once per shard)
+  - int32: signed 32-bit integer, range checked
+  - count: smallest unsigned integer that holds every row total
+"""
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .dates import DATE_PART_COLUMNS, decode_dates
+
+Schema = Dict[str, str]
+
+_COUNT_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def read_dtypes(schema: Schema) -> Dict[str, str]:
+    """dtype mapping for ``pd.read_csv``; narrowing happens in ``apply_schema``."""
+    dtypes = {}
+    for column, kind in schema.items():
+        if kind in ("category", "date"):
+            # Dates are read as categories and decoded once per distinct value
+            dtypes[column] = "category"
+        elif kind in ("int32", "count"):
+            dtypes[column] = "int64"
+    return dtypes
+
+
+def count_columns(schema: Schema) -> List[str]:
+    return [column for column, kind in schema.items() if kind == "count"]
+
+
+def project_schema(schema: Schema, columns: Iterable[str]) -> Schema:
+    """The part of ``schema`` covering ``columns``, in schema order."""
+    wanted = set(columns)
+    unknown = wanted - set(schema)
+    if unknown:
+        raise KeyError(f"Columns not in schema: {sorted(unknown)}")
+    return {column: kind for column, kind in schema.items() if column in wanted}
+
+
+def parsed_columns(schema: Schema) -> List[str]:
+    """Frame columns ``apply_schema`` produces, including derived date parts."""
+    columns = []
+    for column, kind in schema.items():
+        columns.append(column)
+        if kind == "date":
+            columns.extend(DATE_PART_COLUMNS)
+    return columns
+
+
+def apply_schema(df: pd.DataFrame, schema: Schema) -> pd.DataFrame:
+    """Decode dates and narrow integer columns in place, raising if a value does not fit."""
+    for column, kind in schema.items():
+        if column not in df.columns:
+            continue
+        if kind == "date":
+            decode_dates(df, column)
+        elif kind == "int32":
+            df[column] = _to_int32(df[column])
+
+    counts = [column for column in count_columns(schema) if column in df.columns]
+    if counts:
+        # Processors add the count columns of a row together (e.g.
+        # demo_age_5_17 + demo_age_17_), so the width must hold the row
+        # total, not just the largest single value. The sum of the column
+        # maxima is a cheap upper bound for it.
+        bound = 0
+        for column in counts:
+            _check_counts(df[column])
+            bound += int(df[column].max()) if len(df) else 0
+        dtype = count_dtype(bound)
+        for column in counts:
+            df[column] = df[column].astype(dtype)
+
+    return df
+
+
+def count_dtype(max_total: int) -> np.dtype:
+    for dtype in _COUNT_DTYPES:
+        if max_total <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise OverflowError(f"Row total {max_total} does not fit in uint64")
+
+
+def unify_categories(dfs: List[pd.DataFrame]) -> None:
+    """Give every frame the same categories so ``pd.concat`` keeps them categorical."""
+    if not dfs:
+        return
+    for column in dfs[0].columns:
+        if not isinstance(dfs[0][column].dtype, pd.CategoricalDtype):
+            continue
+        # An empty frame (e.g. a shard no row of which passed a filter) may
+        # hold no categories of the right dtype; it adds none anyway
+        series = [df[column] for df in dfs if len(df[column].cat.categories)]
+        if not series:
+            continue
+        categories = union_categoricals(series, sort_categories=True).categories
+        for df in dfs:
+            df[column] = df[column].cat.set_categories(categories)
+
+
+def _to_int32(series: pd.Series) -> pd.Series:
+    if series.isna().any():
+        raise ValueError(f"Column '{series.name}' has missing values")
+    info = np.iinfo(np.int32)
+    if len(series) and (series.min() < info.min or series.max() > info.max):
+        raise OverflowError(f"Column '{series.name}' does not fit in int32")
+    return series.astype(np.int32)
+
+
+def _check_counts(series: pd.Series) -> None:
+    if series.isna().any():
+        raise ValueError(f"Count column '{series.name}' has missing values")
+    if len(series) and series.min() < 0:
+        raise ValueError(f"Count column '{series.name}' has negative values")
@@ -0,0 +1,128 @@
+"""
+Shard Sources
+Finds a dataset's CSV shards, plain or compressed, and opens them for
+parsing.
+  - <name>-*.csv, <name>-*.csv.gz, <name>-*.csv.zst
+A compressed shard is the same shard as its plain counterpart: caches and
+manifests key shards by their path without the compression suffix and by
+the hash of their decompressed content. Compressed shards are decompressed
+on a background thread, block by block, while the parser consumes them, so
+nothing is staged on disk. (.zst needs the optional ``zstandard`` package.)
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Union
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+_BLOCK_SIZE = 1 << 20
+_QUEUE_BLOCKS = 8
+
+
+def shard_key(path: Path) -> Path:
+    """``path`` without its compression suffix (``a.csv.gz`` -> ``a.csv``)."""
+    if path.suffix in COMPRESSED_SUFFIXES:
+        return path.with_suffix("")
+    return path
+
+
+def find_shards(directory: Path, name: str) -> List[Path]:
+    """Shards of dataset ``name`` in ``directory``, sorted by shard name."""
+    shards: Dict[str, Path] = {}
+    for pattern in [f"{name}-*.csv"] + [f"{name}-*.csv{suffix}" for suffix in COMPRESSED_SUFFIXES]:
+        for path in directory.glob(pattern):
+            key = shard_key(path).name
+            if key in shards:
+                raise ValueError(f"Shard {key} is present more than once: {shards[key].name}, {path.name}")
+            shards[key] = path
+    return [shards[key] for key in sorted(shards)]
+
+
+def open_shard(path: Path) -> BinaryIO:
+    """Binary file object with the shard's CSV bytes, decompressing as it is read."""
+    if path.suffix in COMPRESSED_SUFFIXES:
+        return io.BufferedReader(_DecompressingReader(path), buffer_size=_BLOCK_SIZE)
+    return open(path, "rb")
+
+
+def _open_decompressed(path: Path) -> BinaryIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(f"Reading {path.name} needs the 'zstandard' package") from exc
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+class _DecompressingReader(io.RawIOBase):
+    """
+    Raw reader fed by a thread that decompresses ahead into a bounded queue.
+
+    zlib and zstandard release the GIL while decompressing, so the thread
+    runs alongside the (GIL-releasing) C parser reading from this object.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.name = str(path)
+        self._blocks: "queue.Queue[Union[bytes, BaseException, None]]" = queue.Queue(_QUEUE_BLOCKS)
+        self._pending = memoryview(b"")
+        self._done = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, args=(path,), daemon=True)
+        self._thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            block = self._blocks.get()
+            if block is None:
+                self._done = True
+            elif isinstance(block, BaseException):
+                self._done = True
+                raise block
+            else:
+                self._pending = memoryview(block)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Unblock the producer if it is waiting on a full queue
+            while self._thread.is_alive():
+                try:
+                    self._blocks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        super().close()
+
+    def _pump(self, path: Path) -> None:
+        try:
+            with _open_decompressed(path) as source:
+                while not self._stop.is_set():
+                    block = source.read(_BLOCK_SIZE)
+                    if not block:
+                        break
+                    self._put(block)
+        except BaseException as exc:
+            self._put(exc)
+        self._put(None)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,60 @@
+"""
+Streaming Aggregation
+Reads CSV shards in fixed-size chunks and folds each chunk into mergeable
+rollups, so peak memory is bounded by the chunk size and the number of
+distinct keys rather than by the size of the input.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .rollups import CUBE_LEVEL, ROLLUP_LEVELS, MultiRollup
+from .schema import Schema, count_columns
+from .validation import Quarantine, read_shard
+
+
+def stream_rollups(
+    file_paths: List[Path],
+    schema: Schema,
+    levels: Sequence[str] = tuple(level for level in ROLLUP_LEVELS if level != CUBE_LEVEL),
+    chunk_rows: int = 1_000_000,
+    jobs: int = 1,
+    quarantine: Optional[Quarantine] = None,
+    values: Optional[Sequence[str]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Aggregate every shard chunk by chunk, in a single pass for all ``levels``,
+    summing ``values`` (default: every count column of ``schema``).
+
+    Only the ``schema`` columns are parsed. Shards are scanned independently
+    (concurrently when ``jobs > 1``) and their partial aggregates merged at
+    the end. With ``quarantine``, rows failing validation are skipped (see
+    ``read_shard``).
+
+    Returns:
+        Dict of level name -> rollup DataFrame
+    """
+    if not file_paths:
+        raise FileNotFoundError(f"No CSV files found: {file_paths}")
+    if values is None:
+        values = count_columns(schema)
+
+    def scan(path: Path) -> MultiRollup:
+        rollup = MultiRollup(levels, values)
+        for chunk in read_shard(path, schema, chunk_rows, quarantine):
+            rollup.update(chunk)
+        return rollup
+
+    jobs = min(jobs, len(file_paths))
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(scan, file_paths))
+    else:
+        scanned = [scan(path) for path in file_paths]
+
+    merged = MultiRollup(levels, values)
+    for rollup in scanned:
+        merged.merge(rollup)
+    return merged.results()
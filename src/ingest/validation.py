@@ -0,0 +1,297 @@
+"""
+Row Validation
+Parses CSV shards and, when validating, splits off the rows that fail a
+check, writing them to a per-shard quarantine file with reason codes.
+Reason codes (several are joined with "|"):
+  - missing: a value is empty
+  - not_a_number: a pincode or count is not an integer
+  - negative_count: a count is below zero
+  - bad_date: the date does not parse with config.DATE_FORMAT
+  - bad_pincode: the pincode is not six digits
+  - unknown_state: the state is not a state or union territory of India
+  - pincode_state: the pincode's postal zone (first digit) does not serve
+    the state
+Dates and states are checked once per distinct value (they are read as
+categories) and the pincode/state check is a lookup in a state x zone
+table, so validating costs little next to parsing. Shards are validated
+in blocks of lines, each first parsed with the strict integer dtypes; only
+a block that fails to parse that way (text or blanks in a number column)
+is parsed again, with its numbers as categories. Blocks are cut at line
+breaks, so quoted values must not span lines (they never do in these
+exports).
+"""
+from __future__ import annotations
+
+import io
+import itertools
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+
+from .combine import combine_frames
+from .schema import Schema, apply_schema, read_dtypes, unify_categories
+from .sources import open_shard, shard_key
+
+REASON_COLUMN = "reason"
+
+REASONS = (
+    "missing",
+    "not_a_number",
+    "negative_count",
+    "bad_date",
+    "bad_pincode",
+    "unknown_state",
+    "pincode_state",
+)
+_BIT = {reason: np.uint8(1 << bit) for bit, reason in enumerate(REASONS)}
+
+# Postal zones (first pincode digit) serving each state / union territory,
+# keyed by normalised name (see _state_key)
+STATE_ZONES: Dict[str, Tuple[int, ...]] = {
+    "andamanandnicobarislands": (7,),
+    "andhrapradesh": (5,),
+    "arunachalpradesh": (7,),
+    "assam": (7,),
+    "bihar": (8,),
+    "chandigarh": (1,),
+    "chhattisgarh": (4,),
+    "dadraandnagarhaveli": (3,),
+    "dadraandnagarhavelianddamananddiu": (3,),
+    "damananddiu": (3,),
+    "delhi": (1,),
+    "goa": (4,),
+    "gujarat": (3,),
+    "haryana": (1,),
+    "himachalpradesh": (1,),
+    "jammuandkashmir": (1,),
+    "jharkhand": (8,),
+    "karnataka": (5,),
+    "kerala": (6,),
+    "ladakh": (1,),
+    "lakshadweep": (6,),
+    "madhyapradesh": (4,),
+    "maharashtra": (4,),
+    "manipur": (7,),
+    "meghalaya": (7,),
+    "mizoram": (7,),
+    "nagaland": (7,),
+    "odisha": (7,),
+    # Yanam lies in Andhra Pradesh's zone, Mahe in Kerala's
+    "puducherry": (5, 6),
+    "punjab": (1,),
+    "rajasthan": (3,),
+    "sikkim": (7,),
+    "tamilnadu": (6,),
+    "telangana": (5,),
+    "tripura": (7,),
+    "uttarpradesh": (2,),
+    "uttarakhand": (2,),
+    "westbengal": (7,),
+}
+
+# Old names and common misspellings found in the source files
+STATE_ALIASES = {
+    "orissa": "odisha",
+    "pondicherry": "puducherry",
+    "westbangal": "westbengal",
+}
+
+_PINCODE_MIN, _PINCODE_MAX = 100000, 999999
+
+# Lines validated at a time when reading a shard in one chunk; a block
+# failing the strict parse is parsed twice, so this bounds the extra work
+BLOCK_ROWS = 100_000
+
+
+class Quarantine:
+    """Rejected rows of each shard, as ``<root>/<shard>.csv`` with a ``reason`` column."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, shard: Path) -> Path:
+        return self.root / shard_key(shard).name
+
+    def clear(self, shard: Path) -> None:
+        self.path_for(shard).unlink(missing_ok=True)
+
+    def append(self, shard: Path, rows: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(shard)
+        rows.to_csv(target, mode="a", header=not target.exists(), index=False)
+
+
+def read_shard(
+    path: Path,
+    schema: Schema,
+    chunk_rows: Optional[int] = None,
+    quarantine: Optional[Quarantine] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse the ``schema`` columns of a shard and apply the schema, in chunks
+    of ``chunk_rows`` (default: one chunk).
+
+    With ``quarantine``, rows failing validation are left out and written
+    to the shard's quarantine file (replacing an earlier one). Only whole
+    rows can be judged, so ``schema`` should then cover every column.
+    """
+    if quarantine is None:
+        for chunk in _read_chunks(path, schema, chunk_rows, read_dtypes(schema)):
+            yield apply_schema(chunk, schema)
+        return
+
+    quarantine.clear(path)
+    blocks = _line_blocks(path, chunk_rows or BLOCK_ROWS)
+    checked = (_checked(path, _parse_block(block, schema), schema, quarantine) for block in blocks)
+    if chunk_rows is not None:
+        yield from checked
+        return
+    chunks = list(checked)
+    unify_categories(chunks)
+    yield combine_frames(chunks)
+
+
+def validate_rows(df: pd.DataFrame, schema: Schema) -> Tuple[np.ndarray, pd.Series]:
+    """
+    Check rows as read by ``pd.read_csv`` (dates and labels as categories).
+
+    Returns:
+        (boolean mask of the rows passing every check, reasons of the
+        failing rows, in order)
+    """
+    flags = np.zeros(len(df), dtype=np.uint8)
+    pincodes = None
+    for column, kind in schema.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if kind in ("date", "category"):
+            codes = series.cat.codes.to_numpy()
+            _flag(flags, codes < 0, "missing")
+            if kind == "date":
+                parsed = pd.to_datetime(series.cat.categories, format=config.DATE_FORMAT, errors="coerce")
+                _flag(flags, _category_mask(codes, np.asarray(parsed.isna())), "bad_date")
+            continue
+
+        values, missing, invalid = _integers(series)
+        _flag(flags, missing, "missing")
+        _flag(flags, invalid, "not_a_number")
+        if kind == "count":
+            _flag(flags, values < 0, "negative_count")
+        elif column == "pincode":
+            bad = ~(missing | invalid) & ((values < _PINCODE_MIN) | (values > _PINCODE_MAX))
+            _flag(flags, bad, "bad_pincode")
+            pincodes = (values, missing | invalid | bad)
+
+    if "state" in df.columns:
+        codes = df["state"].cat.codes.to_numpy()
+        keys = [_state_key(name) for name in df["state"].cat.categories]
+        known = np.array([key in STATE_ZONES for key in keys], dtype=bool)
+        _flag(flags, _category_mask(codes, ~known), "unknown_state")
+
+        if pincodes is not None:
+            # allowed[state code, zone]; the last row stands for missing states
+            allowed = np.ones((len(keys) + 1, 10), dtype=bool)
+            for code, key in enumerate(keys):
+                if key in STATE_ZONES:
+                    allowed[code] = False
+                    allowed[code, list(STATE_ZONES[key])] = True
+            values, rejected = pincodes
+            zones = np.clip(values // 100000, 0, 9)
+            # Only pincodes that passed their own checks are compared
+            _flag(flags, ~(allowed[codes, zones] | rejected), "pincode_state")
+
+    valid = flags == 0
+    return valid, _reason_labels(flags[~valid])
+
+
+def _checked(path: Path, chunk: pd.DataFrame, schema: Schema, quarantine: Quarantine) -> pd.DataFrame:
+    valid, reasons = validate_rows(chunk, schema)
+    rejected = None
+    if not valid.all():
+        rejected = chunk.loc[~valid].astype(object)
+        rejected[REASON_COLUMN] = reasons.to_numpy()
+        chunk = chunk.loc[valid].reset_index(drop=True)
+    for column, kind in schema.items():
+        # Numbers read as categories (tolerant parse) go back to integers
+        if kind in ("int32", "count") and isinstance(chunk[column].dtype, pd.CategoricalDtype):
+            chunk[column] = _integers(chunk[column])[0]
+    chunk = apply_schema(chunk, schema)
+    # Only once the block is done, so its rejects are written exactly once
+    if rejected is not None:
+        quarantine.append(path, rejected)
+    return chunk
+
+
+def _line_blocks(path: Path, rows: int) -> Iterator[bytes]:
+    """The shard as CSV bytes of its header and up to ``rows`` lines each (at least one block)."""
+    with open_shard(path) as source:
+        header = source.readline()
+        lines = list(itertools.islice(source, rows))
+        while True:
+            yield header + b"".join(lines)
+            lines = list(itertools.islice(source, rows))
+            if not lines:
+                return
+
+
+def _parse_block(block: bytes, schema: Schema) -> pd.DataFrame:
+    try:
+        return pd.read_csv(io.BytesIO(block), usecols=list(schema), dtype=read_dtypes(schema))
+    except ValueError:
+        # Text or blanks in a number column
+        return pd.read_csv(io.BytesIO(block), usecols=list(schema), dtype=_tolerant_dtypes(schema))
+
+
+def _read_chunks(
+    path: Path, schema: Schema, chunk_rows: Optional[int], dtypes: Dict[str, str]
+) -> Iterator[pd.DataFrame]:
+    with open_shard(path) as source:
+        if chunk_rows is None:
+            yield pd.read_csv(source, usecols=list(schema), dtype=dtypes)
+            return
+        yield from pd.read_csv(source, usecols=list(schema), dtype=dtypes, chunksize=chunk_rows)
+
+
+def _tolerant_dtypes(schema: Schema) -> Dict[str, str]:
+    return {column: "category" for column in schema}
+
+
+def _integers(series: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(int64 values, missing mask, not-an-integer mask) of a number column."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.to_numpy(dtype=np.int64)
+        return values, np.zeros(len(values), dtype=bool), np.zeros(len(values), dtype=bool)
+
+    codes = series.cat.codes.to_numpy()
+    parsed = pd.to_numeric(pd.Series(series.cat.categories, dtype=object), errors="coerce").to_numpy(dtype=float)
+    integral = np.isfinite(parsed) & (parsed == np.round(parsed))
+    values = np.append(np.where(integral, parsed, 0), 0).astype(np.int64)[codes]
+    return values, codes < 0, _category_mask(codes, ~integral)
+
+
+def _flag(flags: np.ndarray, mask: np.ndarray, reason: str) -> None:
+    # Arithmetic on the whole array beats boolean-indexed assignment
+    flags |= mask.view(np.uint8) * _BIT[reason]
+
+
+def _category_mask(codes: np.ndarray, category_flags: np.ndarray) -> np.ndarray:
+    """Per-row mask from a per-category one (missing values, code -1, are not flagged)."""
+    return np.append(np.asarray(category_flags, dtype=bool), False)[codes]
+
+
+def _reason_labels(flags: np.ndarray) -> pd.Series:
+    """Reason codes per row, built once per distinct combination of flags."""
+    combinations, codes = np.unique(flags, return_inverse=True)
+    labels = ["|".join(reason for reason in REASONS if combination & _BIT[reason]) for combination in combinations]
+    return pd.Series(np.asarray(labels, dtype=object)[codes])
+
+
+def _state_key(name: str) -> str:
+    key = re.sub(r"[^a-z]", "", str(name).casefold().replace("&", "and"))
+    return STATE_ALIASES.get(key, key)
@@ -1,5 +1,8 @@
 """Data processors for transforming raw data into chart-ready formats."""
 from .base import BaseProcessor
+from .graph import ProcessorGraph, register_processor
+from .result_cache import ResultCache
+from .dataset_totals import DatasetTotalsProcessor
 from .daily_aggregator import DailyAggregator
 from .state_aggregator import StateAggregator
 from .engagement_frequency import EngagementFrequencyProcessor
@@ -12,9 +15,14 @@ from .engagement_level import EngagementLevelProcessor
 from .district_aggregator import DistrictAggregator
 from .intensity_processor import IntensityProcessor
 from .clustering_processor import ClusteringProcessor
+from .pincode_features import PincodeFeatureProcessor
 
 __all__ = [
     "BaseProcessor",
+    "ProcessorGraph",
+    "register_processor",
+    "ResultCache",
+    "DatasetTotalsProcessor",
     "DailyAggregator",
     "StateAggregator",
     "EngagementFrequencyProcessor",
@@ -26,5 +34,6 @@ __all__ = [
     "EngagementLevelProcessor",
     "DistrictAggregator",
     "IntensityProcessor",
-    "ClusteringProcessor"
+    "ClusteringProcessor",
+    "PincodeFeatureProcessor"
 ]
@@ -10,11 +10,13 @@ from typing import Dict
 
 import pandas as pd
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
 
 
 class AgeGroupAggregator(BaseProcessor):
 
+    requires = dataset_columns()
+
     @property
     def name(self) -> str:
         return "age_group_aggregator"
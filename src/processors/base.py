@@ -1,12 +1,51 @@
 """Base class for data processors."""
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import pandas as pd
 
+import config
+from src.ingest import ROWS_COLUMN, count_columns
+
+from .result_cache import cached_result
+
+# Methods whose results are kept in the result cache
+CACHED_METHODS = ("process", "process_interactions", "process_enrollments", "process_elbow", "process_clusters", "compute")
+
+
+def dataset_columns(
+    *keys: str, counts: bool = True, datasets: Optional[Sequence[str]] = None
+) -> Dict[str, Tuple[str, ...]]:
+    """
+    Requirements mapping: ``keys`` plus, if ``counts``, every count column,
+    for each of ``datasets`` (default: all of them).
+    """
+    names = datasets if datasets is not None else tuple(config.DATASET_SCHEMAS)
+    return {
+        name: keys + (tuple(count_columns(config.DATASET_SCHEMAS[name])) if counts else ())
+        for name in names
+    }
+
 
 class BaseProcessor(ABC):
 
+    # Columns the processor reads, keyed by dataset name (None: everything)
+    requires: Optional[Dict[str, Tuple[str, ...]]] = None
+
+    # Graph nodes (see ProcessorGraph) the processor reads, and the node its
+    # result is published as (None: the processor is only called directly)
+    inputs: Tuple[str, ...] = ()
+    output: Optional[str] = None
+
+    # Bump when the processor's results change, so cached ones are not reused
+    version: int = 1
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        for method in CACHED_METHODS:
+            if method in cls.__dict__ and not getattr(cls.__dict__[method], "__isabstractmethod__", False):
+                setattr(cls, method, cached_result(cls.__dict__[method]))
+
     @abstractmethod
     def process(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         pass
@@ -15,3 +54,21 @@ class BaseProcessor(ABC):
     @abstractmethod
     def name(self) -> str:
         pass
+
+    def compute(self, *inputs: Any) -> Any:
+        """The ``output`` node's value, from the values of the ``inputs`` nodes (left unchanged)."""
+        raise NotImplementedError(f"{self.name} publishes no graph node")
+
+    def cache_settings(self) -> Optional[Dict[str, Any]]:
+        """
+        Settings the results depend on besides the arguments, part of their
+        result cache key (None: do not cache them).
+        """
+        return {}
+
+    @staticmethod
+    def _with_rows(df: pd.DataFrame) -> pd.DataFrame:
+        """Rollups carry their source row count in ``rows``; raw rows count once each."""
+        if ROWS_COLUMN in df.columns:
+            return df
+        return df.assign(**{ROWS_COLUMN: 1})
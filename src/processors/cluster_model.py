@@ -0,0 +1,117 @@
+"""
+Cluster Model
+A fitted StandardScaler, KMeans and PCA, saved with the feature schema they
+were fitted on, so later runs only transform and predict.
+Drift is the growth of the mean squared distance of rows to their nearest
+centroid over the same measure on the data the model was fitted on (0.25:
+25% worse). On a refit the new clusters are matched to the old centroids,
+so cluster ids stay stable wherever the clusters themselves do.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+FORMAT_VERSION = 1
+
+
+class ClusterModel:
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        k: int,
+        random_state: int,
+        scaler: StandardScaler,
+        kmeans: KMeans,
+        pca: PCA,
+        baseline: float,
+    ):
+        self.columns = tuple(columns)
+        self.k = k
+        self.random_state = random_state
+        self.scaler = scaler
+        self.kmeans = kmeans
+        self.pca = pca
+        # Mean squared distance to the nearest centroid on the fitted data
+        self.baseline = baseline
+
+    @classmethod
+    def fit(
+        cls,
+        X: pd.DataFrame,
+        k: int,
+        random_state: int,
+        n_init: int,
+        previous: Optional[ClusterModel] = None,
+    ) -> ClusterModel:
+        """Fit on ``X``, numbering clusters after ``previous``'s where they match."""
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=n_init).fit(X_scaled)
+        pca = PCA(n_components=2).fit(X_scaled)
+        model = cls(X.columns, k, random_state, scaler, kmeans, pca, kmeans.inertia_ / max(len(X), 1))
+        if previous is not None and previous.k == k and previous.columns == model.columns:
+            model._align_to(previous)
+        return model
+
+    def matches(self, columns: Sequence[str], k: int, random_state: int) -> bool:
+        return self.columns == tuple(columns) and self.k == k and self.random_state == random_state
+
+    def drift(self, X: pd.DataFrame) -> float:
+        if len(X) == 0 or self.baseline <= 0:
+            return 0.0
+        distances = self.kmeans.transform(self.scaler.transform(X[list(self.columns)])).min(axis=1)
+        return float((distances ** 2).mean() / self.baseline - 1)
+
+    def apply(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """(cluster labels, 2D PCA projection) of the rows of ``X``."""
+        X_scaled = self.scaler.transform(X[list(self.columns)])
+        return self.kmeans.predict(X_scaled), self.pca.transform(X_scaled)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".staging-", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"format": FORMAT_VERSION, "model": self}, f)
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
+
+    @staticmethod
+    def load(path: Path) -> Optional[ClusterModel]:
+        """The model saved at ``path``, or None if there is none (or it is unreadable)."""
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(stored, dict) or stored.get("format") != FORMAT_VERSION:
+            return None
+        return stored["model"]
+
+    def _align_to(self, previous: ClusterModel) -> None:
+        # Compare centroids in this model's scaled space
+        old = self.scaler.transform(
+            pd.DataFrame(previous.scaler.inverse_transform(previous.kmeans.cluster_centers_), columns=self.columns)
+        )
+        new = self.kmeans.cluster_centers_
+        cost = ((new[:, None, :] - old[None, :, :]) ** 2).sum(axis=2)
+        rows, ids = linear_sum_assignment(cost)
+        order = np.empty(self.k, dtype=np.intp)
+        order[ids] = rows
+        # Centroid i becomes the one matching old cluster i
+        self.kmeans.cluster_centers_ = new[order]
+        self.kmeans.labels_ = np.argsort(order)[self.kmeans.labels_]
@@ -1,136 +1,385 @@
 """
 Clustering Processor
 Performs K-Means clustering and PCA on engagement features.
-Used for Charts 17, 18, 19, 20.
+Used for Charts 17 to 25.
+Cluster fits are memoised by a fingerprint of the feature matrix, k, the
+feature columns and the random seed: in memory (the few most recently
+used), so the charts of a run share one fit, and (with config.USE_DISK_CACHE) on disk under
+<cache dir>/clusters, so a later run over the same data reuses it too;
+both are kept per cache directory of the loader clustered (see context).
+Elbow and cluster results are also kept in the result cache, keyed on
+the elbow settings too (but not with config.CLUSTER_MODEL).
+With config.CLUSTER_MODEL, clusters come from a model saved in the
+loader's model directory instead (see cluster_model and context): runs
+only transform and predict, refitting on request or when the data
+drifts, which keeps cluster ids stable from one data refresh to the next.
+Graph node: clusters (process_clusters with the defaults), from
+pincode_features.
 """
-from typing import Dict, Tuple
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Set, Tuple, Union
 
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
+from threadpoolctl import threadpool_limits
 
-from .base import BaseProcessor
+import config
 
+from .base import BaseProcessor, dataset_columns
+from .cluster_model import ClusterModel
+from .context import cache_dir, model_dir
+from .graph import register_processor
+from .pincode_features import PincodeFeatureProcessor
 
+# Columns of the feature table the clusters are fitted on
+FEATURE_COLUMNS = ("demo_ratio", "bio_ratio", "enroll_ratio", "avg_intensity", "total_freq")
+N_CLUSTERS = 5
+RANDOM_STATE = 42
+N_INIT = 10
+
+# Bump when the fit changes, so stored results are not reused
+_FIT_VERSION = 1
+
+# Fits kept in memory; a run normally needs one per k
+_FITS_KEPT = 4
+
+
+@register_processor
 class ClusteringProcessor(BaseProcessor):
 
+    requires = dataset_columns("pincode")
+    inputs = ("pincode_features",)
+    output = "clusters"
+    version = 2
+
+    # (cache directory, fit key) -> (cluster labels, PCA projection), shared
+    # by every instance, least recently used first
+    _fits: "OrderedDict[Tuple[Path, str], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+    _fits_lock = threading.Lock()
+    # Saved models in use, and those refitted in this run, by path
+    _models: Dict[Path, ClusterModel] = {}
+    _refitted: Set[Path] = set()
+
     @property
     def name(self) -> str:
         return "clustering_processor"
 
+    def cache_settings(self) -> Optional[Dict[str, object]]:
+        if config.CLUSTER_MODEL:
+            # Clusters come from the saved model, which a run may refit
+            return None
+        return {
+            "fit_version": _FIT_VERSION,
+            "n_init": N_INIT,
+            "elbow_warm_start": config.ELBOW_WARM_START,
+            "elbow_sample_rows": config.ELBOW_SAMPLE_ROWS,
+        }
+
     def _prepare_features(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-        """Helper to create feature matrix for clustering."""
-        # 1. Aggregate totals and frequencies
-        demo = data["demographic"].assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-        bio = data["biometric"].assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-        enroll = data["enrollment"].assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-
-        demo_agg = demo.groupby("pincode")["total"].agg(["sum", "count"]).rename(columns={"sum": "demo_total", "count": "demo_freq"})
-        bio_agg = bio.groupby("pincode")["total"].agg(["sum", "count"]).rename(columns={"sum": "bio_total", "count": "bio_freq"})
-        enroll_agg = enroll.groupby("pincode")["total"].agg(["sum", "count"]).rename(columns={"sum": "enroll_total", "count": "enroll_freq"})
-
-        # Merge
-        features = pd.concat([demo_agg, bio_agg, enroll_agg], axis=1).fillna(0)
-        
-        # 2. Derive Features
-        features["total_inter"] = features["demo_total"] + features["bio_total"] + features["enroll_total"]
-        features["total_freq"] = features["demo_freq"] + features["bio_freq"] + features["enroll_freq"]
-        
-        # Avoid division by zero
-        features = features[features["total_freq"] > 0].copy()
-        
-        # Ratios
-        features["demo_ratio"] = features["demo_total"] / features["total_inter"]
-        features["bio_ratio"] = features["bio_total"] / features["total_inter"]
-        features["enroll_ratio"] = features["enroll_total"] / features["total_inter"]
-        
-        # Intensity
-        features["avg_intensity"] = features["total_inter"] / features["total_freq"]
-        
-        # --- New Metrics for Charts 21-25 ---
-        
-        # 1. Engagement Score (Chart 21)
-        # Formula: (total_demo * 0.2) + (total_bio * 0.4) + (total_enroll * 0.4)
-        features["engagement_score"] = (
-            features["demo_total"] * 0.2 + 
-            features["bio_total"] * 0.4 + 
-            features["enroll_total"] * 0.4
-        )
-        
-        # 2. Per-visit intensities (Chart 22)
-        # Avoid division by zero by using 1 if freq is 0 (intensity will be 0 anyway since total is 0)
-        features["demo_intensity"] = features["demo_total"] / features["demo_freq"].replace(0, 1)
-        features["bio_intensity"] = features["bio_total"] / features["bio_freq"].replace(0, 1)
-        features["enroll_intensity"] = features["enroll_total"] / features["enroll_freq"].replace(0, 1)
-        
-        # 3. Balance Score (Chart 23)
-        # Formula: 1 - std_dev([demo_ratio, bio_ratio, enroll_ratio])
-        # Calculating std deviation across the 3 ratio columns row-wise
-        ratios = features[["demo_ratio", "bio_ratio", "enroll_ratio"]]
-        features["balance_score"] = 1 - ratios.std(axis=1)
-        
-        # Select features for clustering
-        # We'll use ratios, frequencies, and intensity
-        return features
+        """Feature matrix for clustering: the shared per-pincode feature table."""
+        return PincodeFeatureProcessor().process(data)
 
-    def process_elbow(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    def process_elbow(
+        self,
+        data: Dict[str, pd.DataFrame],
+        k_values: Sequence[int] = range(2, 11),
+        jobs: Optional[int] = None,
+        warm_start: Optional[bool] = None,
+        sample_rows: Optional[int] = None,
+    ) -> pd.DataFrame:
         """
         Calculate inertia for k=2 to 10.
-        Returns DataFrame with 'k' and 'inertia'.
+
+        Args:
+            jobs: Threads fitting k values in parallel (default:
+                config.ELBOW_JOBS, None there meaning one per core)
+            warm_start: Seed each k from the previous k's centroids plus a
+                k-means++ pick, one Lloyd run per k, fitted in order
+                (default: config.ELBOW_WARM_START)
+            sample_rows: Fit on a sample of this many pincodes, stratified
+                by postal zone, scoring the fitted centroids on every
+                pincode (default: config.ELBOW_SAMPLE_ROWS; None fits every
+                pincode)
+
+        Returns DataFrame with 'k' and 'inertia', plus 'inertia_low' and
+        'inertia_high' when sampled: the band holding the inertia of a fit
+        on every pincode (see _inertia_band).
         """
+        jobs = jobs or config.ELBOW_JOBS or os.cpu_count() or 1
+        warm_start = config.ELBOW_WARM_START if warm_start is None else warm_start
+        sample_rows = sample_rows or config.ELBOW_SAMPLE_ROWS
+
         features_df = self._prepare_features(data)
         
         # Select numerical columns for clustering
-        cols = ["demo_ratio", "bio_ratio", "enroll_ratio", "avg_intensity", "total_freq"]
-        X = features_df[cols].fillna(0)
+        X = features_df[list(FEATURE_COLUMNS)].fillna(0)
         
         # Scale
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
-        
-        inertias = []
-        k_values = range(2, 11)
-        
-        for k in k_values:
-            model = KMeans(n_clusters=k, random_state=42, n_init=10)
-            model.fit(X_scaled)
-            inertias.append(model.inertia_)
-            
-        return pd.DataFrame({"k": k_values, "inertia": inertias})
-
-    def process_clusters(self, data: Dict[str, pd.DataFrame], k: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+
+        rng = np.random.default_rng(RANDOM_STATE)
+        sample = None
+        X_fit = X_scaled
+        if sample_rows is not None and sample_rows < len(X_scaled):
+            sample = _stratified_sample(features_df.index.to_numpy() // 100000, sample_rows, rng)
+            X_fit = X_scaled[sample[0]]
+
+        k_values = list(k_values)
+        if warm_start:
+            models, centers = [], None
+            for k in k_values:
+                init = "k-means++" if centers is None else _split_centers(X_fit, centers, k, rng)
+                model = _elbow_model(k, init).fit(X_fit)
+                models.append(model)
+                centers = model.cluster_centers_
+        else:
+            # Fits running at once split the cores' OpenMP threads between them
+            workers = max(1, min(jobs, len(k_values)))
+            with threadpool_limits(limits=max(1, (os.cpu_count() or 1) // workers), user_api="openmp"):
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    models = list(pool.map(lambda k: _elbow_model(k).fit(X_fit), k_values))
+
+        if sample is None:
+            return pd.DataFrame({"k": k_values, "inertia": [model.inertia_ for model in models]})
+
+        _, strata, sizes = sample
+        bands = [_inertia_band(X_scaled, X_fit, model.cluster_centers_, strata, sizes) for model in models]
+        inertia, low = (np.array(values) for values in zip(*bands))
+        return pd.DataFrame({
+            "k": k_values,
+            "inertia": inertia,
+            "inertia_low": low,
+            "inertia_high": inertia,
+        })
+
+    def process_clusters(
+        self,
+        data: Dict[str, pd.DataFrame],
+        k: int = N_CLUSTERS,
+        columns: Sequence[str] = FEATURE_COLUMNS,
+        random_state: int = RANDOM_STATE,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
-        Fit K-Means with k=5 and PCA.
+        Fit K-Means with k=5 and PCA (or reuse an earlier fit of the same inputs).
         Returns:
             - labeled_data: Original data with 'cluster' column
             - pca_data: DataFrame with 'PC1', 'PC2', 'cluster'
         """
-        features_df = self._prepare_features(data)
+        return self._cluster(self._prepare_features(data), k, columns, random_state)
+
+    def compute(self, features: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """``process_clusters`` with the defaults, on the shared per-pincode feature table."""
+        return self._cluster(features.copy(), N_CLUSTERS, FEATURE_COLUMNS, RANDOM_STATE)
+
+    def _cluster(
+        self, features_df: pd.DataFrame, k: int, columns: Sequence[str], random_state: int
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        # Adds the 'cluster' column to features_df
+        X = features_df[list(columns)].fillna(0)
+
+        if config.CLUSTER_MODEL:
+            clusters, pcs = self._stored_model(X, k, columns, random_state).apply(X)
+        else:
+            key = self._fit_key(X, k, columns, random_state)
+            path = self._fit_path(cache_dir(), key)
+            memo_key = (path.parent, key)
+            with self._fits_lock:
+                fit = self._fits.get(memo_key)
+                if fit is None:
+                    fit = self._read_fit(path, key, X.index)
+                if fit is None:
+                    fit = self._fit(X, k, random_state)
+                    self._write_fit(path, key, X.index, fit)
+                self._fits[memo_key] = fit
+                self._fits.move_to_end(memo_key)
+                if len(self._fits) > _FITS_KEPT:
+                    self._fits.popitem(last=False)
+            clusters, pcs = fit
+
+        features_df["cluster"] = clusters
         
-        cols = ["demo_ratio", "bio_ratio", "enroll_ratio", "avg_intensity", "total_freq"]
-        X = features_df[cols].fillna(0)
+        pca_df = pd.DataFrame(pcs, columns=["PC1", "PC2"], index=features_df.index)
+        pca_df["cluster"] = clusters
         
+        return features_df, pca_df
+
+    @staticmethod
+    def _fit(X: pd.DataFrame, k: int, random_state: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(cluster labels, 2D PCA projection) of the rows of ``X``."""
         # Scale
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
         
         # Fit K-Means
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+        kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=N_INIT)
         clusters = kmeans.fit_predict(X_scaled)
         
-        features_df["cluster"] = clusters
-        
         # Fit PCA
         pca = PCA(n_components=2)
         pcs = pca.fit_transform(X_scaled)
-        
-        pca_df = pd.DataFrame(pcs, columns=["PC1", "PC2"], index=features_df.index)
-        pca_df["cluster"] = clusters
-        
-        return features_df, pca_df
+        return clusters, pcs
+
+    def _stored_model(self, X: pd.DataFrame, k: int, columns: Sequence[str], random_state: int) -> ClusterModel:
+        """
+        The saved model for ``k`` clusters, refitted (and saved) first if
+        there is none, it was fitted on other columns or seed, a refit was
+        asked for (config.CLUSTER_REFIT, once per run), or ``X`` drifted past
+        config.CLUSTER_DRIFT_THRESHOLD.
+        """
+        path = model_dir() / f"clusters-k{k}.pkl"
+        with self._fits_lock:
+            model = self._models.get(path) or ClusterModel.load(path)
+            refit = (
+                model is None
+                or not model.matches(columns, k, random_state)
+                or (config.CLUSTER_REFIT and path not in self._refitted)
+                or model.drift(X) > config.CLUSTER_DRIFT_THRESHOLD
+            )
+            if refit:
+                model = ClusterModel.fit(X, k, random_state, N_INIT, previous=model)
+                model.save(path)
+                self._refitted.add(path)
+            self._models[path] = model
+            return model
+
+    @staticmethod
+    def _fit_key(X: pd.DataFrame, k: int, columns: Sequence[str], random_state: int) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "version": _FIT_VERSION,
+            "k": k,
+            "columns": list(columns),
+            "random_state": random_state,
+            "n_init": N_INIT,
+        }, sort_keys=True).encode("utf-8"))
+        digest.update(np.ascontiguousarray(X.index.to_numpy(dtype=np.int64)).tobytes())
+        digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _fit_path(root: Path, key: str) -> Path:
+        return root / "clusters" / f"{key[:32]}.npz"
+
+    @classmethod
+    def clear_fits(cls, root: Path) -> None:
+        """
+        Forget the fits memoised under the cache directory ``root``, in
+        memory and on disk (saved models are kept).
+        """
+        directory = root / "clusters"
+        with cls._fits_lock:
+            for memo_key in [memo_key for memo_key in cls._fits if memo_key[0] == directory]:
+                del cls._fits[memo_key]
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _read_fit(self, path: Path, key: str, index: pd.Index) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if not config.USE_DISK_CACHE:
+            return None
+        try:
+            with np.load(path) as stored:
+                if str(stored["key"]) != key or not np.array_equal(stored["pincode"], index.to_numpy()):
+                    return None
+                return stored["cluster"], stored["pcs"]
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _write_fit(self, path: Path, key: str, index: pd.Index, fit: Tuple[np.ndarray, np.ndarray]) -> None:
+        if not config.USE_DISK_CACHE:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".staging-", suffix=".npz", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, key=key, pincode=index.to_numpy(), cluster=fit[0], pcs=fit[1])
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
 
     def process(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """Default process method (not used directly, but required by abstract base)."""
         return self._prepare_features(data)
+
+
+def _elbow_model(k: int, init: Union[str, np.ndarray] = "k-means++") -> KMeans:
+    n_init = N_INIT if isinstance(init, str) else 1
+    return KMeans(n_clusters=k, init=init, n_init=n_init, random_state=RANDOM_STATE)
+
+
+def _split_centers(X: np.ndarray, centers: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """``centers`` plus k-means++ picks (points drawn by squared distance) up to ``k`` centers."""
+    centers = centers[:k]
+    while len(centers) < k:
+        distances = _squared_distances(X, centers)
+        total = distances.sum()
+        if total > 0:
+            pick = rng.choice(len(X), p=distances / total)
+        else:
+            pick = rng.integers(len(X))
+        centers = np.vstack([centers, X[pick]])
+    return centers
+
+
+def _squared_distances(X: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Squared distance of each row of ``X`` to its nearest center."""
+    return ((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+
+
+def _stratified_sample(
+    strata: np.ndarray, rows: int, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray, Dict[int, int]]:
+    """
+    (positions, their strata, rows per stratum) of a sample of about
+    ``rows`` rows, allocated to strata in proportion to their size (at
+    least two per stratum, so each has a variance).
+    """
+    positions = []
+    sizes = {}
+    for stratum in np.unique(strata):
+        members = np.flatnonzero(strata == stratum)
+        sizes[int(stratum)] = len(members)
+        take = min(len(members), max(2, round(rows * len(members) / len(strata))))
+        positions.append(rng.choice(members, size=take, replace=False))
+    positions = np.sort(np.concatenate(positions))
+    return positions, strata[positions], sizes
+
+
+def _estimate_inertia(distances: np.ndarray, strata: np.ndarray, sizes: Dict[int, int]) -> Tuple[float, float]:
+    """
+    Stratified estimate of the full inertia from the sampled rows' squared
+    distances, and the half-width of its 95% confidence interval.
+    """
+    total = variance = 0.0
+    for stratum, size in sizes.items():
+        values = distances[strata == stratum]
+        total += size * values.mean()
+        if len(values) > 1:
+            variance += size ** 2 * values.var(ddof=1) / len(values) * (1 - len(values) / size)
+    return total, 1.96 * np.sqrt(variance)
+
+
+def _inertia_band(
+    X: np.ndarray, X_sample: np.ndarray, centers: np.ndarray, strata: np.ndarray, sizes: Dict[int, int]
+) -> Tuple[float, float]:
+    """
+    (high, low) bounds on the inertia of a fit on all of ``X``, from
+    ``centers`` fitted on ``X_sample``. Their inertia over all of ``X`` (one
+    distance pass) is one a full fit matches or beats. Their inertia over
+    the sample they were fitted to is biased low, so its stratified
+    estimate less the sampling margin sits below a full fit's.
+    """
+    high = float(_squared_distances(X, centers).sum())
+    estimate, margin = _estimate_inertia(_squared_distances(X_sample, centers), strata, sizes)
+    return high, min(estimate - margin, high)
@@ -0,0 +1,46 @@
+"""
+Processor Context
+The DataLoader whose data the current thread's processors work on, so
+what they keep on disk (cached results, memoised cluster fits, saved
+cluster models) goes under that loader's directories rather than every
+loader's in one place.
+The processor graph sets it while computing a node, and charts while
+generating; processors called outside both use the configured ones
+(config.CACHE_DIR, config.CLUSTER_MODEL_DIR).
+"""
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import config
+from src.data_loader import DataLoader
+
+_current = threading.local()
+
+
+@contextmanager
+def working_for(loader: DataLoader) -> Iterator[None]:
+    """Make ``loader`` the current thread's loader until the block ends."""
+    previous = current_loader()
+    _current.loader = loader
+    try:
+        yield
+    finally:
+        _current.loader = previous
+
+
+def current_loader() -> Optional[DataLoader]:
+    return getattr(_current, "loader", None)
+
+
+def cache_dir() -> Path:
+    """The current loader's cache directory (config.CACHE_DIR without one)."""
+    loader = current_loader()
+    return config.CACHE_DIR if loader is None else loader.cache_dir
+
+
+def model_dir() -> Path:
+    """The current loader's model directory (config.CLUSTER_MODEL_DIR without one)."""
+    loader = current_loader()
+    return config.CLUSTER_MODEL_DIR if loader is None else loader.model_dir
@@ -10,11 +10,18 @@ from typing import Dict
 import pandas as pd
 import numpy as np
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .graph import register_processor
+from .pincode_features import PincodeFeatureProcessor
 
 
+@register_processor
 class CorrelationMatrixProcessor(BaseProcessor):
 
+    requires = dataset_columns("pincode")
+    inputs = ("pincode_features",)
+    output = "correlation_matrix"
+
     @property
     def name(self) -> str:
         return "correlation_matrix_processor"
@@ -26,62 +33,19 @@ class CorrelationMatrixProcessor(BaseProcessor):
         Returns:
             DataFrame: 7x7 correlation matrix
         """
-        # Aggregate by pincode
-        demo_agg = (
-            data["demographic"]
-            .assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-            .groupby("pincode")
-            .agg(
-                total_demo_interactions=("total", "sum"),
-                demo_interaction_frequency=("total", "count")
-            )
-            .reset_index()
-        )
-        
-        bio_agg = (
-            data["biometric"]
-            .assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-            .groupby("pincode")
-            .agg(
-                total_bio_interactions=("total", "sum"),
-                bio_interaction_frequency=("total", "count")
-            )
-            .reset_index()
-        )
-        
-        enroll_agg = (
-            data["enrollment"]
-            .assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-            .groupby("pincode")
-            .agg(
-                total_enrollments=("total", "sum"),
-                enrollment_frequency=("total", "count")
-            )
-            .reset_index()
-        )
-        
-        # Get all unique pincodes
-        all_pincodes = pd.concat([
-            demo_agg[["pincode"]],
-            bio_agg[["pincode"]],
-            enroll_agg[["pincode"]]
-        ]).drop_duplicates()
-        
-        # Merge all metrics
-        metrics = all_pincodes.copy()
-        metrics = metrics.merge(demo_agg, on="pincode", how="left")
-        metrics = metrics.merge(bio_agg, on="pincode", how="left")
-        metrics = metrics.merge(enroll_agg, on="pincode", how="left")
-        
-        # Fill NaN with 0
-        metrics = metrics.fillna(0)
-        
-        # Calculate total engagement frequency
-        metrics["total_engagement_frequency"] = (
-            metrics["demo_interaction_frequency"] +
-            metrics["bio_interaction_frequency"] +
-            metrics["enrollment_frequency"]
-        )
+        return self.compute(PincodeFeatureProcessor().process(data))
+
+    def compute(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Correlation matrix of the shared per-pincode feature table."""
+        metrics = pd.DataFrame({
+            "total_demo_interactions": features["demo_total"],
+            "total_bio_interactions": features["bio_total"],
+            "total_enrollments": features["enroll_total"],
+            "demo_interaction_frequency": features["demo_freq"],
+            "bio_interaction_frequency": features["bio_freq"],
+            "enrollment_frequency": features["enroll_freq"],
+            "total_engagement_frequency": features["total_freq"],
+        })
         
         # Select the 7 metrics for correlation
         metric_columns = [
@@ -5,44 +5,52 @@ Data Points:
   - demo_total = SUM(demo_age_5_17 + demo_age_17_) per day
   - bio_total = SUM(bio_age_5_17 + bio_age_17_) per day
   - enroll_total = SUM(age_0_5 + age_5_17 + age_18_greater) per day
+Graph node: daily, from totals:date
 """
 from typing import Dict
 
 import pandas as pd
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .dataset_totals import DatasetTotalsProcessor
+from .graph import register_processor
 
 
+@register_processor
 class DailyAggregator(BaseProcessor):
 
+    requires = dataset_columns("date")
+    inputs = ("totals:date",)
+    output = "daily"
+
     @property
     def name(self) -> str:
         return "daily_aggregator"
 
     def process(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-        demo = data["demographic"]
-        bio = data["biometric"]
-        enroll = data["enrollment"]
+        return self.compute(DatasetTotalsProcessor("date").process(data))
 
+    def compute(self, totals: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Daily sums of the per-row totals (the totals:date node)."""
         demo_daily = (
-            demo
-            .assign(demo_total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-            .groupby("date", as_index=False)["demo_total"]
+            totals["demographic"]
+            .groupby("date", as_index=False)["total"]
             .sum()
+            .rename(columns={"total": "demo_total"})
         )
 
         bio_daily = (
-            bio
-            .assign(bio_total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-            .groupby("date", as_index=False)["bio_total"]
+            totals["biometric"]
+            .groupby("date", as_index=False)["total"]
             .sum()
+            .rename(columns={"total": "bio_total"})
         )
 
         enroll_daily = (
-            enroll
-            .assign(enroll_total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-            .groupby("date", as_index=False)["enroll_total"]
+            totals["enrollment"]
+            .groupby("date", as_index=False)["total"]
             .sum()
+            .rename(columns={"total": "enroll_total"})
         )
 
         merged = (
@@ -0,0 +1,68 @@
+"""
+Dataset Totals Processor
+Adds each dataset's per-row ``total``, shared by the ranking and time
+aggregators (graph node totals:<level>, from rollup:<level>).
+Data Points:
+  - demographic: demo_age_5_17 + demo_age_17_
+  - biometric: bio_age_5_17 + bio_age_17_
+  - enrollment: age_0_5 + age_5_17 + age_18_greater
+"""
+from typing import Dict
+
+import pandas as pd
+
+import config
+from src.ingest import count_columns
+
+from .base import BaseProcessor, dataset_columns
+from .graph import ROLLUP_PREFIX, register_processor
+
+TOTAL_COLUMN = "total"
+
+# Rollup levels published with totals
+LEVELS = ("date", "state", "district")
+
+
+def add_total(df: pd.DataFrame, dataset: str) -> pd.DataFrame:
+    """``df`` with the dataset's ``total`` column (unchanged if it has one)."""
+    if TOTAL_COLUMN in df.columns:
+        return df
+    if dataset not in config.DATASET_SCHEMAS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    first, *rest = count_columns(config.DATASET_SCHEMAS[dataset])
+    total = df[first]
+    for column in rest:
+        total = total + df[column]
+    return df.assign(**{TOTAL_COLUMN: total})
+
+
+class DatasetTotalsProcessor(BaseProcessor):
+
+    requires = dataset_columns()
+
+    def __init__(self, level: str):
+        self.level = level
+        self.inputs = (f"{ROLLUP_PREFIX}{level}",)
+        self.output = f"totals:{level}"
+
+    @property
+    def name(self) -> str:
+        return "dataset_totals_processor"
+
+    def process(self, data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Returns:
+            The frames of ``data``, each with its dataset's ``total`` column
+        """
+        return {dataset: add_total(df, dataset) for dataset, df in data.items()}
+
+    def compute(self, data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        return self.process(data)
+
+    def cache_settings(self) -> None:
+        # Adding a column is cheaper than storing the frames
+        return None
+
+
+for _level in LEVELS:
+    register_processor(DatasetTotalsProcessor(_level))
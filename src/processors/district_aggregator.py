@@ -4,87 +4,93 @@ Aggregates data by district for ranking charts.
 Data Points:
   - demographic: SUM(demo_age_5_17 + demo_age_17_) GROUP BY (state, district)
 """
-from typing import Dict
+from typing import Dict, Optional
 
 import pandas as pd
 
-from .base import BaseProcessor
+from src.ingest import Dimensions
+
+from .base import BaseProcessor, dataset_columns
+from .dataset_totals import add_total
+
+STATE_ABBREVIATIONS = {
+    "Andhra Pradesh": "AP",
+    "Arunachal Pradesh": "AR",
+    "Assam": "AS",
+    "Bihar": "BR",
+    "Chhattisgarh": "CG",
+    "Goa": "GA",
+    "Gujarat": "GJ",
+    "Haryana": "HR",
+    "Himachal Pradesh": "HP",
+    "Jharkhand": "JH",
+    "Karnataka": "KA",
+    "Kerala": "KL",
+    "Madhya Pradesh": "MP",
+    "Maharashtra": "MH",
+    "Manipur": "MN",
+    "Meghalaya": "ML",
+    "Mizoram": "MZ",
+    "Nagaland": "NL",
+    "Odisha": "OD",
+    "Punjab": "PB",
+    "Rajasthan": "RJ",
+    "Sikkim": "SK",
+    "Tamil Nadu": "TN",
+    "Telangana": "TG",
+    "Tripura": "TR",
+    "Uttar Pradesh": "UP",
+    "Uttarakhand": "UK",
+    "West Bengal": "WB",
+}
+
+
+def abbreviate_state(state: str) -> str:
+    return STATE_ABBREVIATIONS.get(state, state[:2].upper())
 
 
 class DistrictAggregator(BaseProcessor):
 
+    requires = dataset_columns("state", "district")
+    inputs = ("totals:district",)
+
     @property
     def name(self) -> str:
         return "district_aggregator"
 
-    def process(self, data: Dict[str, pd.DataFrame], dataset: str = "demographic", top_n: int = 20) -> pd.DataFrame:
+    def process(
+        self,
+        data: Dict[str, pd.DataFrame],
+        dataset: str = "demographic",
+        top_n: int = 20,
+        dimensions: Optional[Dimensions] = None,
+    ) -> pd.DataFrame:
         """
         Aggregate data by district.
-        
+
+        Rows keyed by ``district_id`` are labelled through ``dimensions``;
+        rows still carrying ``state``/``district`` labels are encoded here
+        first.
+
         Returns:
             DataFrame with columns: district_label, total
         """
         df = data[dataset]
+        if "district_id" not in df.columns:
+            dimensions = Dimensions()
+            df = dimensions.encode(df)
+        elif dimensions is None:
+            raise ValueError("district_id keys need the dimension tables to label them")
+
+        # Frames from the totals:district node already carry the per-row total
+        result = add_total(df, dataset).groupby("district_id", as_index=False)["total"].sum()
+
+        # Labels are joined back for the top rows only
+        top = result.nlargest(top_n, "total")
+        ids = top.pop("district_id")
+        top.insert(0, "state", dimensions.state_names(dimensions.district_states(ids)))
+        top.insert(1, "district", dimensions.district_names(ids))
+        top["state_abbr"] = [abbreviate_state(state) for state in top["state"]]
+        top["district_label"] = top["district"] + ", " + top["state_abbr"]
 
-        if dataset == "demographic":
-            result = (
-                df
-                .assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-                .groupby(["state", "district"], as_index=False)["total"]
-                .sum()
-            )
-        elif dataset == "biometric":
-            result = (
-                df
-                .assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-                .groupby(["state", "district"], as_index=False)["total"]
-                .sum()
-            )
-        elif dataset == "enrollment":
-            result = (
-                df
-                .assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-                .groupby(["state", "district"], as_index=False)["total"]
-                .sum()
-            )
-        else:
-            raise ValueError(f"Unknown dataset: {dataset}")
-
-        # Create state abbreviations (first 2-3 letters)
-        def abbreviate_state(state):
-            abbrev = {
-                "Andhra Pradesh": "AP",
-                "Arunachal Pradesh": "AR",
-                "Assam": "AS",
-                "Bihar": "BR",
-                "Chhattisgarh": "CG",
-                "Goa": "GA",
-                "Gujarat": "GJ",
-                "Haryana": "HR",
-                "Himachal Pradesh": "HP",
-                "Jharkhand": "JH",
-                "Karnataka": "KA",
-                "Kerala": "KL",
-                "Madhya Pradesh": "MP",
-                "Maharashtra": "MH",
-                "Manipur": "MN",
-                "Meghalaya": "ML",
-                "Mizoram": "MZ",
-                "Nagaland": "NL",
-                "Odisha": "OD",
-                "Punjab": "PB",
-                "Rajasthan": "RJ",
-                "Sikkim": "SK",
-                "Tamil Nadu": "TN",
-                "Telangana": "TG",
-                "Tripura": "TR",
-                "Uttar Pradesh": "UP",
-                "Uttarakhand": "UK",
-                "West Bengal": "WB",
-            }
-            return abbrev.get(state, state[:2].upper())
-        
-        result["state_abbr"] = result["state"].apply(abbreviate_state)
-        result["district_label"] = result["district"] + ", " + result["state_abbr"]
-        
-        return result.nlargest(top_n, "total").sort_values("total", ascending=True)
+        return top.sort_values("total", ascending=True)
@@ -9,11 +9,18 @@ from typing import Dict
 
 import pandas as pd
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .graph import register_processor
+from .pincode_features import PincodeFeatureProcessor
 
 
+@register_processor
 class EngagementDiversityProcessor(BaseProcessor):
 
+    requires = dataset_columns("pincode")
+    inputs = ("pincode_features",)
+    output = "engagement_diversity"
+
     @property
     def name(self) -> str:
         return "engagement_diversity_processor"
@@ -25,46 +32,12 @@ class EngagementDiversityProcessor(BaseProcessor):
         Returns:
             DataFrame with columns: type_count, pincode_count
         """
-        # Calculate total interactions per pincode for each dataset
-        demo_totals = (
-            data["demographic"]
-            .assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-            .groupby("pincode", as_index=False)["total"]
-            .sum()
-            .rename(columns={"total": "demo_total"})
-        )
-        
-        bio_totals = (
-            data["biometric"]
-            .assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-            .groupby("pincode", as_index=False)["total"]
-            .sum()
-            .rename(columns={"total": "bio_total"})
-        )
-        
-        enroll_totals = (
-            data["enrollment"]
-            .assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-            .groupby("pincode", as_index=False)["total"]
-            .sum()
-            .rename(columns={"total": "enroll_total"})
-        )
-        
-        # Get all unique pincodes
-        all_pincodes = pd.concat([
-            demo_totals[["pincode"]],
-            bio_totals[["pincode"]],
-            enroll_totals[["pincode"]]
-        ]).drop_duplicates()
-        
-        # Merge all totals
-        result = all_pincodes.copy()
-        result = result.merge(demo_totals, on="pincode", how="left")
-        result = result.merge(bio_totals, on="pincode", how="left")
-        result = result.merge(enroll_totals, on="pincode", how="left")
-        
-        # Fill NaN with 0
-        result = result.fillna(0)
+        return self.compute(PincodeFeatureProcessor().process(data))
+
+    def compute(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Diversity counts from the shared per-pincode feature table."""
+        # Totals per pincode (copied, as columns are added)
+        result = features.copy()
         
         # Calculate type count (how many types have activity > 0)
         result["has_demo"] = (result["demo_total"] > 0).astype(int)
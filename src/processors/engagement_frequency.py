@@ -10,11 +10,18 @@ from typing import Dict
 import pandas as pd
 import numpy as np
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .graph import register_processor
+from .pincode_features import PincodeFeatureProcessor
 
 
+@register_processor
 class EngagementFrequencyProcessor(BaseProcessor):
 
+    requires = dataset_columns("pincode", counts=False)
+    inputs = ("pincode_features",)
+    output = "engagement_frequency"
+
     @property
     def name(self) -> str:
         return "engagement_frequency_processor"
@@ -26,33 +33,13 @@ class EngagementFrequencyProcessor(BaseProcessor):
         Returns:
             DataFrame with columns: pincode, total_frequency
         """
-        # Count frequency per pincode in each dataset
-        demo_freq = data["demographic"].groupby("pincode").size().reset_index(name="demo_freq")
-        bio_freq = data["biometric"].groupby("pincode").size().reset_index(name="bio_freq")
-        enroll_freq = data["enrollment"].groupby("pincode").size().reset_index(name="enroll_freq")
-        
-        # Get all unique pincodes
-        all_pincodes = pd.concat([
-            demo_freq[["pincode"]],
-            bio_freq[["pincode"]],
-            enroll_freq[["pincode"]]
-        ]).drop_duplicates()
-        
-        # Merge all frequencies
-        result = all_pincodes.copy()
-        result = result.merge(demo_freq, on="pincode", how="left")
-        result = result.merge(bio_freq, on="pincode", how="left")
-        result = result.merge(enroll_freq, on="pincode", how="left")
-        
-        # Fill NaN with 0
-        result = result.fillna(0)
-        
-        # Calculate total frequency
-        result["total_frequency"] = (
-            result["demo_freq"] + 
-            result["bio_freq"] + 
-            result["enroll_freq"]
-        )
+        return self.compute(PincodeFeatureProcessor().process(data))
+
+    def compute(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Pincode frequencies from the shared per-pincode feature table."""
+        # Frequency per pincode
+        result = features.reset_index()
+        result = result.rename(columns={"total_freq": "total_frequency"})
         
         # Filter to 95th percentile
         percentile_95 = result["total_frequency"].quantile(0.95)
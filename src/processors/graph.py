@@ -0,0 +1,174 @@
+"""
+Processor Graph
+Intermediate results shared between processors, computed once per run.
+Nodes:
+  - rollup:<level>: the loader's rollups at that level (get_rollup_data)
+  - every name a registered processor publishes as its ``output``, from
+    the nodes it lists as ``inputs`` (e.g. totals:<level>, the rollups with
+    each dataset's row totals; pincode_features; daily)
+A node is evaluated once per set of datasets (and their projected
+columns) and its value handed to every dependent, so values are shared
+and must not be modified. Values are dropped when the loader's cache is
+cleared (DataLoader.clear_cache). ``compute`` evaluates the nodes a set of charts
+reads, running nodes that do not depend on each other concurrently.
+Nodes are computed working for the graph's loader (see context), so what
+processors store on disk goes under its cache directory.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar, Union
+from weakref import WeakKeyDictionary
+
+import config
+from src.data_loader import DATASETS, DataLoader, Requirements
+
+from .base import BaseProcessor
+from .context import working_for
+
+ROLLUP_PREFIX = "rollup:"
+
+# Node name -> the processor publishing it
+_PRODUCERS: Dict[str, BaseProcessor] = {}
+
+# (node name, (dataset, projected columns) pairs)
+Key = Tuple[str, Tuple[Tuple[str, Tuple[str, ...]], ...]]
+
+P = TypeVar("P", bound=Union[BaseProcessor, Type[BaseProcessor]])
+
+
+def register_processor(processor: P) -> P:
+    """
+    Publish a processor's ``output`` node; takes a processor, or (as a
+    class decorator) a processor class constructed without arguments.
+    """
+    instance = processor() if isinstance(processor, type) else processor
+    if instance.output is None:
+        raise ValueError(f"{instance.name} has no output to publish")
+    _PRODUCERS[instance.output] = instance
+    return processor
+
+
+class ProcessorGraph:
+
+    _graphs: "WeakKeyDictionary[DataLoader, ProcessorGraph]" = WeakKeyDictionary()
+    _graphs_lock = threading.Lock()
+
+    def __init__(self, loader: DataLoader):
+        self.loader = loader
+        self._values: Dict[Key, Any] = {}
+        self._locks: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # The loader generation the values were computed from
+        self._generation = loader.generation
+
+    @classmethod
+    def of(cls, loader: DataLoader) -> ProcessorGraph:
+        """The graph of ``loader``'s data (one per loader, so one per run)."""
+        with cls._graphs_lock:
+            graph = cls._graphs.get(loader)
+            if graph is None:
+                graph = cls._graphs[loader] = cls(loader)
+            return graph
+
+    def get(self, name: str, requires: Optional[Requirements] = None) -> Any:
+        """
+        Value of node ``name`` over the datasets ``requires`` names (default:
+        all), after adding its columns to the projection.
+        """
+        return self._evaluate(self._key(name, requires))
+
+    def compute(self, requests: Iterable[Tuple[str, Optional[Requirements]]], jobs: Optional[int] = None) -> None:
+        """
+        Evaluate the (name, requires) nodes and everything they depend on,
+        each once, in ``jobs`` threads (default: config.PROCESSOR_JOBS, None
+        there meaning one per core); a node starts once its inputs are done.
+        """
+        jobs = jobs or config.PROCESSOR_JOBS or os.cpu_count() or 1
+        pending = self._dependencies([self._key(name, requires) for name, requires in requests])
+        if jobs == 1:
+            # Dependencies come first
+            for key in pending:
+                self._evaluate(key)
+            return
+
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="processor") as pool:
+            running = {}
+            while pending or running:
+                for key in [key for key, inputs in pending.items() if not inputs]:
+                    del pending[key]
+                    running[pool.submit(self._evaluate, key)] = key
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    future.result()
+                    for inputs in pending.values():
+                        inputs.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values = {}
+            self._locks = {}
+
+    def _key(self, name: str, requires: Optional[Requirements]) -> Key:
+        if requires is not None:
+            self.loader.project(requires)
+        datasets = DATASETS if requires is None else tuple(requires)
+        return name, tuple((dataset, tuple(self.loader.columns(dataset))) for dataset in datasets)
+
+    def _inputs(self, key: Key) -> List[Key]:
+        name, datasets = key
+        if name.startswith(ROLLUP_PREFIX):
+            return []
+        return [(input_name, datasets) for input_name in _producer(name).inputs]
+
+    def _dependencies(self, keys: List[Key]) -> Dict[Key, Set[Key]]:
+        """Node -> its inputs, for ``keys`` and every node below them, dependencies first."""
+        ordered: Dict[Key, Set[Key]] = {}
+        visiting: Set[Key] = set()
+
+        def visit(key: Key) -> None:
+            if key in ordered:
+                return
+            if key in visiting:
+                raise ValueError(f"Processor graph has a cycle through '{key[0]}'")
+            visiting.add(key)
+            inputs = self._inputs(key)
+            for input_key in inputs:
+                visit(input_key)
+            visiting.discard(key)
+            ordered[key] = set(inputs)
+
+        for key in keys:
+            visit(key)
+        return ordered
+
+    def _evaluate(self, key: Key) -> Any:
+        with self._lock:
+            if self._generation != self.loader.generation:
+                self._values, self._locks = {}, {}
+                self._generation = self.loader.generation
+            values = self._values
+            lock = self._locks.setdefault(key, threading.Lock())
+        # One thread evaluates a node; others asking for it wait for the value
+        with lock:
+            if key not in values:
+                values[key] = self._produce(key)
+            return values[key]
+
+    def _produce(self, key: Key) -> Any:
+        name, datasets = key
+        if name.startswith(ROLLUP_PREFIX):
+            return self.loader.get_rollup_data(name[len(ROLLUP_PREFIX):], {dataset: () for dataset, _ in datasets})
+        inputs = [self._evaluate(input_key) for input_key in self._inputs(key)]
+        with working_for(self.loader):
+            return _producer(name).compute(*inputs)
+
+
+def _producer(name: str) -> BaseProcessor:
+    try:
+        return _PRODUCERS[name]
+    except KeyError:
+        raise ValueError(f"No processor publishes the node '{name}'") from None
@@ -10,11 +10,18 @@ from typing import Dict
 import pandas as pd
 import numpy as np
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .graph import register_processor
+from .pincode_features import PincodeFeatureProcessor
 
 
+@register_processor
 class IntensityProcessor(BaseProcessor):
 
+    requires = dataset_columns("pincode")
+    inputs = ("pincode_features",)
+    output = "intensity"
+
     @property
     def name(self) -> str:
         return "intensity_processor"
@@ -26,49 +33,13 @@ class IntensityProcessor(BaseProcessor):
         Returns:
             DataFrame with columns: pincode, intensity_score
         """
-        # Aggregate totals per pincode
-        demo_agg = (
-            data["demographic"]
-            .assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-            .groupby("pincode")["total"]
-            .sum()
-            .reset_index(name="demo_total")
-        )
-        
-        bio_agg = (
-            data["biometric"]
-            .assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-            .groupby("pincode")["total"]
-            .sum()
-            .reset_index(name="bio_total")
-        )
-        
-        enroll_agg = (
-            data["enrollment"]
-            .assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-            .groupby("pincode")["total"]
-            .sum()
-            .reset_index(name="enroll_total")
-        )
-
-        # Get frequencies (number of update events/rows)
-        demo_freq = data["demographic"].groupby("pincode").size().reset_index(name="demo_freq")
-        bio_freq = data["biometric"].groupby("pincode").size().reset_index(name="bio_freq")
-        enroll_freq = data["enrollment"].groupby("pincode").size().reset_index(name="enroll_freq")
+        return self.compute(PincodeFeatureProcessor().process(data))
 
-        # Merge everything
-        result = demo_agg.merge(bio_agg, on="pincode", how="outer")
-        result = result.merge(enroll_agg, on="pincode", how="outer")
-        result = result.merge(demo_freq, on="pincode", how="outer")
-        result = result.merge(bio_freq, on="pincode", how="outer")
-        result = result.merge(enroll_freq, on="pincode", how="outer")
-        result = result.fillna(0)
-
-        # Calculate total frequency
-        result["total_frequency"] = result["demo_freq"] + result["bio_freq"] + result["enroll_freq"]
-        
-        # Filter 0 frequency to avoid division by zero (should not happen if data exists, but good safety)
-        result = result[result["total_frequency"] > 0]
+    def compute(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Intensity scores from the shared per-pincode feature table."""
+        # Totals and frequencies per pincode
+        result = features.sort_index().reset_index()
+        result = result.rename(columns={"total_freq": "total_frequency"})
 
         # Calculate Intensity Score
         result["weighted_sum"] = (
@@ -2,18 +2,26 @@
 Monthly Aggregator
 Aggregates data by month for engagement comparison.
 Data Points:
-  - Extract month from date
+  - month column (precomputed by the loader)
   - Calculate total interactions per month for each dataset
+Graph node: monthly, from totals:date
 """
 from typing import Dict
 
 import pandas as pd
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .dataset_totals import DatasetTotalsProcessor
+from .graph import register_processor
 
 
+@register_processor
 class MonthlyAggregator(BaseProcessor):
 
+    requires = dataset_columns("date")
+    inputs = ("totals:date",)
+    output = "monthly"
+
     @property
     def name(self) -> str:
         return "monthly_aggregator"
@@ -25,26 +33,33 @@ class MonthlyAggregator(BaseProcessor):
         Returns:
             DataFrame with columns: month, demographic, biometric, enrollment
         """
+        return self.compute(DatasetTotalsProcessor("date").process(data))
+
+    def compute(self, totals: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Monthly sums of the per-row totals (the totals:date node)."""
         # Process demographic data
-        demo_df = data["demographic"].copy()
-        demo_df["total"] = demo_df["demo_age_5_17"] + demo_df["demo_age_17_"]
-        demo_df["date"] = pd.to_datetime(demo_df["date"], format="%d-%m-%Y")
-        demo_df["month"] = demo_df["date"].dt.to_period("M")
-        demo_monthly = demo_df.groupby("month", as_index=False)["total"].sum().rename(columns={"total": "demographic"})
+        demo_monthly = (
+            totals["demographic"]
+            .groupby("month", as_index=False)["total"]
+            .sum()
+            .rename(columns={"total": "demographic"})
+        )
         
         # Process biometric data
-        bio_df = data["biometric"].copy()
-        bio_df["total"] = bio_df["bio_age_5_17"] + bio_df["bio_age_17_"]
-        bio_df["date"] = pd.to_datetime(bio_df["date"], format="%d-%m-%Y")
-        bio_df["month"] = bio_df["date"].dt.to_period("M")
-        bio_monthly = bio_df.groupby("month", as_index=False)["total"].sum().rename(columns={"total": "biometric"})
+        bio_monthly = (
+            totals["biometric"]
+            .groupby("month", as_index=False)["total"]
+            .sum()
+            .rename(columns={"total": "biometric"})
+        )
         
         # Process enrollment data
-        enroll_df = data["enrollment"].copy()
-        enroll_df["total"] = enroll_df["age_0_5"] + enroll_df["age_5_17"] + enroll_df["age_18_greater"]
-        enroll_df["date"] = pd.to_datetime(enroll_df["date"], format="%d-%m-%Y")
-        enroll_df["month"] = enroll_df["date"].dt.to_period("M")
-        enroll_monthly = enroll_df.groupby("month", as_index=False)["total"].sum().rename(columns={"total": "enrollment"})
+        enroll_monthly = (
+            totals["enrollment"]
+            .groupby("month", as_index=False)["total"]
+            .sum()
+            .rename(columns={"total": "enrollment"})
+        )
         
         # Merge all months
         result = demo_monthly.merge(bio_monthly, on="month", how="outer")
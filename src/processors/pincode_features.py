@@ -0,0 +1,101 @@
+"""
+Pincode Feature Processor
+Builds the per-pincode feature table shared by the pincode-level processors
+(correlation, intensity, diversity, level, frequency, clustering).
+Data Points (one row per pincode, indexed by pincode):
+  - demo_total, bio_total, enroll_total: summed count columns per dataset
+  - demo_freq, bio_freq, enroll_freq: source rows per dataset
+  - total_inter, total_freq: the above summed over the datasets
+  - demo_ratio, bio_ratio, enroll_ratio: each dataset's share of total_inter
+  - avg_intensity, demo_intensity, bio_intensity, enroll_intensity
+  - engagement_score, balance_score
+The table is the graph node pincode_features, so the charts of a run share
+one (see ProcessorGraph). Sums are taken with np.bincount straight into
+arrays indexed by pincode (see sum_by_pincode). Without a dataset's count
+columns (a projection without counts) only the frequency columns are built.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.ingest import ROWS_COLUMN, count_columns, sum_by_pincode
+
+from .base import BaseProcessor, dataset_columns
+from .graph import register_processor
+
+# Column prefix per dataset
+PREFIXES = {
+    "demographic": "demo",
+    "biometric": "bio",
+    "enrollment": "enroll",
+}
+
+
+@register_processor
+class PincodeFeatureProcessor(BaseProcessor):
+
+    requires = dataset_columns("pincode")
+    inputs = ("rollup:pincode",)
+    output = "pincode_features"
+
+    @property
+    def name(self) -> str:
+        return "pincode_feature_processor"
+
+    def process(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Per-pincode feature table of ``data`` (a new frame; callers may add columns).
+
+        Returns:
+            DataFrame indexed by pincode (the demographic pincodes, then
+            those only in later datasets) with the columns listed above
+        """
+        parts = []
+        has_totals = True
+        for dataset, prefix in PREFIXES.items():
+            df = data[dataset]
+            counts = count_columns(config.DATASET_SCHEMAS[dataset])
+            outputs = {}
+            if all(column in df.columns for column in counts):
+                outputs[f"{prefix}_total"] = sum(df[column].to_numpy(dtype=np.float64) for column in counts)
+            else:
+                has_totals = False
+            # Raw rows count once each
+            outputs[f"{prefix}_freq"] = df[ROWS_COLUMN].to_numpy() if ROWS_COLUMN in df.columns else None
+            parts.append((df["pincode"].to_numpy(), outputs))
+
+        # One bincount per column over the three datasets, no hashing or merges
+        features = sum_by_pincode(parts)
+        if not has_totals:
+            features = features.drop(columns=[f"{prefix}_total" for prefix in PREFIXES], errors="ignore")
+        else:
+            features["total_inter"] = features["demo_total"] + features["bio_total"] + features["enroll_total"]
+        features["total_freq"] = features["demo_freq"] + features["bio_freq"] + features["enroll_freq"]
+        # Avoid division by zero
+        features = features[features["total_freq"] > 0].copy()
+        if not has_totals:
+            return features
+
+        for prefix in PREFIXES.values():
+            features[f"{prefix}_ratio"] = features[f"{prefix}_total"] / features["total_inter"]
+        features["avg_intensity"] = features["total_inter"] / features["total_freq"]
+
+        # Engagement Score (Chart 21)
+        features["engagement_score"] = (
+            features["demo_total"] * 0.2 +
+            features["bio_total"] * 0.4 +
+            features["enroll_total"] * 0.4
+        )
+
+        # Per-visit intensities (Chart 22); a dataset with no rows has a zero total
+        for prefix in PREFIXES.values():
+            features[f"{prefix}_intensity"] = features[f"{prefix}_total"] / features[f"{prefix}_freq"].replace(0, 1)
+
+        # Balance Score (Chart 23): 1 - row-wise std of the three ratios
+        features["balance_score"] = 1 - features[["demo_ratio", "bio_ratio", "enroll_ratio"]].std(axis=1)
+        return features
+
+    def compute(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        return self.process(data)
@@ -0,0 +1,251 @@
+"""
+Result Cache
+Processor results kept on disk under <cache dir>/results, the cache
+directory of the loader whose data they come from (see context), so a
+rerun over unchanged data (e.g. after a chart's styling changed) reads
+them back instead of recomputing them.
+A result is stored under a key hashing the processor (class, name,
+``version`` and the processors' source), the method, its settings
+(``cache_settings``) and every argument, data frames by their contents
+(column names, dtypes, index and values), so the same data loaded again
+finds it but changed processor code does not. Results are stored as
+zlib-compressed pickles. Past config.RESULT_CACHE_BYTES the least recently
+used are deleted (reading one counts as a use).
+Calls made while another cached call runs (e.g. a process method asking
+another processor for its input) are not cached on their own: the outer
+result covers them.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.ingest import Dimensions
+
+from .context import cache_dir
+
+# Bump when the key or the stored format changes
+FORMAT_VERSION = 1
+
+# Under the loader's cache directory
+DIRECTORY = "results"
+SUFFIX = ".pkz"
+
+_active = threading.local()
+_evict_lock = threading.Lock()
+
+
+class Uncacheable(TypeError):
+    """An argument the cache cannot fingerprint; the call is not cached."""
+
+
+def fingerprint(value: Any, digest: "hashlib._Hash") -> None:
+    """Feed ``value`` into ``digest``, data frames and arrays by their contents."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(b"frame")
+        _update_json(digest, [[str(name), str(dtype)] for name, dtype in value.dtypes.items()])
+        fingerprint(value.index, digest)
+        for _, column in value.items():
+            _fingerprint_values(column, digest)
+    elif isinstance(value, pd.Series):
+        digest.update(b"series")
+        _update_json(digest, [str(value.name), str(value.dtype)])
+        fingerprint(value.index, digest)
+        _fingerprint_values(value, digest)
+    elif isinstance(value, pd.RangeIndex):
+        _update_json(digest, ["range_index", value.start, value.stop, value.step, str(value.name)])
+    elif isinstance(value, pd.Index):
+        _update_json(digest, ["index", str(value.dtype), [str(name) for name in value.names]])
+        _fingerprint_values(value, digest)
+    elif isinstance(value, np.ndarray):
+        _update_json(digest, ["array", str(value.dtype), list(value.shape)])
+        _fingerprint_values(value, digest)
+    elif isinstance(value, Dimensions):
+        # Labels of the id columns
+        digest.update(b"dimensions")
+        fingerprint(value.states, digest)
+        fingerprint(value.districts, digest)
+    elif isinstance(value, dict):
+        _update_json(digest, ["dict", len(value)])
+        for name in sorted(value, key=repr):
+            fingerprint(name, digest)
+            fingerprint(value[name], digest)
+    elif isinstance(value, (list, tuple, range)):
+        _update_json(digest, [type(value).__name__, len(value)])
+        for item in value:
+            fingerprint(item, digest)
+    elif value is None or isinstance(value, (str, bool, int, float, np.generic)):
+        _update_json(digest, [type(value).__name__, repr(value)])
+    else:
+        raise Uncacheable(f"Cannot fingerprint a {type(value).__name__}")
+
+
+def _fingerprint_values(values: Any, digest: "hashlib._Hash") -> None:
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(np.asarray(values)).tobytes())
+        return
+    # Objects, strings, categoricals, periods, ...: hashed by value
+    array = values if isinstance(values, np.ndarray) else values.array
+    if isinstance(array, pd.arrays.NumpyExtensionArray):
+        array = array.to_numpy()
+    digest.update(pd.util.hash_array(array).tobytes())
+
+
+def _update_json(digest: "hashlib._Hash", value: Any) -> None:
+    digest.update(json.dumps(value).encode("utf-8"))
+
+
+class ResultCache:
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def configured(cls) -> Optional["ResultCache"]:
+        """The current loader's cache as config asks for it, or None with it turned off."""
+        if not config.USE_DISK_CACHE or not config.RESULT_CACHE_BYTES:
+            return None
+        return cls(cache_dir() / DIRECTORY, config.RESULT_CACHE_BYTES)
+
+    @staticmethod
+    def purge(root: Path) -> None:
+        """Delete every result stored under the cache directory ``root``."""
+        shutil.rmtree(root / DIRECTORY, ignore_errors=True)
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key[:32]}{SUFFIX}"
+
+    def read(self, key: str) -> Any:
+        """The result stored under ``key``; raises KeyError if there is none (or it is unreadable)."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.loads(zlib.decompress(f.read()))
+            # Reading counts as a use for the eviction order
+            os.utime(path)
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            raise KeyError(key) from None
+        if not isinstance(stored, dict) or stored.get("key") != key:
+            raise KeyError(key)
+        return stored["value"]
+
+    def write(self, key: str, value: Any) -> None:
+        payload = zlib.compress(pickle.dumps({"key": key, "value": value}, protocol=pickle.HIGHEST_PROTOCOL))
+        if len(payload) > self.max_bytes:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".staging-", dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(staging, self.path(key))
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used results until the rest fit in ``max_bytes``."""
+        with _evict_lock:
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+
+
+def cached_result(method: Callable) -> Callable:
+    """Wrap a processor method so its results go through the configured ResultCache."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        if getattr(_active, "depth", 0):
+            return method(self, *args, **kwargs)
+        cache = ResultCache.configured()
+        settings = self.cache_settings() if cache is not None else None
+        if settings is None:
+            return method(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        digest = hashlib.sha256()
+        _update_json(digest, {
+            "format": FORMAT_VERSION,
+            "processor": f"{type(self).__module__}.{type(self).__qualname__}",
+            "name": self.name,
+            "version": self.version,
+            "source": _source_digest(type(self).__module__),
+            "method": method.__name__,
+        })
+        try:
+            fingerprint(settings, digest)
+            fingerprint({name: value for name, value in bound.arguments.items() if name != "self"}, digest)
+        except Uncacheable:
+            return method(self, *args, **kwargs)
+        key = digest.hexdigest()
+
+        try:
+            return cache.read(key)
+        except KeyError:
+            pass
+        result = _call(method, self, args, kwargs)
+        try:
+            cache.write(key, result)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Results that cannot be stored are simply recomputed next time
+            pass
+        return result
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(module: str) -> str:
+    """
+    Hash of the processors package's source and of ``module``'s: processors
+    call each other and shared helpers, so any change there may change a result.
+    """
+    paths = set(Path(__file__).parent.glob("*.py"))
+    source = getattr(sys.modules.get(module), "__file__", None)
+    if source is not None:
+        paths.add(Path(source))
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _call(method: Callable, processor: Any, args: tuple, kwargs: dict) -> Any:
+    _active.depth = getattr(_active, "depth", 0) + 1
+    try:
+        return method(processor, *args, **kwargs)
+    finally:
+        _active.depth -= 1
@@ -6,44 +6,49 @@ Data Points:
   - biometric: SUM(bio_age_5_17 + bio_age_17_) GROUP BY state
   - enrollment: SUM(age_0_5 + age_5_17 + age_18_greater) GROUP BY state
 """
-from typing import Dict
+from typing import Dict, Optional
 
 import pandas as pd
 
-from .base import BaseProcessor
+from src.ingest import Dimensions
+
+from .base import BaseProcessor, dataset_columns
+from .dataset_totals import add_total
 
 
 class StateAggregator(BaseProcessor):
 
+    requires = dataset_columns("state")
+    inputs = ("totals:state",)
+
     @property
     def name(self) -> str:
         return "state_aggregator"
 
-    def process(self, data: Dict[str, pd.DataFrame], dataset: str = "demographic", top_n: int = 15) -> pd.DataFrame:
+    def process(
+        self,
+        data: Dict[str, pd.DataFrame],
+        dataset: str = "demographic",
+        top_n: int = 15,
+        dimensions: Optional[Dimensions] = None,
+    ) -> pd.DataFrame:
+        """
+        Top ``top_n`` states by total.
+
+        Rows keyed by ``state_id`` are labelled through ``dimensions``;
+        rows still carrying ``state`` labels are encoded here first.
+        """
         df = data[dataset]
-
-        if dataset == "demographic":
-            result = (
-                df
-                .assign(total=lambda x: x["demo_age_5_17"] + x["demo_age_17_"])
-                .groupby("state", as_index=False)["total"]
-                .sum()
-            )
-        elif dataset == "biometric":
-            result = (
-                df
-                .assign(total=lambda x: x["bio_age_5_17"] + x["bio_age_17_"])
-                .groupby("state", as_index=False)["total"]
-                .sum()
-            )
-        elif dataset == "enrollment":
-            result = (
-                df
-                .assign(total=lambda x: x["age_0_5"] + x["age_5_17"] + x["age_18_greater"])
-                .groupby("state", as_index=False)["total"]
-                .sum()
-            )
-        else:
-            raise ValueError(f"Unknown dataset: {dataset}")
-
-        return result.nlargest(top_n, "total").sort_values("total", ascending=True)
+        if "state_id" not in df.columns:
+            dimensions = Dimensions()
+            df = dimensions.encode(df)
+        elif dimensions is None:
+            raise ValueError("state_id keys need the dimension tables to label them")
+
+        # Frames from the totals:state node already carry the per-row total
+        result = add_total(df, dataset).groupby("state_id", as_index=False)["total"].sum()
+
+        # Labels are joined back for the top rows only
+        top = result.nlargest(top_n, "total")
+        top.insert(0, "state", dimensions.state_names(top["state_id"]))
+        return top.drop(columns="state_id").sort_values("total", ascending=True)
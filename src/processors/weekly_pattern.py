@@ -2,18 +2,26 @@
 Weekly Pattern Processor
 Analyzes weekly patterns in demographic interactions.
 Data Points:
-  - Extract weekday from date
+  - weekday column (0=Monday, precomputed by the loader)
   - Calculate average daily interactions per weekday
+Graph node: weekly, from totals:date
 """
 from typing import Dict
 
 import pandas as pd
 
-from .base import BaseProcessor
+from .base import BaseProcessor, dataset_columns
+from .dataset_totals import DatasetTotalsProcessor
+from .graph import register_processor
 
 
+@register_processor
 class WeeklyPatternProcessor(BaseProcessor):
 
+    requires = dataset_columns("date", datasets=("demographic",))
+    inputs = ("totals:date",)
+    output = "weekly"
+
     @property
     def name(self) -> str:
         return "weekly_pattern_processor"
@@ -25,20 +33,17 @@ class WeeklyPatternProcessor(BaseProcessor):
         Returns:
             DataFrame with columns: weekday, avg_interactions
         """
-        demo_df = data["demographic"].copy()
-        
-        # Calculate total interactions per row
-        demo_df["total"] = demo_df["demo_age_5_17"] + demo_df["demo_age_17_"]
-        
-        # Extract weekday (0=Monday, 6=Sunday)
-        demo_df["weekday"] = pd.to_datetime(demo_df["date"], format="%d-%m-%Y").dt.dayofweek
-        
-        # Calculate average by weekday
+        return self.compute(DatasetTotalsProcessor("date").process({"demographic": data["demographic"]}))
+
+    def compute(self, totals: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Average interactions by weekday, from the per-row totals (the totals:date node)."""
+        # Total interactions per row, averaged by weekday (0=Monday, 6=Sunday).
+        # Averaging as sum / rows works on raw rows and on date rollups alike.
         weekday_avg = (
-            demo_df
-            .groupby("weekday", as_index=False)["total"]
-            .mean()
-            .rename(columns={"total": "avg_interactions"})
+            self._with_rows(totals["demographic"])
+            .groupby("weekday", as_index=False)[["total", "rows"]]
+            .sum()
+            .assign(avg_interactions=lambda x: x["total"] / x["rows"])
         )
         
         # Map weekday numbers to names
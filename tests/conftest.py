@@ -0,0 +1,49 @@
+"""Shared fixtures: small Datasets directories and an isolated cache."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+
+HEADERS = {
+    "demographic": "date,state,district,pincode,demo_age_5_17,demo_age_17_",
+    "biometric": "date,state,district,pincode,bio_age_5_17,bio_age_17_",
+    "enrollment": "date,state,district,pincode,age_0_5,age_5_17,age_18_greater",
+}
+
+
+def write_shard(datasets_dir: Path, dataset: str, shard: int, rows: list) -> Path:
+    """Write ``rows`` (tuples in the dataset's column order) as shard ``shard`` of ``dataset``."""
+    directory = datasets_dir / dataset
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{dataset}-{shard}.csv"
+    lines = [HEADERS[dataset]] + [",".join(str(value) for value in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(config, "QUARANTINE_DIR", tmp_path / "quarantine")
+    return config.CACHE_DIR
+
+
+@pytest.fixture
+def datasets_dir(tmp_path):
+    """A Datasets directory with one shard per dataset."""
+    root = tmp_path / "Datasets"
+    write_shard(root, "demographic", 1, [
+        ("01-03-2025", "Bihar", "Patna", 800001, 2, 3),
+        ("02-03-2025", "Bihar", "Gaya", 823001, 1, 1),
+    ])
+    write_shard(root, "biometric", 1, [
+        ("01-03-2025", "Bihar", "Patna", 800001, 4, 0),
+    ])
+    write_shard(root, "enrollment", 1, [
+        ("02-03-2025", "Bihar", "Gaya", 823001, 1, 0, 2),
+    ])
+    return root
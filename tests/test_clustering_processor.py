@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+import config
+from src.data_loader import DataLoader
+from src.processors import ClusteringProcessor
+from src.processors import clustering_processor
+from src.processors.context import working_for
+
+
+def pincode_data(pincodes: int = 3000, seed: int = 7) -> dict:
+    """Pincode rollups with counts drawn around a few engagement profiles."""
+    rng = np.random.default_rng(seed)
+    codes = np.sort(rng.choice(np.arange(110000, 860000), size=pincodes, replace=False))
+    profiles = rng.uniform(1, 60, size=(4, 7))
+    counts = rng.poisson(profiles[rng.integers(len(profiles), size=pincodes)]).astype(np.uint32)
+    rows = rng.integers(1, 30, size=(pincodes, 3))
+    return {
+        "demographic": pd.DataFrame({
+            "pincode": codes, "demo_age_5_17": counts[:, 0], "demo_age_17_": counts[:, 1], "rows": rows[:, 0],
+        }),
+        "biometric": pd.DataFrame({
+            "pincode": codes, "bio_age_5_17": counts[:, 2], "bio_age_17_": counts[:, 3], "rows": rows[:, 1],
+        }),
+        "enrollment": pd.DataFrame({
+            "pincode": codes, "age_0_5": counts[:, 4], "age_5_17": counts[:, 5], "age_18_greater": counts[:, 6],
+            "rows": rows[:, 2],
+        }),
+    }
+
+
+def test_sampled_elbow_band_holds_exact_inertia():
+    data = pincode_data()
+    processor = ClusteringProcessor()
+    exact = processor.process_elbow(data, k_values=range(2, 8))
+    sampled = processor.process_elbow(data, k_values=range(2, 8), sample_rows=600)
+
+    assert (sampled["inertia_low"] <= exact["inertia"]).all()
+    assert (exact["inertia"] <= sampled["inertia_high"]).all()
+
+
+def _memoised_dirs() -> set:
+    return {directory for directory, _ in ClusteringProcessor._fits}
+
+
+def test_clear_cache_forgets_the_loader_fits_only(datasets_dir, cache_dir):
+    loader = DataLoader(datasets_dir)
+    processor = ClusteringProcessor()
+    data = pincode_data(pincodes=400)
+    processor.process_clusters(data)
+    with working_for(loader):
+        processor.process_clusters(data)
+    assert {cache_dir / "clusters", loader.cache_dir / "clusters"} <= _memoised_dirs()
+    assert list((loader.cache_dir / "clusters").iterdir())
+
+    loader.clear_cache(disk=True)
+    assert loader.cache_dir / "clusters" not in _memoised_dirs()
+    assert not (loader.cache_dir / "clusters").exists()
+    assert cache_dir / "clusters" in _memoised_dirs()
+    assert list((cache_dir / "clusters").iterdir())
+
+
+def test_memoised_fits_are_bounded():
+    processor = ClusteringProcessor()
+    data = pincode_data(pincodes=400)
+    for k in range(2, 9):
+        processor.process_clusters(data, k=k)
+    assert len(ClusteringProcessor._fits) == clustering_processor._FITS_KEPT
+
+
+def test_saved_models_are_kept_per_loader(datasets_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CLUSTER_MODEL", True)
+    monkeypatch.setattr(config, "CLUSTER_MODEL_DIR", tmp_path / "models")
+    loader = DataLoader(datasets_dir)
+    processor = ClusteringProcessor()
+    processor.process_clusters(pincode_data(pincodes=400))
+    default_model = tmp_path / "models" / "clusters-k5.pkl"
+    saved = default_model.stat().st_mtime_ns
+
+    with working_for(loader):
+        processor.process_clusters(pincode_data(pincodes=400, seed=8))
+
+    assert loader.model_dir != tmp_path / "models"
+    assert (loader.model_dir / "clusters-k5.pkl").exists()
+    # Not refitted on (or overwritten by) the other loader's data
+    assert default_model.stat().st_mtime_ns == saved
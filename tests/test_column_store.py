@@ -0,0 +1,15 @@
+import pandas as pd
+
+from src.ingest.column_store import read_column, write_column
+
+
+def test_period_column_is_memory_mapped(tmp_path):
+    months = pd.Series(pd.PeriodIndex(["2025-03", "2025-01", "2025-03"], freq="M"), name="month")
+    write_column(tmp_path, "month", months)
+
+    mapped = read_column(tmp_path, "month", str(months.dtype), mmap=True)
+
+    assert mapped.dtype == months.dtype
+    assert mapped.tolist() == months.tolist()
+    # A read-only view of the file, not a decoded copy
+    assert not mapped.array.asi8.flags.writeable
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import config
+from src.data_loader import DataLoader
+from src.ingest import ROLLUP_LEVELS, RowFilter
+
+from conftest import write_shard
+
+VALUES = ["demo_age_5_17", "demo_age_17_", "rows"]
+LEVELS = ["total", "date", "state", "district", "pincode", "location"]
+
+
+@pytest.fixture
+def shards(datasets_dir):
+    write_shard(datasets_dir, "demographic", 2, [
+        ("01-03-2025", "Kerala", "Kochi", 682001, 4, 1),
+        ("05-03-2025", "Kerala", "Kochi", 682001, 0, 6),
+        ("05-03-2025", "Kerala", "Kochi", 682001, 3, 3),
+        ("20-03-2025", "Kerala", "Kollam", 691001, 2, 2),
+        ("05-03-2025", "Bihar", "Patna", 800002, 3, 0),
+    ])
+    write_shard(datasets_dir, "demographic", 3, [
+        ("02-04-2025", "Bihar", "Gaya", 823001, 1, 9),
+        ("02-04-2025", "Uttar Pradesh", "Agra", 282001, 5, 5),
+    ])
+    return datasets_dir
+
+
+def _sums(df: pd.DataFrame, keys: list) -> dict:
+    return {
+        tuple(str(value) for value in row[:len(keys)]): tuple(int(value) for value in row[len(keys):])
+        for row in df[keys + VALUES].itertuples(index=False)
+    }
+
+
+@pytest.mark.parametrize("date_from, date_to, states", [
+    (None, None, None),
+    ("2025-03-02", "2025-03-20", None),
+    (None, None, ["kerala", "Uttar Pradesh"]),
+    ("2025-03-05", None, ["Bihar"]),
+    ("2025-05-01", None, None),
+])
+def test_cube_rollups_equal_raw_groupby(shards, monkeypatch, date_from, date_to, states):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", False)
+    raw = DataLoader(shards).load("demographic")
+    row_filter = RowFilter(date_from, date_to, states)
+    rows = raw.loc[row_filter.mask(raw)].assign(rows=1)
+
+    monkeypatch.setattr(config, "USE_DISK_CACHE", True)
+    monkeypatch.setattr(config, "CUBE_QUERIES", True)
+    monkeypatch.setattr(config, "DATE_FROM", row_filter.date_from)
+    monkeypatch.setattr(config, "DATE_TO", row_filter.date_to)
+    monkeypatch.setattr(config, "STATES", states)
+    loader = DataLoader(shards)
+
+    for level in LEVELS:
+        keys = list(ROLLUP_LEVELS[level])
+        if keys:
+            expected = rows.groupby(keys, observed=True)[VALUES].sum().reset_index()
+        else:
+            expected = rows[VALUES].sum().to_frame().T
+        assert _sums(loader.rollup("demographic", level), keys) == _sums(expected, keys), level
@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from src import data_loader
+from src.data_loader import DataLoader
+from src.processors import PincodeFeatureProcessor, ProcessorGraph
+
+from conftest import write_shard
+
+
+def _mapped(values: np.ndarray) -> bool:
+    base = values
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = base.base
+    return False
+
+
+def test_mmap_frames_are_memory_mapped(datasets_dir, monkeypatch):
+    expected = DataLoader(datasets_dir).load("demographic", ["date", "state", "demo_age_5_17"])
+    monkeypatch.setattr(config, "MMAP_FRAMES", True)
+
+    for loader in (DataLoader(datasets_dir), DataLoader(datasets_dir)):
+        # The first loader stores the frame, the second maps the stored one
+        df = loader.load("demographic", ["date", "state", "demo_age_5_17"])
+        pd.testing.assert_frame_equal(df, expected, check_like=True)
+        assert _mapped(df["demo_age_5_17"].to_numpy())
+        assert _mapped(df["date"].to_numpy())
+        assert _mapped(df["state"].array.codes)
+
+
+def test_stored_and_parsed_shards_combine(datasets_dir):
+    DataLoader(datasets_dir).load("demographic")
+    write_shard(datasets_dir, "demographic", 2, [("03-03-2025", "Bihar", "Patna", 800001, 7, 1)])
+
+    # Shard 1 comes from the column store, shard 2 is parsed
+    df = DataLoader(datasets_dir).load("demographic")
+
+    assert df["demo_age_5_17"].tolist() == [2, 1, 7]
+    assert df["day_index"].tolist() == [20148, 20149, 20150]
+
+
+def test_consolidated_rows_keep_their_multiplicity(datasets_dir, monkeypatch):
+    write_shard(datasets_dir, "demographic", 2, [
+        ("01-03-2025", "Bihar", "Patna", 800001, 1, 1),
+        ("01-03-2025", "Bihar", "Patna", 800001, 4, 0),
+    ])
+    monkeypatch.setattr(config, "USE_DISK_CACHE", False)
+    expected = ProcessorGraph.of(DataLoader(datasets_dir)).get("pincode_features", PincodeFeatureProcessor.requires)
+
+    monkeypatch.setattr(config, "CONSOLIDATE_ROWS", True)
+    loader = DataLoader(datasets_dir)
+    df = loader.load("demographic")
+    assert len(df) == 2
+    assert df["rows"].tolist() == [3, 1]
+    assert df["demo_age_5_17"].tolist() == [7, 1]
+
+    features = ProcessorGraph.of(loader).get("pincode_features", PincodeFeatureProcessor.requires)
+    assert features.loc[800001, "demo_freq"] == 3
+    pd.testing.assert_frame_equal(features, expected)
+
+
+@pytest.mark.parametrize("disk_cache", [False, True])
+def test_concurrent_loads_parse_once(datasets_dir, monkeypatch, disk_cache):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", disk_cache)
+    write_shard(datasets_dir, "demographic", 2, [("03-03-2025", "Bihar", "Patna", 800001, 7, 1)])
+    parsed = []
+    read_shard = data_loader.read_shard
+
+    def spy(path, *args, **kwargs):
+        parsed.append(path.name)
+        # Give the other threads time to ask for the dataset meanwhile
+        time.sleep(0.05)
+        return read_shard(path, *args, **kwargs)
+
+    monkeypatch.setattr(data_loader, "read_shard", spy)
+    loader = DataLoader(datasets_dir)
+    start = threading.Barrier(8)
+
+    def load():
+        start.wait()
+        return loader.load("demographic")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda _: load(), range(8)))
+
+    assert sorted(parsed) == ["demographic-1.csv", "demographic-2.csv"]
+    assert all(frame is frames[0] for frame in frames)
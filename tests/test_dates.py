@@ -0,0 +1,19 @@
+import warnings
+
+import pandas as pd
+
+from src.ingest.dates import decode_dates
+
+
+def test_unused_unparseable_category_is_ignored():
+    # Validation can leave a rejected date behind as an unused category
+    dates = pd.Categorical(["03-03-2025", "04-03-2025"], categories=["03-03-2025", "04-03-2025", "31-02-2025"])
+    df = pd.DataFrame({"date": dates})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        decode_dates(df)
+
+    assert df["weekday"].tolist() == [0, 1]
+    assert df["day_index"].tolist() == [20150, 20151]
+    assert df["month"].astype(str).tolist() == ["2025-03", "2025-03"]
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.processors import DailyAggregator, ProcessorGraph
+
+from conftest import write_shard
+
+
+def test_clear_cache_drops_node_values(datasets_dir):
+    loader = DataLoader(datasets_dir)
+    graph = ProcessorGraph.of(loader)
+    daily = graph.get("daily", DailyAggregator.requires)
+    assert daily["demo_total"].tolist() == [5, 2]
+
+    write_shard(datasets_dir, "demographic", 2, [("03-03-2025", "Bihar", "Patna", 800001, 7, 1)])
+    loader.clear_cache()
+
+    daily = graph.get("daily", DailyAggregator.requires)
+    assert daily["date"].tolist() == list(pd.to_datetime(["2025-03-01", "2025-03-02", "2025-03-03"]))
+    assert daily["demo_total"].tolist() == [5, 2, 8]
+
+
+def test_clear_cache_on_disk_purges_processor_results(datasets_dir):
+    loader = DataLoader(datasets_dir)
+    ProcessorGraph.of(loader).get("daily", DailyAggregator.requires)
+    assert list((loader.cache_dir / "results").iterdir())
+
+    loader.clear_cache(disk=True)
+    assert not (loader.cache_dir / "results").exists()
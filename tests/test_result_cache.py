@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import config
+from src.data_loader import DataLoader
+from src.processors import DailyAggregator, ProcessorGraph, ResultCache, result_cache
+from src.processors.context import working_for
+
+
+@pytest.fixture
+def default_datasets(datasets_dir, monkeypatch):
+    """Point the default loader's dataset directories at ``datasets_dir``."""
+    for name in ("demographic", "biometric", "enrollment"):
+        monkeypatch.setattr(config, f"{name.upper()}_DIR", datasets_dir / name)
+    return datasets_dir
+
+
+def _daily(loader: DataLoader):
+    return ProcessorGraph.of(loader).get("daily", DailyAggregator.requires)
+
+
+def _stored(root) -> set:
+    return {path.name for path in (root / result_cache.DIRECTORY).glob(f"*{result_cache.SUFFIX}")}
+
+
+def test_results_are_stored_under_the_loader_cache(default_datasets, tmp_path, cache_dir):
+    other_dir = tmp_path / "Other"
+    shutil.copytree(default_datasets, other_dir)
+    default, other = DataLoader(), DataLoader(other_dir)
+    _daily(default)
+    _daily(other)
+    assert _stored(cache_dir) and _stored(other.cache_dir)
+
+    other.clear_cache(disk=True)
+    assert _stored(cache_dir) and not _stored(other.cache_dir)
+
+    _daily(other)
+    default.clear_cache(disk=True)
+    assert not _stored(cache_dir) and _stored(other.cache_dir)
+    # The other loader's parsed shards and rollups are kept too
+    assert (other.cache_dir / "rollups").exists()
+
+
+def test_results_of_changed_processor_code_are_not_reused(datasets_dir, monkeypatch):
+    loader = DataLoader(datasets_dir)
+    data = loader.get_rollup_data("date", DailyAggregator.requires)
+    with working_for(loader):
+        DailyAggregator().process(data)
+        monkeypatch.setattr(result_cache, "_source_digest", lambda module: "changed")
+        DailyAggregator().process(data)
+    assert len(_stored(loader.cache_dir)) == 2
+
+
+def test_least_recently_used_results_are_evicted(monkeypatch):
+    monkeypatch.setattr(config, "RESULT_CACHE_BYTES", 10_000)
+    cache = ResultCache.configured()
+    rng = np.random.default_rng(0)
+    for age, key in enumerate("abc"):
+        # Incompressible, so each takes a little over 3000 bytes
+        cache.write(key * 64, rng.bytes(3000))
+        os.utime(cache.path(key * 64), ns=(age, age))
+
+    cache.read("a" * 64)
+    cache.write("d" * 64, rng.bytes(3000))
+
+    assert {path.name[0] for path in cache.root.iterdir()} == {"a", "c", "d"}
+    assert sum(path.stat().st_size for path in cache.root.iterdir()) <= config.RESULT_CACHE_BYTES
+    with pytest.raises(KeyError):
+        cache.read("b" * 64)
+
+
+def test_results_larger_than_the_cache_are_not_stored(monkeypatch):
+    monkeypatch.setattr(config, "RESULT_CACHE_BYTES", 1000)
+    cache = ResultCache.configured()
+    cache.write("a" * 64, np.random.default_rng(0).bytes(3000))
+    assert not cache.root.exists() or not any(cache.root.iterdir())
+
+
+def test_result_cache_off(monkeypatch):
+    monkeypatch.setattr(config, "RESULT_CACHE_BYTES", 0)
+    assert ResultCache.configured() is None
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+import config
+from src.data_loader import DataLoader
+from src.ingest import ROLLUP_LEVELS
+
+from conftest import write_shard
+
+LEVELS = [level for level in ROLLUP_LEVELS if level != "cube"]
+
+
+@pytest.fixture
+def shards(datasets_dir):
+    """Demographic shards whose keys repeat within and across chunks and shards."""
+    write_shard(datasets_dir, "demographic", 2, [
+        ("01-03-2025", "Bihar", "Patna", 800001, 4, 1),
+        ("03-03-2025", "Kerala", "Kochi", 682001, 0, 6),
+        ("01-03-2025", "Bihar", "Patna", 800001, 1, 1),
+        ("01-04-2025", "Kerala", "Kochi", 682001, 2, 2),
+        ("02-03-2025", "Bihar", "Gaya", 823001, 3, 0),
+    ])
+    return datasets_dir
+
+
+def _rollups(datasets_dir) -> dict:
+    loader = DataLoader(datasets_dir)
+    return {level: loader.rollup("demographic", level) for level in LEVELS}
+
+
+def _sorted(df: pd.DataFrame, level: str) -> pd.DataFrame:
+    keys = list(ROLLUP_LEVELS[level])
+    return df.sort_values(keys).reset_index(drop=True) if keys else df
+
+
+@pytest.mark.parametrize("disk_cache", [False, True])
+def test_streamed_rollups_equal_in_memory(shards, monkeypatch, disk_cache):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", False)
+    expected = _rollups(shards)
+    assert expected["total"]["rows"].tolist() == [7]
+
+    monkeypatch.setattr(config, "USE_DISK_CACHE", disk_cache)
+    monkeypatch.setattr(config, "STREAMING", True)
+    monkeypatch.setattr(config, "STREAM_CHUNK_ROWS", 2)
+    for level, rollup in _rollups(shards).items():
+        pd.testing.assert_frame_equal(_sorted(rollup, level), _sorted(expected[level], level), obj=level)
+
+
+def test_stored_rollups_fold_in_only_new_shards(datasets_dir, monkeypatch):
+    aggregated = []
+    aggregate_files = DataLoader._aggregate_files
+
+    def spy(self, dataset, file_paths, *args, **kwargs):
+        aggregated.append(sorted(path.name for path in file_paths))
+        return aggregate_files(self, dataset, file_paths, *args, **kwargs)
+
+    monkeypatch.setattr(DataLoader, "_aggregate_files", spy)
+
+    def total() -> list:
+        return DataLoader(datasets_dir).rollup("demographic", "total")[["demo_age_5_17", "rows"]].iloc[0].tolist()
+
+    assert total() == [3, 2]
+    assert aggregated == [["demographic-1.csv"]]
+
+    write_shard(datasets_dir, "demographic", 2, [("03-03-2025", "Bihar", "Patna", 800001, 7, 1)])
+    aggregated.clear()
+    assert total() == [10, 3]
+    assert aggregated == [["demographic-2.csv"]]
+
+    # Sums cannot be taken back out: a removed shard means a rebuild
+    write_shard(datasets_dir, "demographic", 3, [("04-03-2025", "Bihar", "Gaya", 823001, 1, 1)])
+    (datasets_dir / "demographic" / "demographic-1.csv").unlink()
+    aggregated.clear()
+    assert total() == [8, 2]
+    assert aggregated == [["demographic-2.csv", "demographic-3.csv"]]
+
+    aggregated.clear()
+    assert total() == [8, 2]
+    assert aggregated == []
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import config
+from src.data_loader import DataLoader
+from src.ingest import partitions, read_shard
+from src.ingest.partitions import PartitionStore, RowFilter
+
+from conftest import write_shard
+
+
+@pytest.fixture
+def two_shards(datasets_dir):
+    """A second demographic shard holding only Uttar Pradesh rows."""
+    write_shard(datasets_dir, "demographic", 2, [
+        ("01-04-2025", "Uttar Pradesh", "Agra", 282001, 5, 1),
+        ("15-04-2025", "Uttar Pradesh", "Lucknow", 226001, 2, 2),
+    ])
+    return datasets_dir
+
+
+@pytest.mark.parametrize("disk_cache", [True, False])
+def test_filter_matching_one_shard(two_shards, monkeypatch, disk_cache):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", disk_cache)
+    monkeypatch.setattr(config, "STATES", ["uttar pradesh"])
+    for _ in range(2):
+        # The second run reads the partition store the first one built
+        df = DataLoader(two_shards).load("demographic")
+        assert df["district"].tolist() == ["Agra", "Lucknow"]
+        assert isinstance(df["state"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("disk_cache", [True, False])
+def test_filter_matching_no_shard(two_shards, monkeypatch, disk_cache):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", disk_cache)
+    monkeypatch.setattr(config, "STATES", ["kerala"])
+    assert DataLoader(two_shards).load("demographic").empty
+
+
+def test_date_range(two_shards, monkeypatch):
+    monkeypatch.setattr(config, "DATE_FROM", pd.Timestamp("2025-03-02"))
+    monkeypatch.setattr(config, "DATE_TO", pd.Timestamp("2025-04-01"))
+    daily = DataLoader(two_shards).rollup("demographic", "date")
+    assert daily["date"].tolist() == list(pd.to_datetime(["2025-03-02", "2025-04-01"]))
+    assert daily["demo_age_5_17"].tolist() == [1, 5]
+
+
+def test_partitions_ruled_out_are_not_read(two_shards, cache_dir, monkeypatch):
+    path = two_shards / "demographic" / "demographic-2.csv"
+    store = PartitionStore(cache_dir / "partitions")
+    store.write(path, next(read_shard(path, config.DATASET_SCHEMAS["demographic"])))
+
+    read = []
+    read_column = partitions.read_column
+    monkeypatch.setattr(partitions, "read_column", lambda directory, *args: read.append(directory.name) or read_column(directory, *args))
+
+    df = store.read(path, RowFilter(date_to=pd.Timestamp("2025-03-31")))
+    assert df.empty and not read
+
+    df = store.read(path, RowFilter(states=["Uttar Pradesh"], date_from=pd.Timestamp("2025-04-10")))
+    assert df["district"].tolist() == ["Lucknow"]
+    assert set(read) == {"2025-04.0001"}
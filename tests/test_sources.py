@@ -0,0 +1,76 @@
+import gzip
+import shutil
+
+import pandas as pd
+import pytest
+
+import config
+from src.data_loader import DataLoader
+from src.ingest import find_shards
+from src.ingest.column_store import file_fingerprint
+
+from conftest import write_shard
+
+
+def _compress(path, suffix: str):
+    data = path.read_bytes()
+    if suffix == ".gz":
+        packed = gzip.compress(data)
+    else:
+        zstandard = pytest.importorskip("zstandard")
+        packed = zstandard.ZstdCompressor().compress(data)
+    target = path.with_name(path.name + suffix)
+    target.write_bytes(packed)
+    path.unlink()
+    return target
+
+
+@pytest.fixture(params=[".gz", ".zst"])
+def suffix(request):
+    return request.param
+
+
+@pytest.fixture
+def plain(datasets_dir):
+    write_shard(datasets_dir, "demographic", 2, [("03-03-2025", "Kerala", "Kochi", 682001, 7, 1)])
+    return datasets_dir
+
+
+def test_compressed_shards_load_like_plain_ones(plain, tmp_path, monkeypatch, suffix):
+    monkeypatch.setattr(config, "USE_DISK_CACHE", False)
+    compressed = tmp_path / "Compressed"
+    shutil.copytree(plain, compressed)
+    for path in (compressed / "demographic").glob("*.csv"):
+        _compress(path, suffix)
+
+    expected = DataLoader(plain).load("demographic")
+    pd.testing.assert_frame_equal(DataLoader(compressed).load("demographic"), expected)
+
+    monkeypatch.setattr(config, "STREAMING", True)
+    monkeypatch.setattr(config, "STREAM_CHUNK_ROWS", 1)
+    pd.testing.assert_frame_equal(
+        DataLoader(compressed).rollup("demographic", "state"), DataLoader(plain).rollup("demographic", "state")
+    )
+
+
+def test_compressed_copy_keeps_the_cache_identity(plain, monkeypatch, suffix):
+    path = plain / "demographic" / "demographic-2.csv"
+    fingerprint = file_fingerprint(path)
+    expected = DataLoader(plain).rollup("demographic", "state")
+
+    compressed = _compress(path, suffix)
+    assert find_shards(plain / "demographic", "demographic")[-1] == compressed
+    assert file_fingerprint(compressed)["path"] == fingerprint["path"]
+    assert file_fingerprint(compressed)["sha256"] == fingerprint["sha256"]
+
+    aggregated = []
+    monkeypatch.setattr(DataLoader, "_aggregate_files", lambda *args: aggregated.append(args))
+    pd.testing.assert_frame_equal(DataLoader(plain).rollup("demographic", "state"), expected)
+    assert not aggregated
+
+
+def test_shard_present_twice_is_an_error(plain):
+    path = plain / "demographic" / "demographic-2.csv"
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(path.read_bytes()))
+    with pytest.raises(ValueError, match="more than once"):
+        find_shards(plain / "demographic", "demographic")
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import config
+from src.ingest import Quarantine, read_shard, validation
+
+from conftest import write_shard
+
+GOOD = ("01-03-2025", "Bihar", "Patna", 800001, 2, 3)
+
+
+def _quarantined(quarantine: Quarantine, path) -> pd.DataFrame:
+    return pd.read_csv(quarantine.path_for(path), dtype=str, keep_default_na=False)
+
+
+def test_reason_codes(tmp_path):
+    path = write_shard(tmp_path, "demographic", 1, [
+        GOOD,
+        ("01-03-2025", "Bihar", "Patna", 800001, "", 3),
+        ("01-03-2025", "Bihar", "Patna", 800001, "many", 3),
+        ("01-03-2025", "Bihar", "Patna", 800001, -2, 3),
+        ("31-02-2025", "Bihar", "Patna", 800001, 2, 3),
+        ("01-03-2025", "Bihar", "Patna", 12345, 2, 3),
+        ("01-03-2025", "Atlantis", "Patna", 800001, 2, 3),
+        ("01-03-2025", "Bihar", "Delhi", 110001, 2, 3),
+        ("31-02-2025", "Bihar", "Patna", 800001, -2, 3),
+    ])
+    quarantine = Quarantine(tmp_path / "quarantine")
+
+    df = next(read_shard(path, config.DATASET_SCHEMAS["demographic"], quarantine=quarantine))
+
+    assert df["demo_age_5_17"].tolist() == [2]
+    assert _quarantined(quarantine, path)["reason"].tolist() == [
+        "missing",
+        "not_a_number",
+        "negative_count",
+        "bad_date",
+        "bad_pincode",
+        "unknown_state",
+        "pincode_state",
+        "negative_count|bad_date",
+    ]
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 3])
+def test_rejected_rows_are_written_once(tmp_path, monkeypatch, chunk_rows):
+    monkeypatch.setattr(validation, "BLOCK_ROWS", 3)
+    rows = [GOOD] * 4 + [("01-03-2025", "Bihar", "Patna", 800001, "many", 3)] + [GOOD] * 2
+    rows.append(("01-03-2025", "Bihar", "Patna", 800001, -1, 3))
+    path = write_shard(tmp_path, "demographic", 1, rows)
+    quarantine = Quarantine(tmp_path / "quarantine")
+
+    parses = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: parses.append(args) or read_csv(*args, **kwargs))
+
+    chunks = list(read_shard(path, config.DATASET_SCHEMAS["demographic"], chunk_rows, quarantine))
+    # Three blocks; only the one with text in a count is parsed again
+    assert len(parses) == 4
+
+    assert sum(len(chunk) for chunk in chunks) == 6
+    assert _quarantined(quarantine, path)["reason"].tolist() == ["not_a_number", "negative_count"]